@@ -1,32 +1,278 @@
+from contextlib import contextmanager
+from copy import deepcopy
+from functools import wraps
 from importlib import import_module
 from pathlib import Path
-from pkgutil import iter_modules
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, TextIO, Tuple
 
-CHALLENGES: Dict[int, Dict[int, Callable[[Path], Any]]] = {}
+PACKAGE_DIR = Path(__file__).resolve().parent
 
+# Static day -> module manifest so that looking up a single day only imports the module that defines it.
+# Regenerate it with `python -m aoc2022.manifest` after adding a new day.
+DAY_MODULES: Dict[int, str] = {
+    1: "calorie_counting",
+    2: "rock_paper_scissors",
+    3: "rucksacks",
+    4: "camp_cleanup",
+    5: "supply_stacks",
+    6: "tuning_trouble",
+    7: "no_space_left",
+    8: "treetop_tree_house",
+    9: "rope_bridge",
+    10: "cathode_ray_tube",
+    11: "monkey_in_the_middle",
+    12: "hill_climbing_algorithm",
+    13: "distress_signal",
+    14: "reservoir",
+    15: "beacon_exclusion_zone",
+    16: "proboscidea_volcanium",
+    17: "pyroclastic_flow",
+    18: "boiling_boulders",
+    19: "not_enough_minerals",
+    20: "grove_positioning_system",
+    21: "monkey_math",
+    22: "monkey_map",
+    23: "unstable_diffusion",
+    24: "blizzard_basin",
+    25: "full_of_hot_air",
+}
+
+# the name of the readable implementation of each part; faster alternatives are registered under other names
+REFERENCE = "reference"
+
+
+class ChallengeRegistry(Mapping[int, Dict[int, Callable[[Path], Any]]]):
+    """
+    A mapping from day to {part: challenge function} that only imports a day's module when it is accessed.
+
+    The functions in the mapping are the parts' reference implementations; see `implementations` for the others.
+    """
+
+    def __init__(self, modules: Mapping[int, str]):
+        self.modules: Dict[int, str] = dict(modules)
+        self._challenges: Dict[int, Dict[int, Callable[[Path], Any]]] = {}
+        # day -> part -> implementation name -> challenge function, including the reference implementations
+        self._implementations: Dict[int, Dict[int, Dict[str, Callable[[Path], Any]]]] = {}
+
+    def module_name(self, day: int) -> str:
+        return f"{__name__}.{self.modules[day]}"
+
+    def register(self, day: int) -> Dict[int, Callable[[Path], Any]]:
+        if day in self._challenges:
+            return self._challenges[day]
+        existing_day: Dict[int, Callable[[Path], Any]] = {}
+        self._challenges[day] = existing_day
+        return existing_day
+
+    def register_implementation(self, day: int, part: int, impl: str, func: Callable[[Path], Any]):
+        implementations = self._implementations.setdefault(day, {}).setdefault(part, {})
+        if impl in implementations:
+            raise ValueError(f"Day {day} part {part} already has a {impl!r} implementation: "
+                             f"{implementations[impl].__name__}")
+        implementations[impl] = func
+
+    def implementations(self, day: int, part: int) -> Dict[str, Callable[[Path], Any]]:
+        """Returns every implementation of a part by name"""
+        if part not in self[day]:
+            raise KeyError(f"Day {day} does not have part {part}")
+        return self._implementations.get(day, {}).get(part, {})
+
+    def implementation(self, day: int, part: int, impl: str = REFERENCE) -> Callable[[Path], Any]:
+        """Returns the `impl` implementation of a part, or its reference implementation if it has no such variant"""
+        return self.implementations(day, part).get(impl, self[day][part])
+
+    def load(self, day: int):
+        if day in self.modules:
+            import_module(self.module_name(day))
+
+    def load_all(self):
+        for day in self.modules:
+            self.load(day)
+
+    def part_names(self, day: int) -> Dict[int, str]:
+        """Returns the names of the functions implementing each part of `day` without importing its module"""
+        if day in self._challenges or day not in self.modules:
+            return {part: func.__name__ for part, func in self[day].items()}
+        # the manifest module needs `ast`, which is too slow to import on every run
+        from .manifest import scan_module
+        return scan_module(self.modules[day]).get(day, {})
+
+    def implementation_names(self, day: int) -> Dict[int, List[str]]:
+        """Returns the names of each part's alternative implementations without importing the day's module"""
+        if day in self._challenges or day not in self.modules:
+            return {
+                part: sorted(impl for impl in self.implementations(day, part) if impl != REFERENCE)
+                for part in self[day]
+            }
+        from .manifest import scan_implementations
+        return scan_implementations(self.modules[day]).get(day, {})
+
+    def __getitem__(self, day: int) -> Dict[int, Callable[[Path], Any]]:
+        if day not in self._challenges:
+            if day not in self.modules:
+                raise KeyError(day)
+            self.load(day)
+        return self.register(day)
+
+    def __contains__(self, day) -> bool:
+        return day in self.modules or day in self._challenges
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(sorted(self.modules.keys() | self._challenges.keys()))
+
+    def __len__(self) -> int:
+        return len(self.modules.keys() | self._challenges.keys())
+
+
+CHALLENGES: ChallengeRegistry = ChallengeRegistry(DAY_MODULES)
+PARSERS: Dict[int, Callable[[Path], Any]] = {}
+# day -> the version of the structure its parser returns; see `parser`
+PARSER_VERSIONS: Dict[int, int] = {}
+
+# (day, input) -> parsed input; this is only populated inside of a `shared_parsing()` context
+_PARSED_INPUTS: Optional[Dict[Tuple[int, Any], Any]] = None
+# an object with `get(day, path)` and `put(day, path, parsed)` methods, like `snapshots.SnapshotCache`, that is
+# consulted before running a parser; this is only set inside of a `parse_snapshots()` context
+_SNAPSHOTS: Optional[Any] = None
+
+
+@contextmanager
+def shared_parsing(parsed_inputs: Optional[Dict[Tuple[int, Any], Any]] = None) -> Iterator[None]:
+    """
+    Within this context, each day's parser is run at most once per input and its result is shared by the parts.
+
+    Passing the same `parsed_inputs` dict to multiple contexts shares the parsed inputs between them.
+    """
+    global _PARSED_INPUTS
+    previous = _PARSED_INPUTS
+    if parsed_inputs is not None:
+        _PARSED_INPUTS = parsed_inputs
+    elif previous is None:
+        _PARSED_INPUTS = {}
+    try:
+        yield
+    finally:
+        _PARSED_INPUTS = previous
+
+
+@contextmanager
+def parse_snapshots(snapshots: Optional[Any]) -> Iterator[None]:
+    """Within this context, parsed inputs are loaded from and saved to `snapshots` if it is not `None`"""
+    global _SNAPSHOTS
+    previous = _SNAPSHOTS
+    _SNAPSHOTS = snapshots
+    try:
+        yield
+    finally:
+        _SNAPSHOTS = previous
 
-def challenge(day: int, part: Optional[int] = None):
-    if day in CHALLENGES:
-        existing_day = CHALLENGES[day]
-    else:
-        existing_day = {}
-        CHALLENGES[day] = existing_day
-    if part is None:
-        part = len(existing_day)
-    elif part in existing_day:
-        raise ValueError(f"Day {day} part {part} is already assigned to {existing_day[part].__name__}")
+
+def parser(day: int, version: int = 0):
+    """
+    Registers the function that parses the input for `day`.
+
+    Parts registered with `@challenge(day=day, parsed=True)` are passed the parsed input rather than the path. The
+    parsed input is shared between parts, so parts must not modify it unless they are registered with `mutates=True`,
+    in which case they receive a deep copy.
+
+    Parsed inputs can be saved to disk as snapshots (see `snapshots`), which remain valid when the parts change.
+    `version` must be incremented whenever the parser or the classes of the structure it returns change.
+    """
+    if day in PARSERS:
+        raise ValueError(f"Day {day} already has a parser: {PARSERS[day].__name__}")
 
     def wrapper(func: Callable[[Path], Any]) -> Callable[[Path], Any]:
-        existing_day[part] = func
+        PARSERS[day] = func
+        PARSER_VERSIONS[day] = version
+        return func
+
+    return wrapper
+
+
+def _run_parser(day: int, path: Path) -> Any:
+    if _SNAPSHOTS is None:
+        return PARSERS[day](path)
+    parsed = _SNAPSHOTS.get(day, path)
+    if parsed is None:
+        parsed = PARSERS[day](path)
+        _SNAPSHOTS.put(day, path, parsed)
+    return parsed
+
+
+def parse(day: int, path: Path) -> Any:
+    if _PARSED_INPUTS is None:
+        return _run_parser(day, path)
+    key = (day, path)
+    if key not in _PARSED_INPUTS:
+        _PARSED_INPUTS[key] = _run_parser(day, path)
+    return _PARSED_INPUTS[key]
+
+
+class Generator(NamedTuple):
+    function: Callable[[TextIO, int, Any], None]
+    default_scale: int
+
+
+GENERATORS: Dict[int, Generator] = {}
+
+
+def generator(day: int, default_scale: int):
+    """
+    Registers a function that writes a random input for `day` in the puzzle's format.
+
+    The function is called with the output stream, a positive scale, and a seeded `random.Random`; its output must
+    only depend on those. Each generator documents what its scale counts (elves, grid rows, sensors, etc.), and
+    `default_scale` should produce an input about the size of a real puzzle input.
+    """
+    if day in GENERATORS:
+        raise ValueError(f"Day {day} already has a generator: {GENERATORS[day].function.__name__}")
+
+    def wrapper(func: Callable[[TextIO, int, Any], None]) -> Callable[[TextIO, int, Any], None]:
+        GENERATORS[day] = Generator(function=func, default_scale=default_scale)
         return func
 
     return wrapper
 
 
-# Automatically load all modules in the `aoc2022` package
-package_dir = Path(__file__).resolve().parent
-for (_, module_name, _) in iter_modules([str(package_dir)]):  # type: ignore
-    # import the module and iterate through its attributes
-    if module_name != "__main__":
-        module = import_module(f"{__name__}.{module_name}")
+def challenge(
+        day: int, part: Optional[int] = None, parsed: bool = False, mutates: bool = False, impl: str = REFERENCE
+):
+    """
+    Registers a function that solves a part of `day`.
+
+    Every part has a reference implementation, which is what runs by default. A part may also have alternative
+    implementations (e.g., `impl="fast"`) that must return the same answers; these must specify their `part`, and they
+    are selected with `--impl` and cross-checked by `aoc2022 bench --impls`.
+    """
+    existing_day = CHALLENGES.register(day)
+    if impl != REFERENCE:
+        if part is None:
+            raise ValueError(f"The {impl!r} implementation of a day {day} part must specify its part number")
+    elif part is None:
+        part = len(existing_day)
+    elif part in existing_day:
+        raise ValueError(f"Day {day} part {part} is already assigned to {existing_day[part].__name__}")
+
+    def wrapper(func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        if not parsed:
+            if impl == REFERENCE:
+                existing_day[part] = func
+            CHALLENGES.register_implementation(day, part, impl, func)
+            return func
+
+        @wraps(func)
+        def run(path: Path) -> Any:
+            if day not in PARSERS:
+                raise ValueError(f"Day {day} part {part} expects parsed input, but day {day} has no parser")
+            data = parse(day, path)
+            if mutates and _PARSED_INPUTS is not None:
+                # the original is shared with the other parts
+                data = deepcopy(data)
+            return func(data)
+
+        if impl == REFERENCE:
+            existing_day[part] = run
+        CHALLENGES.register_implementation(day, part, impl, run)
+        return func
+
+    return wrapper
@@ -0,0 +1,139 @@
+import argparse
+from concurrent.futures import as_completed, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+import json
+from pathlib import Path
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from . import CHALLENGES, shared_parsing
+from .log import add_verbosity_arguments, configure_verbosity
+from .runner import PartResult, run_part
+
+
+def discover_inputs(directory: Path, pattern: str = "*", recursive: bool = False) -> List[Path]:
+    if recursive:
+        paths: Iterable[Path] = directory.rglob(pattern)
+    else:
+        paths = directory.glob(pattern)
+    return sorted(p for p in paths if p.is_file())
+
+
+def initialize_worker(day: int):
+    # import the day's module once per worker rather than once per input
+    CHALLENGES.load(day)
+
+
+def solve_input(day: int, part: int, path: Path) -> List[PartResult]:
+    if part < 0:
+        parts = sorted(CHALLENGES[day].keys())
+    else:
+        parts = [part]
+    with shared_parsing():
+        return [run_part(day, p, path) for p in parts]
+
+
+def to_record(path: Path, result: PartResult) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"input": str(path)}
+    record.update(asdict(result))
+    del record["cached"]
+    return record
+
+
+def error_records(day: int, part: int, path: Path, error: BaseException) -> Iterator[Dict[str, Any]]:
+    if part < 0:
+        parts = sorted(CHALLENGES.part_names(day).items())
+    else:
+        parts = [(part, CHALLENGES.part_names(day).get(part, "?"))]
+    for p, name in parts:
+        yield to_record(path, PartResult(day=day, part=p, name=name, answer=None, duration=0.0,
+                                         error=f"{error.__class__.__name__}: {error!s}"))
+
+
+def run_batch(
+        day: int,
+        paths: List[Path],
+        part: int = -1,
+        jobs: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yields a record for every (input, part) as soon as each input is solved"""
+    crashed: List[Path] = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initialize_worker, initargs=(day,)) as executor:
+        futures: Dict[Future, Path] = {executor.submit(solve_input, day, part, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results = future.result()
+            except BrokenProcessPool:
+                # a worker died (e.g., it was killed for running out of memory), which fails every outstanding input
+                crashed.append(path)
+                continue
+            except Exception as e:
+                yield from error_records(day, part, path, e)
+                continue
+            yield from (to_record(path, result) for result in results)
+    # retry the inputs that were in flight when the pool broke one at a time so that a crash is attributed correctly
+    for path in sorted(crashed):
+        with ProcessPoolExecutor(max_workers=1, initializer=initialize_worker, initargs=(day,)) as executor:
+            try:
+                results = executor.submit(solve_input, day, part, path).result()
+            except Exception as e:
+                yield from error_records(day, part, path, e)
+                continue
+        yield from (to_record(path, result) for result in results)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="aoc2022 batch",
+                                     description="Solve one day for every input file in a directory, writing one "
+                                                 "JSON line per input and part")
+
+    parser.add_argument("DIRECTORY", type=Path, help="the directory containing the input files")
+    parser.add_argument("--day", "-d", type=int, required=True, choices=sorted(CHALLENGES.keys()),
+                        help="the day number")
+    parser.add_argument("--part", "-p", type=int, default=-1, help="the part of the challenge to run; if the part is "
+                                                                   "negative, then all parts will be run (default=-1)")
+    parser.add_argument("--pattern", type=str, default="*", help="only solve files matching this glob (default=*)")
+    parser.add_argument("--recursive", "-r", action="store_true", help="also search subdirectories for inputs")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="the number of worker processes (default is the number of CPUs)")
+    parser.add_argument("--output", "-o", type=str, default="-",
+                        help="path to the JSONL output file, or '-' for STDOUT (the default)")
+
+    add_verbosity_arguments(parser)
+
+    args = parser.parse_args(argv[1:])
+    configure_verbosity(args)
+
+    if not args.DIRECTORY.is_dir():
+        parser.error(f"{args.DIRECTORY!s} is not a directory")
+    elif args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    elif args.part >= 0 and args.part not in CHALLENGES.part_names(args.day):
+        sys.stderr.write(f"Day {args.day} does not have part {args.part}\n")
+        return 1
+
+    paths = discover_inputs(args.DIRECTORY, pattern=args.pattern, recursive=args.recursive)
+    if not paths:
+        sys.stderr.write(f"No inputs found in {args.DIRECTORY!s}\n")
+        return 1
+
+    if args.output == "-":
+        outfile: TextIO = sys.stdout
+    else:
+        outfile = open(args.output, "w")
+    errors = 0
+    try:
+        for record in run_batch(args.day, paths, part=args.part, jobs=args.jobs):
+            if record["error"] is not None:
+                errors += 1
+            outfile.write(f"{json.dumps(record)}\n")
+            outfile.flush()
+    finally:
+        if outfile != sys.stdout:
+            outfile.close()
+
+    if errors:
+        sys.stderr.write(f"{errors} of the solutions failed\n")
+    return int(errors > 0)
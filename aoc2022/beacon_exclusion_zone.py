@@ -97,13 +97,15 @@ Consult the report from the sensors you just deployed. In the row where y=200000
 """
 
 from dataclasses import dataclass
+from random import Random
 import re
-from typing import Dict, Iterator
+from typing import Iterator, List, Optional, TextIO, Tuple
 
-from intervaltree import Interval, IntervalTree
-from tqdm import tqdm, trange
-
-from . import challenge, Path
+from . import challenge, generator, Path
+from .counters import add, counting, FLUSH_INTERVAL
+from .intervals import IntervalSet
+from .log import log, progress_range
+from .puzzle_input import integer_rows
 
 
 @dataclass(frozen=True)
@@ -137,18 +139,13 @@ class Sensor:
         else:
             return self.location.distance_to(point) > self.closest_beacon_distance
 
-    def excluded_x_values(self, in_row: int) -> IntervalTree:
-        y_delta = abs(self.location.y - in_row)
-        x_delta = self.closest_beacon_distance - y_delta
+    def covered_x_values(self, in_row: int) -> Optional[Tuple[int, int]]:
+        """The half-open interval of x values in `in_row` that are within range of this sensor, including its beacon"""
+        x_delta = self.closest_beacon_distance - abs(self.location.y - in_row)
         if x_delta < 0:
             # the row is too far away from our sensor
-            return IntervalTree()
-        tree = IntervalTree([Interval(self.location.x - x_delta, self.location.x + x_delta + 1)])
-        if y_delta == 0:
-            tree.addi(self.location.x, self.location.x + 1)
-        if in_row == self.closest_beacon.y:
-            tree.chop(self.closest_beacon.x, self.closest_beacon.x + 1)
-        return tree
+            return None
+        return self.location.x - x_delta, self.location.x + x_delta + 1
 
     @property
     def min_x(self) -> int:
@@ -158,14 +155,6 @@ class Sensor:
     def max_x(self) -> int:
         return self.location.x + self.closest_beacon_distance
 
-    @property
-    def min_y(self) -> int:
-        return self.location.y - self.closest_beacon_distance
-
-    @property
-    def max_y(self) -> int:
-        return self.location.y + self.closest_beacon_distance
-
     @classmethod
     def parse(cls, line: str) -> "Sensor":
         m = SENSOR_PATTERN.match(line)
@@ -178,21 +167,45 @@ class Sensor:
 
 
 def load(path: Path) -> Iterator[Sensor]:
-    with open(path, "r") as f:
-        for line in f:
-            yield Sensor.parse(line)
+    for sensor_x, sensor_y, beacon_x, beacon_y in integer_rows(path, 4):
+        yield Sensor(location=Point(x=sensor_x, y=sensor_y), closest_beacon=Point(x=beacon_x, y=beacon_y))
+
+
+@generator(day=15, default_scale=24)
+def generate_sensors(out: TextIO, scale: int, rng: Random):
+    """
+    Writes `scale` sensors (at least four) that leave exactly one position in the search area uncovered.
+
+    Four of the sensors sit diagonally around the hidden position and together cover everything else in the search
+    area; every other sensor reaches as close to the hidden position as it can without covering it.
+    """
+    limit = 4000000
+    hidden = Point(rng.randint(0, limit), rng.randint(0, limit))
+    sensors = [
+        (Point(hidden.x + dx * limit, hidden.y + dy * limit), 2 * limit - 1)
+        for dx, dy in ((-1, -1), (-1, 1), (1, -1), (1, 1))
+    ]
+    while len(sensors) < scale:
+        sensor = Point(rng.randint(0, limit), rng.randint(0, limit))
+        distance = sensor.distance_to(hidden)
+        if distance > 1:
+            sensors.append((sensor, distance - 1))
+    rng.shuffle(sensors)
+    for sensor, distance in sensors:
+        dx = rng.randint(0, distance)
+        beacon = Point(sensor.x + rng.choice((-1, 1)) * dx, sensor.y + rng.choice((-1, 1)) * (distance - dx))
+        out.write(f"Sensor at x={sensor.x}, y={sensor.y}: closest beacon is at x={beacon.x}, y={beacon.y}\n")
 
 
 @challenge(day=15)
 def row_two_million(path: Path) -> int:
-    excluded = IntervalTree()
-    for sensor in load(path):
-        excluded |= sensor.excluded_x_values(2000000)
-    excluded.merge_overlaps()
-    return sum(
-        interval.end - interval.begin
-        for interval in excluded
-    )
+    row = 2000000
+    sensors = list(load(path))
+    excluded = IntervalSet(filter(None, (sensor.covered_x_values(row) for sensor in sensors)))
+    # the known beacons are the only positions in range of a sensor that can contain a beacon
+    for beacon_x in {sensor.closest_beacon.x for sensor in sensors if sensor.closest_beacon.y == row}:
+        excluded.discard(beacon_x, beacon_x + 1)
+    return excluded.length
 
 
 """
@@ -215,20 +228,28 @@ def tuning_frequency(path: Path) -> int:
         (sensor.closest_beacon.x, sensor.closest_beacon.y)
         for sensor in sensors
     }
-    for y in trange(0, max_value + 1, desc="scanning", unit="row", leave=False):
-        excluded = IntervalTree()
-        for sensor in sensors:
-            if sensor.min_y <= y <= sensor.max_y:
-                excluded |= sensor.excluded_x_values(in_row=y)
-        excluded.merge_overlaps()
-        possible_locations = IntervalTree([Interval(0, max_value + 1)])
-        for interval in excluded:
-            if interval.end > 0 or interval.begin <= max_value:
-                possible_locations.chop(interval.begin, interval.end)
-        for interval in possible_locations:
-            for x in range(interval.begin, interval.end):
-                if (x, y) not in known_beacon_positions:
-                    tqdm.write(f"Beacon: x={x}, y={y}")
-                    return x * 4000000 + y
-    else:
-        raise ValueError("No solution!")
+    # each sensor as (x, y, range) so that the inner loop does not have to go through its properties
+    ranges: List[Tuple[int, int, int]] = [
+        (sensor.location.x, sensor.location.y, sensor.closest_beacon_distance) for sensor in sensors
+    ]
+    rows_scanned = published = 0
+    try:
+        for y in progress_range(0, max_value + 1, desc="scanning", unit="row", leave=False):
+            rows_scanned += 1
+            if rows_scanned % FLUSH_INTERVAL == 0 and counting():
+                add("day15.rows_scanned", rows_scanned - published)
+                published = rows_scanned
+            covered: List[Tuple[int, int]] = []
+            for sensor_x, sensor_y, distance in ranges:
+                x_delta = distance - abs(sensor_y - y)
+                if x_delta >= 0:
+                    covered.append((sensor_x - x_delta, sensor_x + x_delta + 1))
+            for begin, end in IntervalSet(covered).gaps(0, max_value + 1):
+                for x in range(begin, end):
+                    if (x, y) not in known_beacon_positions:
+                        log(f"Beacon: x={x}, y={y}")
+                        return x * 4000000 + y
+        else:
+            raise ValueError("No solution!")
+    finally:
+        add("day15.rows_scanned", rows_scanned - published)
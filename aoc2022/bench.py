@@ -0,0 +1,379 @@
+import argparse
+from contextlib import redirect_stdout
+from hashlib import sha256
+import json
+from math import ceil
+import os
+from pathlib import Path
+import platform
+from statistics import mean, median
+import sys
+from tempfile import TemporaryDirectory
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from . import CHALLENGES, REFERENCE
+from .log import add_verbosity_arguments, configure_verbosity
+from .profiling import format_bytes, max_rss
+from .runner import default_input, DEFAULT_INPUTS_DIR, select_parts
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = max(1, ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    return {
+        "min": min(samples),
+        "median": median(samples),
+        "p95": percentile(samples, 95),
+        "mean": mean(samples),
+    }
+
+
+def measure(func: Callable[[Path], Any], path: Path, warmup: int = 1, repeat: int = 5) -> Dict[str, Any]:
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for _ in range(warmup):
+            func(path)
+        wall_times: List[float] = []
+        cpu_times: List[float] = []
+        answer: Any = None
+        for _ in range(repeat):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            answer = func(path)
+            cpu_times.append(time.process_time() - cpu_start)
+            wall_times.append(time.perf_counter() - wall_start)
+        # tracing slows the solver down considerably, so peak memory gets its own untimed run
+        tracemalloc.start()
+        try:
+            func(path)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        "answer": str(answer),
+        "warmup": warmup,
+        "repeat": repeat,
+        "wall": summarize(wall_times),
+        "cpu": summarize(cpu_times),
+        "peak_memory": peak_memory,
+    }
+
+
+def bench(
+        day: Optional[int] = None,
+        part: int = -1,
+        warmup: int = 1,
+        repeat: int = 5,
+        inputs_dir: Path = DEFAULT_INPUTS_DIR,
+        input_path: Optional[Path] = None,
+        impl: str = REFERENCE,
+        all_impls: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Measures the `impl` implementation of each selected part, or every implementation of it if `all_impls` is `True`.
+
+    When every implementation is measured, the reference comes first, and the result for each of the others has an
+    `agrees` field that is whether its answer matched the reference's.
+    """
+    for d, p, _ in select_parts(day, part):
+        if input_path is None:
+            path = default_input(d, inputs_dir)
+        else:
+            path = input_path
+        if not path.exists():
+            sys.stderr.write(f"Skipping day {d} part {p}: {path} does not exist\n")
+            continue
+        if all_impls:
+            implementations = CHALLENGES.implementations(d, p)
+            impls = [REFERENCE] + sorted(name for name in implementations if name != REFERENCE)
+        else:
+            impls = [impl]
+        reference_answer: Optional[str] = None
+        for name in impls:
+            func = CHALLENGES.implementation(d, p, name)
+            result: Dict[str, Any] = {
+                "day": d,
+                "part": p,
+                "name": func.__name__,
+                "impl": name,
+                "input": str(path),
+            }
+            result.update(measure(func, path, warmup=warmup, repeat=repeat))
+            if all_impls:
+                if name == REFERENCE:
+                    reference_answer = result["answer"]
+                else:
+                    result["agrees"] = result["answer"] == reference_answer
+            yield result
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    elif seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
+
+
+def display_name(result: Dict[str, Any]) -> str:
+    impl = result.get("impl", REFERENCE)
+    if impl == REFERENCE:
+        return result["name"]
+    return f"{result['name']} [{impl}]"
+
+
+def format_row(result: Dict[str, Any]) -> str:
+    wall = result["wall"]
+    return f"{result['day']:>3} {result['part']:>4}  {display_name(result):<34}" \
+           f"{format_duration(wall['min']):>10}{format_duration(wall['median']):>10}" \
+           f"{format_duration(wall['p95']):>10}{format_duration(result['cpu']['median']):>10}" \
+           f"{format_bytes(result['peak_memory']):>12}"
+
+
+HEADER = f"{'Day':>3} {'Part':>4}  {'Name':<34}{'Min':>10}{'Median':>10}{'p95':>10}{'CPU':>10}{'Peak Mem':>12}"
+
+
+def cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.partition(":")[2].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment() -> Dict[str, Any]:
+    machine = {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu": cpu_model(),
+        "cpu_count": os.cpu_count(),
+    }
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": machine,
+        # timings are only comparable between runs on the same kind of machine
+        "fingerprint": sha256(json.dumps(machine, sort_keys=True).encode("utf-8")).hexdigest()[:16],
+    }
+
+
+# differences smaller than these are treated as noise regardless of the relative threshold
+MIN_TIME_REGRESSION = 1e-3
+MIN_MEMORY_REGRESSION = 64 * 1024
+
+
+def regressions(
+        baseline: Dict[str, Any],
+        result: Dict[str, Any],
+        threshold: float = 0.1,
+        memory_threshold: float = 0.1
+) -> List[str]:
+    """Returns a description of each way `result` is slower or uses more memory than `baseline`"""
+    found: List[str] = []
+    old_time, new_time = baseline["wall"]["median"], result["wall"]["median"]
+    if new_time > old_time * (1 + threshold) and new_time - old_time > MIN_TIME_REGRESSION:
+        found.append(f"median time {format_duration(old_time)} -> {format_duration(new_time)}")
+    old_memory, new_memory = baseline["peak_memory"], result["peak_memory"]
+    if new_memory > old_memory * (1 + memory_threshold) and new_memory - old_memory > MIN_MEMORY_REGRESSION:
+        found.append(f"peak memory {format_bytes(old_memory)} -> {format_bytes(new_memory)}")
+    if baseline.get("answer") != result["answer"]:
+        found.append(f"answer changed from {baseline.get('answer')} to {result['answer']}")
+    return found
+
+
+def format_change(old: float, new: float) -> str:
+    if old == 0:
+        return "n/a"
+    return f"{(new - old) / old:+.1%}"
+
+
+def format_comparison(baseline: Dict[str, Any], result: Dict[str, Any], regressed: bool) -> str:
+    old_time, new_time = baseline["wall"]["median"], result["wall"]["median"]
+    old_memory, new_memory = baseline["peak_memory"], result["peak_memory"]
+    return f"{result['day']:>3} {result['part']:>4}  {display_name(result):<34}" \
+           f"{format_duration(old_time):>10}{format_duration(new_time):>10}{format_change(old_time, new_time):>10}" \
+           f"{format_bytes(old_memory):>12}{format_bytes(new_memory):>12}" \
+           f"{format_change(old_memory, new_memory):>10}  {'REGRESSED' if regressed else 'ok'}"
+
+
+COMPARISON_HEADER = f"{'Day':>3} {'Part':>4}  {'Name':<34}{'Baseline':>10}{'Median':>10}{'Change':>10}" \
+                    f"{'Base Mem':>12}{'Peak Mem':>12}{'Change':>10}  Status"
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(
+        baseline: Dict[str, Any],
+        day: Optional[int] = None,
+        part: int = -1,
+        warmup: int = 1,
+        repeat: int = 5,
+        input_path: Optional[Path] = None,
+        threshold: float = 0.1,
+        memory_threshold: float = 0.1
+) -> int:
+    """Re-runs the parts in `baseline` and prints how they compare, returning the number that regressed"""
+    fingerprint = environment()["fingerprint"]
+    if baseline.get("environment", {}).get("fingerprint") != fingerprint:
+        sys.stderr.write("Warning: the baseline was recorded on a different machine, so the timings may not be "
+                         "comparable\n")
+    if baseline.get("environment", {}).get("python") != platform.python_version():
+        sys.stderr.write(f"Warning: the baseline was recorded with Python {baseline['environment'].get('python')}, "
+                         f"not {platform.python_version()}\n")
+    num_regressions = 0
+    print(COMPARISON_HEADER)
+    for old in baseline["results"]:
+        if (day is not None and old["day"] != day) or (part >= 0 and old["part"] != part):
+            continue
+        if old["day"] not in CHALLENGES or old["part"] not in CHALLENGES[old["day"]]:
+            sys.stderr.write(f"Skipping day {old['day']} part {old['part']}: it no longer exists\n")
+            continue
+        if input_path is not None:
+            path = input_path
+        else:
+            path = Path(old["input"])
+        if not path.exists():
+            sys.stderr.write(f"Skipping day {old['day']} part {old['part']}: {path} does not exist\n")
+            continue
+        impl = old.get("impl", REFERENCE)
+        func = CHALLENGES.implementation(old["day"], old["part"], impl)
+        new: Dict[str, Any] = {
+            "day": old["day"], "part": old["part"], "name": func.__name__, "impl": impl, "input": str(path)
+        }
+        new.update(measure(func, path, warmup=warmup, repeat=repeat))
+        found = regressions(old, new, threshold=threshold, memory_threshold=memory_threshold)
+        print(format_comparison(old, new, bool(found)), flush=True)
+        for regression in found:
+            print(f"{'':10}{regression}")
+        if found:
+            num_regressions += 1
+    return num_regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="aoc2022 bench", description="Time the registered challenges")
+
+    parser.add_argument("--day", "-d", type=int, choices=sorted(CHALLENGES.keys()),
+                        help="only benchmark this day (default is every day)")
+    parser.add_argument("--part", "-p", type=int, default=-1, help="only benchmark this part; if the part is "
+                                                                   "negative, then all parts will be run (default=-1)")
+    parser.add_argument("--input", "-i", type=Path, help="the input file to use (default is "
+                                                         "INPUTS/dayN.txt for each day)")
+    parser.add_argument("--inputs", type=Path, default=DEFAULT_INPUTS_DIR,
+                        help=f"the directory containing the dayN.txt inputs (default={DEFAULT_INPUTS_DIR!s})")
+    parser.add_argument("--generate", type=int, default=None, metavar="SCALE",
+                        help="benchmark on an input generated at this scale rather than on a file (requires --day)")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed for --generate (default=0)")
+    impl_group = parser.add_mutually_exclusive_group()
+    impl_group.add_argument("--impl", type=str, default=REFERENCE,
+                            help="benchmark this implementation of each part, for parts that have one, rather than "
+                                 f"the reference implementation (default={REFERENCE})")
+    impl_group.add_argument("--impls", action="store_true",
+                            help="benchmark every implementation of each part side by side and exit with a non-zero "
+                                 "status if any of them disagrees with the reference implementation's answer")
+    parser.add_argument("--warmup", "-w", type=int, default=1, help="number of untimed runs before timing "
+                                                                    "(default=1)")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="number of timed runs (default=5)")
+    parser.add_argument("--json", "-j", type=str, help="also write the results as JSON to this path, or '-' for "
+                                                       "STDOUT (which suppresses the table); the file can be used "
+                                                       "as a baseline for --compare")
+    parser.add_argument("--compare", "-c", type=Path, default=None,
+                        help="re-run the parts in this baseline (written by --json) and exit with a non-zero status "
+                             "if any of them regressed")
+    parser.add_argument("--threshold", "-t", type=float, default=10.0,
+                        help="with --compare, the percentage by which a part's median time may grow before it is a "
+                             "regression (default=10)")
+    parser.add_argument("--memory-threshold", type=float, default=None,
+                        help="with --compare, the percentage by which a part's peak memory may grow before it is a "
+                             "regression (default is the same as --threshold)")
+
+    add_verbosity_arguments(parser)
+
+    args = parser.parse_args(argv[1:])
+    configure_verbosity(args)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if args.input is not None and args.day is None:
+        parser.error("--input requires --day")
+    if args.generate is not None:
+        if args.day is None:
+            parser.error("--generate requires --day")
+        elif args.input is not None:
+            parser.error("--generate cannot be used with --input")
+        elif args.generate < 1:
+            parser.error("--generate must be positive")
+    if args.threshold < 0 or (args.memory_threshold is not None and args.memory_threshold < 0):
+        parser.error("thresholds must not be negative")
+
+    if args.compare is not None:
+        if args.json is not None:
+            parser.error("--json cannot be used with --compare")
+        try:
+            baseline = load_baseline(args.compare)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"Could not load the baseline {args.compare!s}: {e!s}\n")
+            return 1
+        if args.memory_threshold is None:
+            args.memory_threshold = args.threshold
+        if args.generate is not None:
+            parser.error("--generate cannot be used with --compare")
+        num_regressions = compare(baseline, day=args.day, part=args.part, warmup=args.warmup, repeat=args.repeat,
+                                  input_path=args.input, threshold=args.threshold / 100.0,
+                                  memory_threshold=args.memory_threshold / 100.0)
+        if num_regressions:
+            sys.stderr.write(f"{num_regressions} part(s) regressed\n")
+        return int(num_regressions > 0)
+
+    table = args.json != "-"
+    results: List[Dict[str, Any]] = []
+    if table:
+        print(HEADER)
+    with TemporaryDirectory(prefix="aoc2022-bench-") as tmpdir:
+        if args.generate is not None:
+            # the generator module is only imported when it is used
+            from .gen import generate
+
+            args.input = Path(tmpdir) / f"day{args.day}-{args.generate}.txt"
+            try:
+                with open(args.input, "w") as f:
+                    generate(args.day, f, scale=args.generate, seed=args.seed)
+            except KeyError as e:
+                sys.stderr.write(f"{e.args[0]}\n")
+                return 1
+        try:
+            for result in bench(day=args.day, part=args.part, warmup=args.warmup, repeat=args.repeat,
+                                inputs_dir=args.inputs, input_path=args.input, impl=args.impl,
+                                all_impls=args.impls):
+                results.append(result)
+                if table:
+                    print(format_row(result), flush=True)
+                if not result.get("agrees", True):
+                    sys.stderr.write(f"Day {result['day']} part {result['part']}: the {result['impl']!r} "
+                                     f"implementation answered {result['answer']}, which disagrees with the "
+                                     f"reference implementation\n")
+        except KeyError as e:
+            sys.stderr.write(f"{e.args[0]}\n")
+            return 1
+
+    if args.json is not None:
+        # the RSS high-water mark covers every part measured by this process, so it is reported once for the run
+        report = {"environment": environment(), "results": results, "process_max_rss": max_rss()}
+        if args.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        else:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+    return int(not all(result.get("agrees", True) for result in results))
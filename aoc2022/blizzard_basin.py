@@ -233,12 +233,15 @@ What is the fewest number of minutes required to avoid the blizzards and reach t
 """
 
 from enum import Enum
-from functools import lru_cache
-import heapq
 from math import lcm
-from typing import List, Iterator, Optional, Set, Tuple
+from random import Random
+from typing import Iterator, List, Optional, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, Path
+from .counters import add
+from .grid import Grid
+from .log import enabled, log, VERBOSE
+from .search import bfs, SearchStats
 
 
 class Direction(Enum):
@@ -262,9 +265,16 @@ class Blizzards:
         self.width: int = width
         self.initial_state: Tuple[Tuple[Direction, Position], ...] = blizzards
         self.max_state: int = lcm(height, width)
-        self.blizzards: List[Optional[List[List[int]]]] = [None] * self.max_state
+        # the valley plus the rows of the entrance and exit, surrounded by walls; only the valley's interior, the
+        # entrance, and the exit are open
+        self.valley: Grid = Grid(width, height + 2, padding=1)
+        for row in range(1, height + 1):
+            for index in self.valley.row_indices(row):
+                self.valley[index] = 1
+        self.valley[self.index((-1, 0))] = 1
+        self.valley[self.index((height, width - 1))] = 1
+        self.open_cells_by_state: List[Optional[bytearray]] = [None] * self.max_state
 
-    @lru_cache(maxsize=100000)
     def blizzard_positions(self, state: int) -> Tuple[Position, ...]:
         return tuple((
             (
@@ -274,17 +284,21 @@ class Blizzards:
             for direction, (row, col) in self.initial_state
         ))
 
-    def is_open(self, state: int, position: Position) -> bool:
-        if position[0] < 0 or position[0] >= self.height or position[1] < 0 or position[1] >= self.width:
-            return True
+    def index(self, position: Position) -> int:
+        """The index of `position` in `valley`; the entrance is at row -1, and the exit is at row `height`"""
+        return self.valley.index(position[0] + 1, position[1])
+
+    def open_cells(self, state: int) -> bytearray:
+        """Returns one byte per cell of `valley` that is non-zero if the cell is free of blizzards and walls"""
         state %= self.max_state
-        if self.blizzards[state] is None:
-            self.blizzards[state] = [[0] * self.width for _ in range(self.height)]
-            for direction, (row, col) in self.initial_state:
-                new_row = (row + direction.row_delta * state) % self.height
-                new_col = (col + direction.col_delta * state) % self.width
-                self.blizzards[state][new_row][new_col] += 1
-        return self.blizzards[state][position[0]][position[1]] == 0
+        cells = self.open_cells_by_state[state]
+        if cells is None:
+            add("day24.blizzard_states_built")
+            cells = bytearray(self.valley.cells)
+            for position in self.blizzard_positions(state):
+                cells[self.index(position)] = 0
+            self.open_cells_by_state[state] = cells
+        return cells
 
 
 class State:
@@ -300,9 +314,6 @@ class State:
         else:
             self.goal = goal
 
-    def is_open(self, position: Position) -> bool:
-        return self.blizzards.is_open(self.blizzard_state, position)
-
     def all_blizzards(self) -> Iterator[Tuple[Direction, Position]]:
         for direction, (row, col) in self.blizzards.initial_state:
             blizzard_pos = (
@@ -326,40 +337,11 @@ class State:
     def __hash__(self):
         return hash((self.expedition, self.blizzard_state))
 
-    def next_state(self) -> "State":
-        """This does not check if the expedition gets caught in a blizzard"""
-        return State(
-            expedition=self.expedition,
-            blizzards=self.blizzards,
-            blizzard_state=self.blizzard_state + 1,
-            goal=self.goal
-        )
-
-    def successors(self) -> Iterator["State"]:
-        # first move the blizzards:
-        base_state = self.next_state()
-        if base_state.is_open(base_state.expedition):
-            # it is safe to wait
-            yield base_state
-        for d in Direction:
-            new_pos = base_state.expedition[0] + d.row_delta, base_state.expedition[1] + d.col_delta
-            if (
-                    (0 <= new_pos[0] < self.blizzards.height and 0 <= new_pos[1] < self.blizzards.width)
-                    and base_state.is_open(new_pos)
-            ) or (new_pos == self.goal):
-                # it is a valid move
-                yield State(
-                    expedition=new_pos,
-                    blizzards=base_state.blizzards,
-                    blizzard_state=base_state.blizzard_state,
-                    goal=self.goal
-                )
-
     @classmethod
     def load(cls, path: Path) -> "State":
         width = 0
         blizzards: List[Tuple[Direction, Position]] = []
-        with open(path, "r") as f:
+        with path.open("r") as f:
             for row, line in enumerate(f):
                 line = line.strip()[1:-1]
                 if row == 0:
@@ -393,33 +375,60 @@ class State:
 
 
 def calculate_fewest_minutes(state: State) -> int:
-    possible_positions: Set[Position] = {state.expedition}
-    rounds = 0
-    while possible_positions:
-        state = state.next_state()
-        rounds += 1
-        next_possible_positions: Set[Position] = set()
-        if rounds % 30 == 0:
-            closest = min(abs(state.goal[0] - p[0]) + abs(state.goal[1] - p[1]) for p in possible_positions)
-            print(rounds, len(possible_positions), closest)
-        for pos in possible_positions:
-            state.expedition = pos
-            # print(str(state))
-            if state.is_open(pos):
-                # it is safe to wait
-                next_possible_positions.add(pos)
-            for d in Direction:
-                new_pos = state.expedition[0] + d.row_delta, state.expedition[1] + d.col_delta
-                if new_pos == state.goal:
-                    return rounds
-                elif (
-                        (0 <= new_pos[0] < state.blizzards.height and 0 <= new_pos[1] < state.blizzards.width)
-                        and state.is_open(new_pos)
-                ):
-                    # it is a valid move
-                    next_possible_positions.add(new_pos)
-        possible_positions = next_possible_positions
-    raise ValueError("No solution!")
+    """
+    Breadth-first search over (blizzard state, cell) pairs, each encoded as `blizzard_state * num_cells + index`.
+
+    Waiting in place is a successor like any other move, so a cell can be revisited but a pair cannot.
+    """
+    blizzards = state.blizzards
+    num_cells = len(blizzards.valley.cells)
+    offsets = blizzards.valley.offsets
+    goal = blizzards.index(state.goal)
+
+    def successors(encoded: int) -> Iterator[int]:
+        blizzard_state, index = divmod(encoded, num_cells)
+        blizzard_state = (blizzard_state + 1) % blizzards.max_state
+        open_cells = blizzards.open_cells(blizzard_state)
+        base = blizzard_state * num_cells
+        if open_cells[index]:
+            # it is safe to wait
+            yield base + index
+        for offset in offsets:
+            # the walls are never open, so no bounds check is necessary
+            if open_cells[index + offset]:
+                yield base + index + offset
+
+    start = (state.blizzard_state % blizzards.max_state) * num_cells + blizzards.index(state.expedition)
+    stats: Optional[SearchStats] = SearchStats() if enabled(VERBOSE) else None
+    solution = bfs(
+        (start,), successors, lambda encoded: encoded % num_cells == goal, num_states=blizzards.max_state * num_cells,
+        stats=stats
+    )
+    if stats is not None:
+        log(f"Search {stats!s}")
+    if solution is None:
+        raise ValueError("No solution!")
+    return solution[1]
+
+
+@generator(day=24, default_scale=120)
+def generate_valley(out: TextIO, scale: int, rng: Random):
+    """Writes a valley `scale` tiles wide and a fifth as tall"""
+    width = max(2, scale)
+    height = max(2, width // 5)
+    out.write(f"#.{'#' * width}\n")
+    for _ in range(height):
+        row = []
+        for col in range(width):
+            if rng.random() < 0.4:
+                row.append(".")
+            elif col == 0 or col == width - 1:
+                # vertical blizzards in these columns would blow through the entrance or exit
+                row.append(rng.choice("<>"))
+            else:
+                row.append(rng.choice("<>^v"))
+        out.write(f"#{''.join(row)}#\n")
+    out.write(f"{'#' * width}.#\n")
 
 
 @challenge(day=24)
@@ -432,17 +441,17 @@ def fewest_minutes(path: Path) -> int:
 def back_and_forth(path: Path) -> int:
     state = State.load(path)
     time_to_goal = calculate_fewest_minutes(state)
-    print(f"Initial time to the goal: {time_to_goal}")
+    log(f"Initial time to the goal: {time_to_goal}")
     # set the goal to be the start
     state.expedition = state.goal
     state.goal = (-1, 0)
     state.blizzard_state = time_to_goal
     time_back_to_start = calculate_fewest_minutes(state)
-    print(f"Time to get back to the start: {time_back_to_start}")
+    log(f"Time to get back to the start: {time_back_to_start}")
     # now go back to the goal again
     state.blizzard_state = time_to_goal + time_back_to_start
     state.expedition = state.goal
     state.goal = (state.blizzards.height, state.blizzards.width - 1)
     time_to_goal_again = calculate_fewest_minutes(state)
-    print(f"Time to get back to the goal again: {time_to_goal_again}")
+    log(f"Time to get back to the goal again: {time_to_goal_again}")
     return time_to_goal + time_back_to_start + time_to_goal_again
@@ -30,11 +30,12 @@ In the above example, after counting up all the sides that aren't connected to a
 What is the surface area of your scanned lava droplet?
 """
 
-from typing import Dict, Iterable, Iterator, Set, Tuple
+from random import Random
+from typing import Dict, Iterable, Iterator, Set, TextIO, Tuple
 
-from tqdm import tqdm
-
-from . import challenge, Path
+from . import challenge, generator, parser, Path
+from .log import progress
+from .puzzle_input import integer_rows
 
 
 Voxel = Tuple[int, int, int]
@@ -113,7 +114,7 @@ class Droplet:
 
     def surface_area(self, exterior_only: bool = False) -> int:
         total = 0
-        for cube in tqdm(self, leave=False, unit="cube"):
+        for cube in progress(self, leave=False, unit="cube"):
             for neighbor in Droplet.neighbors(cube):
                 if neighbor not in self and (not exterior_only or self.is_exterior(neighbor)):
                     total += 1
@@ -121,15 +122,27 @@ class Droplet:
 
     @classmethod
     def load(cls, path: Path) -> "Droplet":
-        with open(path, "r") as f:
-            return cls(
-                (map(int, line.strip().split(",")) for line in f)  # type: ignore
-            )
+        return cls(integer_rows(path, 3))  # type: ignore
+
+
+@generator(day=18, default_scale=2000)
+def generate_droplet(out: TextIO, scale: int, rng: Random):
+    """Writes `scale` distinct cubes packed into a box about twice their volume"""
+    side = 1
+    while side ** 3 < 2 * scale:
+        side += 1
+    for index in rng.sample(range(side ** 3), scale):
+        out.write(f"{index % side},{index // side % side},{index // (side * side)}\n")
+
+
+@parser(day=18)
+def load_droplet(path: Path) -> Droplet:
+    return Droplet.load(path)
 
 
-@challenge(day=18)
-def surface_area(path: Path) -> int:
-    return Droplet.load(path).surface_area()
+@challenge(day=18, parsed=True)
+def surface_area(droplet: Droplet) -> int:
+    return droplet.surface_area()
 
 
 """
@@ -144,6 +157,6 @@ What is the exterior surface area of your scanned lava droplet?
 """
 
 
-@challenge(day=18)
-def exterior_surface_area(path: Path) -> int:
-    return Droplet.load(path).surface_area(exterior_only=True)
+@challenge(day=18, parsed=True)
+def exterior_surface_area(droplet: Droplet) -> int:
+    return droplet.surface_area(exterior_only=True)
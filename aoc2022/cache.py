@@ -0,0 +1,163 @@
+from dataclasses import asdict, dataclass
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Dict, Optional
+
+from . import CHALLENGES, PACKAGE_DIR, REFERENCE
+from .manifest import package_imports
+from .puzzle_input import PuzzleInput
+
+DEFAULT_MAX_SIZE = 16 * 1024 * 1024
+CACHE_DIR_ENV_VAR = "AOC2022_CACHE_DIR"
+
+
+def default_cache_dir() -> Path:
+    if CACHE_DIR_ENV_VAR in os.environ:
+        return Path(os.environ[CACHE_DIR_ENV_VAR])
+    elif "XDG_CACHE_HOME" in os.environ:
+        return Path(os.environ["XDG_CACHE_HOME"]) / "aoc2022"
+    return Path.home() / ".cache" / "aoc2022"
+
+
+def file_hash(path: PuzzleInput) -> str:
+    h = sha256()
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_SOLVER_HASHES: Dict[int, str] = {}
+
+
+def solver_hash(day: int) -> str:
+    """
+    A hash of the source of the module that defines `day`'s challenges and of the package modules it imports.
+
+    The shared helpers (e.g., `search` and `grid`) are included so that fixing one invalidates the cached answers of
+    every day that uses it.
+    """
+    if day not in _SOLVER_HASHES:
+        if day in CHALLENGES.modules:
+            paths = [PACKAGE_DIR / f"{name}.py" for name in sorted(package_imports(CHALLENGES.modules[day]))]
+        else:
+            paths = [Path(sys.modules[next(iter(CHALLENGES[day].values())).__module__].__file__)]
+        h = sha256()
+        for path in paths:
+            h.update(f"{path.name}:{file_hash(path)}\n".encode("utf-8"))
+        _SOLVER_HASHES[day] = h.hexdigest()
+    return _SOLVER_HASHES[day]
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    day: int
+    part: int
+    name: str
+    answer: str
+    duration: float
+    created: float
+
+
+class DirectoryStore:
+    """
+    A directory of files, one per key, that is kept under `max_size` bytes.
+
+    Files are written atomically so that concurrent runs never see a partial file. Reading a file should be followed by
+    `touch`, which bumps its modification time so that eviction is least-recently-used rather than
+    least-recently-created.
+    """
+
+    def __init__(self, directory: Path, suffix: str, max_size: int):
+        self.directory: Path = directory
+        self.suffix: str = suffix
+        self.max_size: int = max_size
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def touch(self, path: Path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def write(self, key: str, data: bytes) -> Path:
+        """Replaces the file for `key` with `data` and then evicts the least recently used files"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        entries = []
+        total_size = 0
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total_size -= size
+
+    def clear(self):
+        for path in self.directory.glob(f"*{self.suffix}"):
+            path.unlink()
+
+
+class ResultCache:
+    """
+    An on-disk cache of challenge answers keyed by (day, part, input hash, solver source hash).
+
+    Each entry is a small JSON file; when the entries exceed `max_size` bytes, the least recently used are evicted.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_size: int = DEFAULT_MAX_SIZE):
+        if directory is None:
+            directory = default_cache_dir()
+        self.store: DirectoryStore = DirectoryStore(directory / "results", suffix=".json", max_size=max_size)
+
+    def key(self, day: int, part: int, input_path: PuzzleInput, impl: str = REFERENCE) -> str:
+        key = f"{day}:{part}:{file_hash(input_path)}:{solver_hash(day)}"
+        if impl != REFERENCE:
+            # timing an alternative implementation should not be satisfied by the reference's cached answer
+            key = f"{key}:{impl}"
+        return sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        path = self.store.path(key)
+        try:
+            with path.open("r") as f:
+                result = CachedResult(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        self.store.touch(path)
+        return result
+
+    def put(self, key: str, day: int, part: int, name: str, answer: str, duration: float) -> CachedResult:
+        result = CachedResult(day=day, part=part, name=name, answer=answer, duration=duration, created=time.time())
+        self.store.write(key, json.dumps(asdict(result)).encode("utf-8"))
+        return result
+
+    def clear(self):
+        self.store.clear()
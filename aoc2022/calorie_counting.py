@@ -1,6 +1,9 @@
 from heapq import nlargest
+from random import Random
+from typing import TextIO
 
-from . import challenge, Optional, Path
+from . import challenge, generator, Optional, Path
+from .puzzle_input import integers, records
 
 """
 --- Day 1: Calorie Counting ---
@@ -44,6 +47,8 @@ Find the Elf carrying the most Calories. How many total Calories is that Elf car
 
 
 class Elf:
+    __slots__ = "food_calories", "_total"
+
     def __init__(self, *calories: int):
         self.food_calories: [int] = list(calories)
         self._total: Optional[int] = None
@@ -68,19 +73,17 @@ class Elf:
 
     @classmethod
     def load(cls, path: Path) -> ["Elf"]:
-        elves: [Elf] = []
-        with open(path, "r") as f:
-            calories: [int] = []
-            for line in f:
-                line = line.strip()
-                if not line:
-                    elves.append(Elf(*calories))
-                    calories = []
-                else:
-                    calories.append(int(line))
-            if calories:
-                elves.append(Elf(*calories))
-        return elves
+        return [Elf(*integers(record)) for record in records(path)]
+
+
+@generator(day=1, default_scale=250)
+def generate_elves(out: TextIO, scale: int, rng: Random):
+    """Writes the food carried by `scale` elves"""
+    for elf in range(scale):
+        if elf > 0:
+            out.write("\n")
+        for _ in range(rng.randint(1, 15)):
+            out.write(f"{rng.randint(1000, 9999)}\n")
 
 
 @challenge(day=1)
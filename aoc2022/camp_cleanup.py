@@ -1,7 +1,8 @@
-import re
-from typing import Iterator, Tuple
+from random import Random
+from typing import Iterator, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, Path
+from .puzzle_input import integer_rows
 
 """
 --- Day 4: Camp Cleanup ---
@@ -48,6 +49,8 @@ In how many assignment pairs does one range fully contain the other?
 
 
 class Assignment:
+    __slots__ = "from_section", "to_section"
+
     def __init__(self, from_section: int, to_section: int):
         if from_section > to_section:
             raise ValueError()
@@ -68,16 +71,21 @@ class Assignment:
         return f"{self.from_section}-{self.to_section}"
 
 
-ASMT_PATTERN: re.Pattern = re.compile(r"^\s*(\d+)\s*-\s*(\d+)\s*,\s*(\d+)\s*-\s*(\d+)\s*$")
-
-
 def load_assignment_pairs(path: Path) -> Iterator[Tuple[Assignment, Assignment]]:
-    with open(path, "r") as f:
-        for line in f:
-            m = ASMT_PATTERN.match(line)
-            if not m:
-                raise ValueError(line)
-            yield Assignment(int(m.group(1)), int(m.group(2))), Assignment(int(m.group(3)), int(m.group(4)))
+    # the dashes are range separators rather than signs
+    for from1, to1, from2, to2 in integer_rows(path, 4, signed=False):
+        yield Assignment(from1, to1), Assignment(from2, to2)
+
+
+@generator(day=4, default_scale=1000)
+def generate_assignment_pairs(out: TextIO, scale: int, rng: Random):
+    """Writes `scale` pairs of section assignments"""
+    for _ in range(scale):
+        sections = []
+        for _ in range(2):
+            start = rng.randint(1, 99)
+            sections.append(f"{start}-{rng.randint(start, 99)}")
+        out.write(f"{sections[0]},{sections[1]}\n")
 
 
 @challenge(day=4)
@@ -189,13 +189,14 @@ The sum of these signal strengths is 13140.
 Find the signal strength during the 20th, 60th, 100th, 140th, 180th, and 220th cycles. What is the sum of these six signal strengths?
 """
 
-from typing import Iterable, Iterator, List, Optional
+from random import Random
+from typing import Iterable, Iterator, List, Optional, TextIO
 
-from . import challenge, Path
+from . import challenge, generator, Path
 
 
 def parse(path: Path) -> Iterator[Optional[int]]:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         for line in f:
             line = line.strip()
             if line == "noop":
@@ -214,6 +215,27 @@ def simulate(opcodes: Iterable[Optional[int]]) -> Iterator[int]:
     yield x
 
 
+@generator(day=10, default_scale=240)
+def generate_program(out: TextIO, scale: int, rng: Random):
+    """
+    Writes a program that runs for `scale` cycles.
+
+    Only the default scale of 240 cycles exactly fills the CRT in part two.
+    """
+    x = 1
+    cycles = 0
+    while cycles < scale:
+        if cycles + 1 == scale or rng.random() < 0.3:
+            out.write("noop\n")
+            cycles += 1
+        else:
+            # keep the sprite on the screen
+            value = rng.randint(max(-10, -1 - x), min(10, CRT_WIDTH - x))
+            out.write(f"addx {value}\n")
+            x += value
+            cycles += 2
+
+
 @challenge(day=10)
 def signal_strengths(path: Path) -> int:
     return sum(
@@ -1,55 +1,312 @@
 import argparse
+from functools import partial
+from importlib import import_module
+import os
 from pathlib import Path
 import sys
-from tempfile import NamedTemporaryFile
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
 
-from . import CHALLENGES
+from . import CHALLENGES, parse_snapshots, REFERENCE, shared_parsing
+from .log import add_verbosity_arguments, configure_verbosity
+from .puzzle_input import MemoryInput, PuzzleInput
+from .runner import default_input, DEFAULT_INPUTS_DIR, parse_size, PartResult
+
+# subcommand name -> the module whose `main(argv)` implements it; they are imported on demand
+COMMANDS: Dict[str, str] = {
+    "batch": "batch",
+    "bench": "bench",
+    "gen": "gen",
+    "scale": "scaling",
+    "serve": "serve",
+}
+
+CACHE_ENV_VAR = "AOC2022_CACHE"
+SNAPSHOTS_ENV_VAR = "AOC2022_SNAPSHOTS"
+
+
+def enabled_by_environment(env_var: str) -> bool:
+    return os.environ.get(env_var, "").lower() in ("1", "true", "yes", "on")
+
+
+def open_cache(args: argparse.Namespace):
+    """Returns a `ResultCache` if caching was requested, otherwise `None`"""
+    enabled = args.cache
+    if enabled is None:
+        enabled = args.refresh or enabled_by_environment(CACHE_ENV_VAR)
+    if not enabled:
+        return None
+    # the cache module is only imported when it is used to keep startup fast
+    from .cache import ResultCache
+    return ResultCache(directory=args.cache_dir)
+
+
+def open_snapshots(args: argparse.Namespace):
+    """Returns a `SnapshotCache` if parsed-input snapshots were requested, otherwise `None`"""
+    enabled = args.snapshots
+    if enabled is None:
+        enabled = enabled_by_environment(SNAPSHOTS_ENV_VAR)
+    if not enabled:
+        return None
+    from .snapshots import SnapshotCache
+    return SnapshotCache(directory=args.cache_dir, refresh=args.refresh)
+
+
+def run_all(args: argparse.Namespace) -> int:
+    from .runner import run_parallel
+
+    cache = open_cache(args)
+    tasks: List[Tuple[int, int, Path]] = []
+    cache_keys: Dict[Tuple[int, int], str] = {}
+    results: List[PartResult] = []
+
+    def on_result(result: PartResult):
+        if result.cached:
+            status = " (cached)"
+        elif result.exceeded is not None:
+            status = f" after exceeding its {result.exceeded} budget"
+        elif not result.succeeded:
+            status = " with an error"
+        else:
+            status = ""
+        sys.stderr.write(f"Finished day {result.day} part {result.part} ({result.name}) in {result.duration:.2f}s"
+                         f"{status}\n")
+        sys.stderr.flush()
+
+    for day in CHALLENGES:
+        path = default_input(day, args.inputs)
+        if not path.exists():
+            sys.stderr.write(f"Skipping day {day}: {path} does not exist\n")
+            continue
+        # use the part names from the manifest so that only the workers need to import the challenge modules
+        for part, name in sorted(CHALLENGES.part_names(day).items()):
+            if cache is not None:
+                key = cache.key(day, part, path, args.impl)
+                cached = None if args.refresh else cache.get(key)
+                if cached is not None:
+                    result = PartResult(day=day, part=part, name=name, answer=cached.answer,
+                                        duration=cached.duration, cached=True)
+                    on_result(result)
+                    results.append(result)
+                    continue
+                cache_keys[(day, part)] = key
+            tasks.append((day, part, path))
+
+    computed = run_parallel(tasks, jobs=args.jobs, on_result=on_result, timeout=args.timeout,
+                            max_memory=args.max_memory, impl=args.impl)
+    if cache is not None:
+        for result in computed:
+            if result.succeeded:
+                cache.put(cache_keys[(result.day, result.part)], day=result.day, part=result.part, name=result.name,
+                          answer=result.answer, duration=result.duration)
+    results = sorted(results + computed, key=lambda r: (r.day, r.part))
+
+    if args.output == "-":
+        outfile = sys.stdout
+    else:
+        outfile = open(args.output, "w")
+    try:
+        for result in results:
+            outfile.write(f"{result!s}\n")
+    finally:
+        if outfile != sys.stdout:
+            outfile.close()
+
+    return int(any(not result.succeeded for result in results))
+
+
+def run_parts(
+        day: int,
+        parts: Iterable[Tuple[int, Callable[[PuzzleInput], Any]]],
+        infile: PuzzleInput,
+        outfile: TextIO,
+        cache=None,
+        refresh: bool = False,
+        instruments: Sequence = (),
+        timeout: Optional[float] = None,
+        max_memory: Optional[int] = None,
+        impl: str = REFERENCE
+) -> bool:
+    """
+    Runs and outputs the result of each part, returning whether they all succeeded.
+
+    Each of the `instruments` must have a `run(label, call)` method that calls and returns the result of `call()`;
+    they are used to wrap the challenge function for profiling. If a `timeout` or `max_memory` budget is given, each
+    part is run in a child process that enforces it, and a part that fails is reported without stopping the others.
+    `parts` should already be the `impl` implementations; it is used to run the parts in child processes and to key the
+    cache.
+    """
+    interactive = sys.stderr.isatty() and outfile.isatty()
+    succeeded = True
+    for part, func in parts:
+        cache_key: Optional[str] = None
+        cached = None
+        if cache is not None:
+            cache_key = cache.key(day, part, infile, impl)
+            if not refresh and not instruments:
+                cached = cache.get(cache_key)
+        if cached is not None:
+            if interactive:
+                sys.stderr.write(f"Using the cached result for {func.__name__}...\n")
+            result = cached.answer
+        else:
+            if interactive:
+                sys.stderr.write(f"Running {func.__name__}...\n")
+            start = time.perf_counter()
+            if timeout is not None or max_memory is not None:
+                from .runner import run_limited_part
+                part_result = run_limited_part(day, part, infile, timeout=timeout, max_memory=max_memory, impl=impl)
+                if not part_result.succeeded:
+                    sys.stderr.write(f"{part_result!s}\n")
+                    succeeded = False
+                    continue
+                result = part_result.answer
+            else:
+                call: Callable[[], Any] = partial(func, infile)
+                for instrument in instruments:
+                    call = partial(instrument.run, f"day{day}_part{part}:{func.__name__}", call)
+                result = call()
+            if cache is not None:
+                cache.put(cache_key, day=day, part=part, name=func.__name__, answer=str(result),
+                          duration=time.perf_counter() - start)
+        if interactive:
+            sys.stderr.write(f"Part {part}: ")
+            sys.stderr.flush()
+        outfile.write(f"{result!s}\n")
+        outfile.flush()
+    return succeeded
 
 
 def main(argv: [str]) -> int:
-    parser = argparse.ArgumentParser(description="Evan Sultanik's Advent of Code Solutions")
+    if len(argv) > 1 and argv[1] in COMMANDS:
+        return import_module(f"{__package__}.{COMMANDS[argv[1]]}").main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Evan Sultanik's Advent of Code Solutions",
+        epilog=f"additional commands: {', '.join(COMMANDS)} (run `aoc2022 COMMAND --help` for details)"
+    )
 
     parser.add_argument("INPUT", type=Path, nargs="?", default=Path("-"),
                         help="path to the input file (default is STDIN)")
     challenge_group = parser.add_mutually_exclusive_group(required=True)
     challenge_group.add_argument("--day", "-d", type=int, choices=sorted(CHALLENGES.keys()), help="the day number")
     challenge_group.add_argument("--list", "-l", action="store_true", help="list all available challenges")
+    challenge_group.add_argument("--all", "-a", action="store_true",
+                                 help="run every part of every day in parallel, reading each day's input from "
+                                      "INPUTS/dayN.txt")
     parser.add_argument("--part", "-p", type=int, default=-1, help="the part of the challenge to run; if the part is "
                                                                    "negative, then all parts for the given day will be "
                                                                    "run (default=-1)")
     parser.add_argument("--output", "-o", type=str, help="path to the output file, or '-' for STDOUT (the default)",
                         default="-")
+    parser.add_argument("--impl", type=str, default=REFERENCE,
+                        help="run this implementation of each part, for parts that have one, rather than the "
+                             f"reference implementation (default={REFERENCE}); see --list")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="the number of worker processes to use with --all (default is the number of CPUs)")
+    parser.add_argument("--inputs", type=Path, default=DEFAULT_INPUTS_DIR,
+                        help=f"the directory containing the dayN.txt inputs for --all (default={DEFAULT_INPUTS_DIR!s})")
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=None,
+                        help="reuse answers cached from previous runs with the same input and solver source; this "
+                             "is off by default unless the AOC2022_CACHE environment variable is set")
+    parser.add_argument("--refresh", action="store_true",
+                        help="recompute the answers and overwrite any cached results (implies --cache)")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="the cache directory (default is $AOC2022_CACHE_DIR or ~/.cache/aoc2022)")
+    parser.add_argument("--snapshots", action=argparse.BooleanOptionalAction, default=None,
+                        help="reuse the parsed input saved by a previous run of the same day with the same input, "
+                             "even if the parts have changed since; this is off by default unless the "
+                             "AOC2022_SNAPSHOTS environment variable is set, and --refresh rebuilds the snapshots")
+    budget_group = parser.add_argument_group("budgets", "parts are run in separate processes to enforce these limits")
+    budget_group.add_argument("--timeout", type=float, default=None,
+                              help="kill any part that runs for longer than this many seconds")
+    budget_group.add_argument("--max-memory", type=str, default=None,
+                              help="limit the address space of each part's process to this many bytes; suffixes "
+                                   "like 512M and 2G are accepted")
+    profile_group = parser.add_argument_group("profiling")
+    profile_group.add_argument("--profile", action="store_true",
+                               help="profile each part and print its hottest functions to STDERR")
+    profile_group.add_argument("--profile-top", type=int, default=20,
+                               help="the number of functions to list in each --profile report (default=20)")
+    profile_group.add_argument("--memory", action="store_true",
+                               help="trace each part's allocations and print its peak memory usage and top allocation "
+                                    "sites to STDERR")
+    profile_group.add_argument("--memory-top", type=int, default=10,
+                               help="the number of allocation sites to list in each --memory report (default=10)")
+    profile_group.add_argument("--flamegraph", type=str, default=None,
+                               help="with --profile, also sample the call stacks and write them to this path in the "
+                                    "collapsed-stack format used by flamegraph tools")
+    profile_group.add_argument("--stats", action="store_true",
+                               help="print each part's hot-path counters (e.g., states expanded and pruned) to STDERR")
+    profile_group.add_argument("--stats-file", type=Path, default=None,
+                               help="with --stats, also rewrite the current counters to this path as JSON every "
+                                    "--stats-interval seconds so that a long run can be watched")
+    profile_group.add_argument("--stats-interval", type=float, default=1.0,
+                               help="the number of seconds between writes to --stats-file (default=1.0)")
+
+    add_verbosity_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv[1:])
+    configure_verbosity(args)
 
     if hasattr(args, "list") and args.list:
-        for day, parts in sorted(CHALLENGES.items()):
+        for day in CHALLENGES:
+            parts = CHALLENGES.part_names(day)
             if not parts:
                 continue
             print(f"Day {day}:")
-            for i, part in parts.items():
-                print(f"\tPart {i}:\t{part.__name__}")
+            implementation_names = CHALLENGES.implementation_names(day)
+            for i, name in sorted(parts.items()):
+                alternatives = implementation_names.get(i)
+                if alternatives:
+                    name = f"{name}\t(also: {', '.join(alternatives)})"
+                print(f"\tPart {i}:\t{name}")
         return 0
+    elif args.flamegraph is not None and not args.profile:
+        parser.error("--flamegraph requires --profile")
+    elif args.stats_file is not None and not args.stats:
+        parser.error("--stats-file requires --stats")
+    elif args.stats_interval <= 0:
+        parser.error("--stats-interval must be positive")
+    elif args.timeout is not None and args.timeout <= 0:
+        parser.error("--timeout must be positive")
+    elif (args.profile or args.memory or args.stats) and (args.timeout is not None or args.max_memory is not None):
+        parser.error("--profile, --memory, and --stats cannot be used with --timeout or --max-memory")
+
+    if args.max_memory is not None:
+        try:
+            args.max_memory = parse_size(args.max_memory)
+        except ValueError as e:
+            parser.error(f"--max-memory: {e!s}")
+
+    if args.all:
+        if args.profile or args.memory or args.stats:
+            parser.error("--profile, --memory, and --stats cannot be used with --all")
+        elif args.INPUT.name != "-":
+            parser.error("INPUT cannot be used with --all; the inputs are read from --inputs")
+        elif args.jobs is not None and args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        return run_all(args)
 
     if args.day not in CHALLENGES:
         sys.stderr.write(f"Unknown day: {args.day}\n")
         return 1
 
     if args.part < 0:
-        parts = sorted(CHALLENGES[args.day].items())
+        part_numbers = sorted(CHALLENGES[args.day])
     elif args.part not in CHALLENGES[args.day]:
         sys.stderr.write(f"Day {args.day} does not have part {args.part}\n")
         return 1
     else:
-        parts = [(args.part, CHALLENGES[args.day][args.part])]
+        part_numbers = [args.part]
+    if args.impl != REFERENCE and not any(args.impl in CHALLENGES.implementations(args.day, p) for p in part_numbers):
+        sys.stderr.write(f"Day {args.day} does not have a {args.impl!r} implementation\n")
+        return 1
+    parts = [(p, CHALLENGES.implementation(args.day, p, args.impl)) for p in part_numbers]
 
-    delete_on_exit = False
     if args.INPUT.name == "-":
-        tmpfile = NamedTemporaryFile("w", delete=False)
-        tmpfile.write(sys.stdin.read())
-        tmpfile.close()
-        infile = Path(tmpfile.name)
-        delete_on_exit = True
+        # read STDIN exactly once and hand the buffer to the challenges rather than spilling it to a temp file
+        infile: PuzzleInput = MemoryInput.from_stream(sys.stdin.buffer, name="<stdin>")
     else:
         infile = args.INPUT
 
@@ -58,21 +315,33 @@ def main(argv: [str]) -> int:
     else:
         outfile = open(args.output, "w")
 
+    instruments = []
+    if args.stats:
+        from .counters import StatsReporter
+        instruments.append(StatsReporter(dump_path=args.stats_file, interval=args.stats_interval))
+    if args.profile:
+        from .profiling import Profiler
+        profiler = Profiler(top=args.profile_top, collapsed_stacks=args.flamegraph is not None)
+        instruments.append(profiler)
+    if args.memory:
+        from .profiling import MemoryTracer
+        # the tracer is added last so that it wraps the profiler and excludes the profiler's own allocations
+        instruments.append(MemoryTracer(top=args.memory_top))
+
     try:
+        cache = open_cache(args)
         if sys.stderr.isatty() and outfile.isatty():
             sys.stderr.write(f"Day {args.day}\n")
-        for part, func in parts:
-            if sys.stderr.isatty() and outfile.isatty():
-                sys.stderr.write(f"Running {func.__name__}...\n")
-            result = func(infile)
-            if sys.stderr.isatty() and outfile.isatty():
-                sys.stderr.write(f"Part {part}: ")
-                sys.stderr.flush()
-            outfile.write(f"{result!s}\n")
-            outfile.flush()
+        with shared_parsing(), parse_snapshots(open_snapshots(args)):
+            succeeded = run_parts(args.day, parts, infile, outfile, cache=cache, refresh=args.refresh,
+                                  instruments=instruments, timeout=args.timeout, max_memory=args.max_memory,
+                                  impl=args.impl)
+        if args.flamegraph is not None:
+            with open(args.flamegraph, "w") as f:
+                profiler.write_collapsed(f)
 
     finally:
-        if delete_on_exit:
-            infile.unlink()
         if outfile != sys.stdout:
             outfile.close()
+
+    return int(not succeeded)
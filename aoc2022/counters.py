@@ -0,0 +1,125 @@
+"""
+Named counters and gauges for the challenges' hot paths.
+
+Counting is off unless a `StatsReporter` (i.e., `--stats`) is running a part. When it is off, `add` and `high_water`
+return after a single global check, and challenges that would have to do extra work to compute a value should guard it
+with `counting()`:
+
+    if counting():
+        add("day20.positions_shifted", abs(new_index - current_index))
+
+Hot loops should accumulate into locals and `add` the totals once, as the searches in `search` do. Loops that can run
+for a long time should also `add` what they have accumulated every `FLUSH_INTERVAL` iterations while `counting()`, so
+that `--stats-file` shows their progress.
+"""
+import json
+import os
+from pathlib import Path
+import sys
+from threading import Event, Thread
+import time
+from typing import Any, Callable, Dict, Optional, TextIO
+
+FLUSH_INTERVAL = 65536
+
+_ENABLED: bool = False
+_VALUES: Dict[str, int] = {}
+
+
+def counting() -> bool:
+    return _ENABLED
+
+
+def add(name: str, amount: int = 1):
+    """Adds `amount` to the counter `name`"""
+    if _ENABLED:
+        _VALUES[name] = _VALUES.get(name, 0) + amount
+
+
+def high_water(name: str, value: int):
+    """Raises the gauge `name` to `value` if `value` is greater than it"""
+    if _ENABLED and value > _VALUES.get(name, value - 1):
+        _VALUES[name] = value
+
+
+def snapshot() -> Dict[str, int]:
+    """Returns a copy of the current counters and gauges; it is safe to call this from another thread"""
+    return _VALUES.copy()
+
+
+class StatsDumper(Thread):
+    """Periodically writes the current counters to a JSON file from a background thread so that a run can be watched"""
+
+    def __init__(self, path: Path, label: str, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.path: Path = path
+        self.label: str = label
+        self.interval: float = interval
+        self.start_time: float = time.perf_counter()
+        self._stop_event: Event = Event()
+
+    def dump(self, finished: bool = False):
+        data = {
+            "part": self.label,
+            "elapsed": time.perf_counter() - self.start_time,
+            "finished": finished,
+            "stats": snapshot()
+        }
+        # write to a temporary file and then rename it so that a reader never sees a partial file
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.dump()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.dump(finished=True)
+
+
+class StatsReporter:
+    """
+    Enables the counters while a challenge function runs and prints them afterward.
+
+    If `dump_path` is provided, the counters are also written to it as JSON every `interval` seconds.
+    """
+
+    def __init__(self, dump_path: Optional[Path] = None, interval: float = 1.0, stream: TextIO = sys.stderr):
+        self.dump_path: Optional[Path] = dump_path
+        self.interval: float = interval
+        self.stream: TextIO = stream
+
+    def run(self, label: str, call: Callable[[], Any]) -> Any:
+        global _ENABLED
+        was_enabled = _ENABLED
+        previous_values = _VALUES.copy()
+        _VALUES.clear()
+        _ENABLED = True
+        dumper: Optional[StatsDumper] = None
+        if self.dump_path is not None:
+            dumper = StatsDumper(self.dump_path, label, interval=self.interval)
+            dumper.start()
+        try:
+            return call()
+        finally:
+            _ENABLED = was_enabled
+            if dumper is not None:
+                dumper.stop()
+            self.report(label, snapshot())
+            _VALUES.clear()
+            _VALUES.update(previous_values)
+
+    def report(self, label: str, values: Dict[str, int]):
+        self.stream.write(f"=== {label}: stats ===\n")
+        if not values:
+            self.stream.write("No stats were recorded\n")
+        width = max((len(name) for name in values), default=0)
+        for name, value in sorted(values.items()):
+            self.stream.write(f"{name:<{width}}  {value:>14,}\n")
+        self.stream.write("\n")
+        self.stream.flush()
@@ -0,0 +1,62 @@
+"""
+Extrapolating long-running simulations that eventually repeat.
+
+A simulation is described by a `step` function that advances it by one step and returns how much a tracked value (e.g.,
+a tower's height) changed, along with a `fingerprint` function that returns a compact, hashable summary of the
+simulation's current state. Once a fingerprint repeats, every later step repeats the earlier ones, so the value after
+any number of steps follows from the prefix sums of the values seen so far.
+"""
+from dataclasses import dataclass
+from typing import Callable, Hashable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Cycle:
+    start: int
+    """the number of steps before the simulation first enters its cycle"""
+    length: int
+    """the number of steps in one repetition of the cycle"""
+    totals: Tuple[int, ...]
+    """`totals[i]` is the tracked value after `i` steps, for `i` in `range(start + length + 1)`"""
+
+    @property
+    def cycle_delta(self) -> int:
+        """The change in the tracked value over one repetition of the cycle"""
+        return self.totals[self.start + self.length] - self.totals[self.start]
+
+    def value_after(self, steps: int) -> int:
+        """Returns the tracked value after `steps` steps, in constant time"""
+        if steps < 0:
+            raise ValueError(f"Invalid number of steps: {steps}")
+        elif steps < len(self.totals):
+            return self.totals[steps]
+        cycles, remainder = divmod(steps - self.start, self.length)
+        return self.totals[self.start + remainder] + cycles * self.cycle_delta
+
+
+def find_cycle(
+        step: Callable[[], int],
+        fingerprint: Callable[[], Hashable],
+        initial_value: int = 0,
+        max_steps: Optional[int] = None
+) -> Cycle:
+    """
+    Runs a simulation until its fingerprint repeats.
+
+    `fingerprint` is called before each step, and the fingerprints are indexed in a dict, so they should be small
+    (e.g., integers or short tuples of integers) rather than copies of the whole state.
+
+    Raises a `ValueError` if no cycle is found within `max_steps` steps.
+    """
+    seen = {}
+    totals: List[int] = [initial_value]
+    while True:
+        state = fingerprint()
+        start = seen.get(state)
+        if start is not None:
+            return Cycle(start=start, length=len(totals) - 1 - start, totals=tuple(totals))
+        steps = len(totals) - 1
+        if max_steps is not None and steps >= max_steps:
+            raise ValueError(f"No cycle was found within {max_steps} steps")
+        seen[state] = steps
+        totals.append(totals[-1] + step())
@@ -112,9 +112,10 @@ Determine which pairs of packets are already in the right order. What is the sum
 from functools import cmp_to_key
 from itertools import zip_longest
 import json
-from typing import Iterator, List, Optional, Tuple, Union
+from random import Random
+from typing import Iterator, List, Optional, TextIO, Tuple, Union
 
-from . import challenge, Path
+from . import challenge, generator, Path
 
 
 Packet = List[Union[int, "Packet"]]
@@ -122,7 +123,7 @@ Packet = List[Union[int, "Packet"]]
 
 def load(path: Path) -> Iterator[Tuple[Packet, Packet]]:
     last_packet: Optional[Packet] = None
-    with open(path, "r") as f:
+    with path.open("r") as f:
         for line in f:
             line = line.strip()
             if not line:
@@ -167,6 +168,25 @@ def compare(left: Packet, right: Packet) -> int:
     return 0
 
 
+def generate_packet(rng: Random, depth: int = 0) -> str:
+    items = []
+    for _ in range(rng.randint(0, 5)):
+        if depth < 4 and rng.random() < 0.3:
+            items.append(generate_packet(rng, depth + 1))
+        else:
+            items.append(str(rng.randint(0, 10)))
+    return f"[{','.join(items)}]"
+
+
+@generator(day=13, default_scale=150)
+def generate_packet_pairs(out: TextIO, scale: int, rng: Random):
+    """Writes `scale` pairs of packets"""
+    for pair in range(scale):
+        if pair > 0:
+            out.write("\n")
+        out.write(f"{generate_packet(rng)}\n{generate_packet(rng)}\n")
+
+
 @challenge(day=13)
 def in_order_pairs(path: Path) -> int:
     return sum(
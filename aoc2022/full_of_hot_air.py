@@ -95,8 +95,10 @@ The Elves are starting to get cold. What SNAFU number do you supply to Bob's con
 """
 
 from math import lcm
+from random import Random
+from typing import TextIO
 
-from . import challenge, Path
+from . import challenge, generator, Path
 
 
 class SNAFU(int):
@@ -171,9 +173,16 @@ class SNAFU(int):
         return cls(value)
 
 
+@generator(day=25, default_scale=114)
+def generate_fuel_requirements(out: TextIO, scale: int, rng: Random):
+    """Writes `scale` SNAFU numbers"""
+    for _ in range(scale):
+        out.write(f"{SNAFU.to_string(rng.randint(1, 10 ** rng.randint(1, 15)))}\n")
+
+
 @challenge(day=25)
 def snafu_sum(path: Path) -> str:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         s = sum(
             SNAFU.parse(line)
             for line in f
@@ -0,0 +1,60 @@
+import argparse
+from io import StringIO
+from random import Random
+import sys
+from typing import List, Optional, TextIO
+
+from . import CHALLENGES, Generator, GENERATORS
+
+
+def get_generator(day: int) -> Generator:
+    CHALLENGES.load(day)
+    if day not in GENERATORS:
+        raise KeyError(f"Day {day} does not have an input generator")
+    return GENERATORS[day]
+
+
+def generate(day: int, out: TextIO, scale: Optional[int] = None, seed: int = 0):
+    """Writes a random input for `day` to `out`; the same day, scale, and seed always produce the same input"""
+    gen = get_generator(day)
+    if scale is None:
+        scale = gen.default_scale
+    gen.function(out, scale, Random(seed))
+
+
+def generate_string(day: int, scale: Optional[int] = None, seed: int = 0) -> str:
+    out = StringIO()
+    generate(day, out, scale=scale, seed=seed)
+    return out.getvalue()
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="aoc2022 gen",
+                                     description="Generate a random input in the puzzle's format for one day")
+
+    parser.add_argument("--day", "-d", type=int, required=True, choices=sorted(CHALLENGES.keys()),
+                        help="the day number")
+    parser.add_argument("--scale", "-s", type=int, default=None,
+                        help="the size of the input, whose meaning depends on the day (e.g., the number of rows in "
+                             "a grid); the default is about the size of a real puzzle input")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed (default=0)")
+    parser.add_argument("--output", "-o", type=str, default="-",
+                        help="path to the output file, or '-' for STDOUT (the default)")
+
+    args = parser.parse_args(argv[1:])
+
+    if args.scale is not None and args.scale < 1:
+        parser.error("--scale must be positive")
+
+    try:
+        get_generator(args.day)
+    except KeyError as e:
+        sys.stderr.write(f"{e.args[0]}\n")
+        return 1
+
+    if args.output == "-":
+        generate(args.day, sys.stdout, scale=args.scale, seed=args.seed)
+    else:
+        with open(args.output, "w") as outfile:
+            generate(args.day, outfile, scale=args.scale, seed=args.seed)
+    return 0
@@ -0,0 +1,158 @@
+"""
+A dense two-dimensional grid of small integers stored row-major in a flat `bytearray`.
+
+Cells are addressed by a single integer index, so moving to a neighbor is an addition of one of the precomputed
+`offsets` rather than the construction of a new coordinate object. A grid may be surrounded by `padding` cells of a
+`border` value; with at least one cell of padding, a neighbor of any interior cell is always a valid index, so a
+search can treat the border like any other (e.g., impassable) cell instead of checking bounds.
+"""
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from .puzzle_input import mapped, PuzzleInput
+
+
+class Grid:
+    def __init__(self, width: int, height: int, fill: int = 0, padding: int = 0, border: Optional[int] = None):
+        if width < 0 or height < 0:
+            raise ValueError(f"Invalid grid dimensions: {width}x{height}")
+        self.width: int = width
+        self.height: int = height
+        self.padding: int = padding
+        self.stride: int = width + 2 * padding
+        if border is None:
+            border = fill
+        self.border: int = border
+        self.cells: bytearray = bytearray([border]) * (self.stride * (height + 2 * padding))
+        if fill != border:
+            row = bytes([fill]) * width
+            for r in range(height):
+                start = self.index(r, 0)
+                self.cells[start:start + width] = row
+        # north, east, south, west
+        self.offsets: Tuple[int, int, int, int] = (-self.stride, 1, self.stride, -1)
+        self.diagonal_offsets: Tuple[int, int, int, int] = (
+            -self.stride - 1, -self.stride + 1, self.stride + 1, self.stride - 1
+        )
+
+    @classmethod
+    def from_rows(
+            cls,
+            rows: Iterable[bytes],
+            padding: int = 0,
+            border: int = 0,
+            translate: Optional[bytes] = None
+    ) -> "Grid":
+        """
+        Builds a grid from rows of equal length.
+
+        If provided, `translate` is a 256-byte table (see `bytes.maketrans`) applied to each row as it is copied.
+        """
+        rows = list(rows)
+        width = len(rows[0]) if rows else 0
+        grid = cls(width, len(rows), padding=padding, border=border)
+        for r, row in enumerate(rows):
+            if len(row) != width:
+                raise ValueError(f"Row {r} has {len(row)} cells but the first row has {width}")
+            if translate is not None:
+                row = row.translate(translate)
+            start = grid.index(r, 0)
+            grid.cells[start:start + width] = row
+        return grid
+
+    @classmethod
+    def load(
+            cls,
+            path: PuzzleInput,
+            padding: int = 0,
+            border: int = 0,
+            translate: Optional[bytes] = None
+    ) -> "Grid":
+        """Loads a grid with one cell per byte of each non-empty line of `path`"""
+        with mapped(path) as data:
+            rows = [line.rstrip(b"\r") for line in bytes(data).split(b"\n") if line.strip()]
+        return cls.from_rows(rows, padding=padding, border=border, translate=translate)
+
+    def index(self, row: int, col: int) -> int:
+        return (row + self.padding) * self.stride + col + self.padding
+
+    def position(self, index: int) -> Tuple[int, int]:
+        row, col = divmod(index, self.stride)
+        return row - self.padding, col - self.padding
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.height and 0 <= col < self.width
+
+    def get(self, row: int, col: int) -> int:
+        return self.cells[self.index(row, col)]
+
+    def set(self, row: int, col: int, value: int):
+        self.cells[self.index(row, col)] = value
+
+    def __getitem__(self, index: int) -> int:
+        return self.cells[index]
+
+    def __setitem__(self, index: int, value: int):
+        self.cells[index] = value
+
+    def row(self, row: int) -> bytes:
+        start = self.index(row, 0)
+        return bytes(self.cells[start:start + self.width])
+
+    def column(self, col: int) -> bytes:
+        start = self.index(0, col)
+        return bytes(self.cells[start:start + self.height * self.stride:self.stride])
+
+    def row_indices(self, row: int) -> range:
+        start = self.index(row, 0)
+        return range(start, start + self.width)
+
+    def column_indices(self, col: int) -> range:
+        start = self.index(0, col)
+        return range(start, start + self.height * self.stride, self.stride)
+
+    def indices(self) -> Iterator[int]:
+        """Iterates over the indices of the interior (i.e., non-padding) cells in row-major order"""
+        for row in range(self.height):
+            yield from self.row_indices(row)
+
+    def find(self, value: int, start: int = 0) -> int:
+        """Returns the index of the first cell at or after `start` with `value`, or -1 if there is none"""
+        return self.cells.find(bytes([value]), start)
+
+    def neighbors(self, index: int) -> Iterator[int]:
+        """
+        Iterates over the orthogonal neighbors of `index`.
+
+        Only grids with padding can skip the bounds checks, so unpadded grids check each neighbor's position.
+        """
+        if self.padding:
+            for offset in self.offsets:
+                yield index + offset
+        else:
+            row, col = self.position(index)
+            if row > 0:
+                yield index - self.stride
+            if col < self.width - 1:
+                yield index + 1
+            if row < self.height - 1:
+                yield index + self.stride
+            if col > 0:
+                yield index - 1
+
+    def copy(self) -> "Grid":
+        grid = self.__class__.__new__(self.__class__)
+        grid.__dict__.update(self.__dict__)
+        grid.cells = bytearray(self.cells)
+        return grid
+
+    def render(self, symbol: Callable[[int], str] = chr) -> str:
+        return "\n".join(
+            "".join(symbol(value) for value in self.row(row))
+            for row in range(self.height)
+        )
+
+    def __len__(self):
+        return self.width * self.height
+
+    def __str__(self):
+        return self.render()
@@ -1,8 +1,10 @@
-from typing import Iterable, List, Optional
+from random import Random
+from typing import Iterable, List, Optional, TextIO
 
-from tqdm import trange
-
-from . import challenge, Path
+from . import challenge, generator, Path
+from .counters import add, counting
+from .log import progress_range
+from .puzzle_input import integers
 
 
 class Ciphertext:
@@ -23,6 +25,8 @@ class Ciphertext:
         current_index = self.indexes[original_index]
         value = self.sequence[current_index]
         new_index = (current_index + value) % (len(self.sequence) - 1)
+        if counting():
+            add("day20.positions_shifted", abs(new_index - current_index))
         # if new_index == 0:
         #     print(f"{value} moves before {self.sequence[0]}")
         # else:
@@ -45,17 +49,28 @@ class Ciphertext:
         # print("Initial arrangement:")
         # print(", ".join(map(str, self.sequence)))
         # print("")
-        for _ in trange(num_mixings, desc="mixing", leave=False, unit="mixes"):
-            for i in trange(len(self.indexes), leave=False, unit="indexes"):
+        for _ in progress_range(num_mixings, desc="mixing", leave=False, unit="mixes"):
+            for i in progress_range(len(self.indexes), leave=False, unit="indexes"):
                 self.mix(i)
                 # print(", ".join(map(str, self.sequence)))
                 # print("")
+        add("day20.mixes", num_mixings * len(self.indexes))
+
+
+@generator(day=20, default_scale=5000)
+def generate_encrypted_file(out: TextIO, scale: int, rng: Random):
+    """Writes an encrypted file of `scale` numbers, exactly one of which is zero"""
+    zero_index = rng.randrange(scale)
+    for i in range(scale):
+        if i == zero_index:
+            out.write("0\n")
+        else:
+            out.write(f"{rng.choice((-1, 1)) * rng.randint(1, 10000)}\n")
 
 
 @challenge(day=20)
 def grove_coordinates(path: Path) -> int:
-    with open(path, "r") as f:
-        ciphertext = Ciphertext(map(int, f))
+    ciphertext = Ciphertext(integers(path))
     ciphertext.decrypt()
     final_zero_index = ciphertext.indexes[ciphertext.zero_index]
     return ciphertext[final_zero_index + 1000] + ciphertext[final_zero_index + 2000] \
@@ -111,8 +126,7 @@ Apply the decryption key and mix your encrypted file ten times. What is the sum
 
 @challenge(day=20)
 def with_decryption_key(path: Path) -> int:
-    with open(path, "r") as f:
-        ciphertext = Ciphertext((int(line) * 811589153 for line in f))
+    ciphertext = Ciphertext(n * 811589153 for n in integers(path))
     ciphertext.decrypt(num_mixings=10)
     final_zero_index = ciphertext.indexes[ciphertext.zero_index]
     return ciphertext[final_zero_index + 1000] + ciphertext[final_zero_index + 2000] \
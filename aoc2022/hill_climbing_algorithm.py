@@ -29,176 +29,93 @@ This path reaches the goal in 31 steps, the fewest possible.
 What is the fewest steps required to move from your current position to the location that should get the best signal?
 """
 
-from enum import Enum
-import heapq
-from typing import Iterator, List, Optional, Set, Tuple
-
-from . import challenge, Path
-
-
-class Move(Enum):
-    UP = "^"
-    LEFT = "<"
-    DOWN = "v"
-    RIGHT = ">"
-
-
-class State:
-    def __init__(self, height_map: List[str], row: Optional[int] = None, col: Optional[int] = None):
-        self.height_map: List[str] = height_map
-        if row is None or col is None:
-            for i, r in enumerate(height_map):
-                found = False
-                for j, c in enumerate(r):
-                    if c == "S":
-                        self.row: int = i
-                        self.col: int = j
-                        found = True
-                        break
-                if found:
-                    break
-            else:
-                raise ValueError(f"No start position in height map!")
-        else:
-            self.row = row
-            self.col = col
-
-    def __hash__(self):
-        return hash((self.row, self.col))
-
-    def __eq__(self, other):
-        return isinstance(other, State) and other.row == self.row and other.col == self.col
-
-    @property
-    def elevation(self) -> int:
-        c = self.height_map[self.row][self.col]
-        if c == "S":
-            c = "a"
-        elif c == "E":
-            c = "z"
-        return ord(c) - ord("a")
-
-    def successors(self) -> Iterator[Tuple[Move, "State"]]:
-        for move in Move:
-            try:
-                yield move, self.apply(move)
-            except ValueError:
-                pass
-
-    def apply(self, move: Move) -> "State":
-        to_row = self.row
-        to_col = self.col
-        match move:
-            case Move.UP:
-                to_row -= 1
-            case Move.DOWN:
-                to_row += 1
-            case Move.RIGHT:
-                to_col += 1
-            case Move.LEFT:
-                to_col -= 1
-        if to_row < 0 or to_row >= len(self.height_map) or to_col < 0 or to_col >= len(self.height_map[to_row]):
-            raise ValueError(f"Invalid end position for {move!r}: (row={to_row}, col={to_col})")
-        start_elevation = self.elevation
-        next_state = State(self.height_map, to_row, to_col)
-        next_elevation = next_state.elevation
-        if next_elevation > start_elevation + 1:
-            raise ValueError(f"Move {move!r} is up too high an elevation: {start_elevation} -> {next_elevation}")
-        return next_state
-
-
-class SearchNode:
-    def __init__(self, state: State, parent: Optional["SearchNode"] = None, previous_move: Optional[Move] = None):
-        self.state: State = state
-        if parent is None:
-            self.parent: Optional[SearchNode] = None
-            self.previous_move: Optional[Move] = None
-            self.path_cost: int = 0
-            for i, r in enumerate(state.height_map):
-                found = False
-                for j, c in enumerate(r):
-                    if c == "E":
-                        self.goal: Tuple[int, int] = (i, j)
-                        found = True
-                        break
-                if found:
-                    break
-            else:
-                raise ValueError(f"No goal position in height map!")
-        else:
-            self.previous_move = previous_move
-            self.parent = parent
-            self.goal = parent.goal
-            self.path_cost = parent.path_cost + 1
-        self.heuristic = abs(self.state.row - self.goal[0]) + abs(self.state.col - self.goal[1])
-
-    @property
-    def is_goal(self) -> bool:
-        return self.state.row == self.goal[0] and self.state.col == self.goal[1]
-
-    @property
-    def f_cost(self) -> int:
-        return self.path_cost + self.heuristic
-
-    def __lt__(self, other):
-        return isinstance(other, SearchNode) and self.f_cost < other.f_cost
-
-    def __eq__(self, other):
-        return isinstance(other, SearchNode) and self.state == other.state and self.path_cost == other.path_cost
-
-    def __hash__(self):
-        return hash((self.state, self.path_cost))
-
-
-def solve(*states: State) -> Iterator[SearchNode]:
-    queue: List[SearchNode] = []
-    for state in states:
-        heapq.heappush(queue, SearchNode(state))
-    solution: Optional[SearchNode] = None
-    history: Set[SearchNode] = set(queue)
-    i = 0
-    while queue:
-        i += 1
-        node = heapq.heappop(queue)
-        if i % 10000 == 0:
-            print(f"Iteration: {i}\tQueue: {len(queue)}\tBest so far: {node.f_cost}")
-        if node.is_goal:
-            solution = node
-            break
-        for move, successor in node.state.successors():
-            next_node = SearchNode(successor, parent=node, previous_move=move)
-            if next_node not in history:
-                history.add(next_node)
-                heapq.heappush(queue, next_node)
+from random import Random
+from typing import Iterable, Iterator, Optional, TextIO
+
+from . import challenge, generator, Path
+from .grid import Grid
+from .log import enabled, log, VERBOSE
+from .search import bfs, SearchStats
+
+
+# every byte other than a height is unreachable, including the padding around the map
+ELEVATIONS: bytes = bytes(
+    ord(c) - ord("a") if "a" <= c <= "z" else 0 if c == "S" else 25 if c == "E" else 255
+    for c in map(chr, range(256))
+)
+
+
+class HeightMap(Grid):
+    """The elevation of each square (0 through 25), surrounded by a border of unreachable squares"""
+
+    start: int
+    goal: int
+
+    @classmethod
+    def load_heights(cls, path: Path) -> "HeightMap":
+        height_map: HeightMap = cls.load(path, padding=1)  # type: ignore
+        height_map.start = height_map.find(ord("S"))
+        if height_map.start < 0:
+            raise ValueError(f"No start position in height map!")
+        height_map.goal = height_map.find(ord("E"))
+        if height_map.goal < 0:
+            raise ValueError(f"No goal position in height map!")
+        height_map.cells = height_map.cells.translate(ELEVATIONS)
+        return height_map
+
+    def successors(self, index: int) -> Iterator[int]:
+        max_elevation = self.cells[index] + 1
+        cells = self.cells
+        for offset in self.offsets:
+            # the border is too high to ever be climbed, so no bounds check is necessary
+            if cells[index + offset] <= max_elevation:
+                yield index + offset
+
+
+def solve(height_map: HeightMap, starts: Iterable[int]) -> int:
+    """Returns the fewest steps from any of `starts` to the goal"""
+    goal = height_map.goal
+    stats: Optional[SearchStats] = SearchStats() if enabled(VERBOSE) else None
+    solution = bfs(starts, height_map.successors, goal.__eq__, num_states=len(height_map.cells), stats=stats)
+    if stats is not None:
+        log(f"Search {stats!s}")
     if solution is None:
         raise ValueError("No solution!")
-    states: List[SearchNode] = []
-    while solution is not None:
-        states.append(solution)
-        solution = solution.parent
-    return reversed(states)
-
-
-def parse(path: Path) -> List[str]:
-    height_map: List[str] = []
-    with open(path, "r") as f:
-        for line in f:
-            height_map.append(line.strip())
-    return height_map
+    return solution[1]
+
+
+def parse(path: Path) -> HeightMap:
+    return HeightMap.load_heights(path)
+
+
+@generator(day=12, default_scale=41)
+def generate_height_map(out: TextIO, scale: int, rng: Random):
+    """Writes a height map with `scale` rows and four times as many columns"""
+    width = max(26, 4 * scale)
+    start_row, end_row = rng.randrange(scale), rng.randrange(scale)
+    for row in range(scale):
+        line = []
+        for col in range(width):
+            height = col * 25 // (width - 1)
+            if row > 0 and 0 < col < width - 1:
+                # only ever lower the terrain away from the top row and the edges so that a path always exists
+                height = max(0, height - rng.choice((0, 0, 0, 1, 2, 3)))
+            line.append(chr(ord("a") + height))
+        if row == start_row:
+            line[0] = "S"
+        if row == end_row:
+            line[-1] = "E"
+        out.write("".join(line))
+        out.write("\n")
 
 
 @challenge(day=12)
 def fewest_steps_to_best_signal(path: Path) -> int:
     height_map = parse(path)
-    return sum(1 for _ in solve(State(height_map))) - 1
+    return solve(height_map, (height_map.start,))
 
 
 @challenge(day=12)
 def multi_source_shortest_path(path: Path) -> int:
     height_map = parse(path)
-    low_states: List[State] = []
-    for i, row in enumerate(height_map):
-        for j, c in enumerate(row):
-            if c == "S" or c == "a":
-                low_states.append(State(height_map=height_map, row=i, col=j))
-    return sum(1 for _ in solve(*low_states)) - 1
+    return solve(height_map, (i for i in height_map.indices() if height_map[i] == 0))
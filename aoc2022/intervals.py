@@ -0,0 +1,110 @@
+"""
+Sets of integers stored as sorted, disjoint, half-open intervals.
+
+An `IntervalSet` keeps the beginnings and ends of its intervals in two flat, sorted lists. Adjacent and overlapping
+intervals are always merged, so every operation is a binary search followed by a splice of those lists rather than a
+walk over a tree of interval objects. Building a set from many intervals at once sorts and merges them in a single
+pass, which is the fast path for the bulk unions that the days need.
+"""
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Tuple
+
+
+class IntervalSet:
+    __slots__ = "begins", "ends"
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()):
+        """Builds the union of the half-open `(begin, end)` intervals, which need not be sorted or disjoint"""
+        self.begins: List[int] = []
+        self.ends: List[int] = []
+        begins = self.begins
+        ends = self.ends
+        for begin, end in sorted(intervals):
+            if begin >= end:
+                continue
+            elif ends and begin <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                begins.append(begin)
+                ends.append(end)
+
+    def add(self, begin: int, end: int):
+        """Adds the integers in `[begin, end)`"""
+        if begin >= end:
+            return
+        # the intervals that overlap or touch the new one are merged with it
+        first = bisect_left(self.ends, begin)
+        last = bisect_right(self.begins, end)
+        if first < last:
+            begin = min(begin, self.begins[first])
+            end = max(end, self.ends[last - 1])
+        self.begins[first:last] = [begin]
+        self.ends[first:last] = [end]
+
+    def update(self, intervals: Iterable[Tuple[int, int]]):
+        """Adds every interval in `intervals`"""
+        merged = IntervalSet(list(zip(self.begins, self.ends)) + list(intervals))
+        self.begins = merged.begins
+        self.ends = merged.ends
+
+    def discard(self, begin: int, end: int):
+        """Removes the integers in `[begin, end)`"""
+        if begin >= end:
+            return
+        first = bisect_right(self.ends, begin)
+        last = bisect_left(self.begins, end)
+        if first >= last:
+            return
+        new_begins: List[int] = []
+        new_ends: List[int] = []
+        if self.begins[first] < begin:
+            new_begins.append(self.begins[first])
+            new_ends.append(begin)
+        if self.ends[last - 1] > end:
+            new_begins.append(end)
+            new_ends.append(self.ends[last - 1])
+        self.begins[first:last] = new_begins
+        self.ends[first:last] = new_ends
+
+    @property
+    def length(self) -> int:
+        """The number of integers in the set"""
+        return sum(self.ends) - sum(self.begins)
+
+    def gaps(self, begin: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Yields the maximal intervals within `[begin, end)` that are not in the set"""
+        index = bisect_right(self.ends, begin)
+        position = begin
+        while index < len(self.begins) and self.begins[index] < end:
+            if self.begins[index] > position:
+                yield position, self.begins[index]
+            position = max(position, self.ends[index])
+            index += 1
+        if position < end:
+            yield position, end
+
+    def __contains__(self, value: int) -> bool:
+        index = bisect_right(self.begins, value) - 1
+        return index >= 0 and value < self.ends[index]
+
+    def __ior__(self, other: "IntervalSet") -> "IntervalSet":
+        self.update(other)
+        return self
+
+    def __or__(self, other: "IntervalSet") -> "IntervalSet":
+        return IntervalSet(list(self) + list(other))
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """Yields the set's `(begin, end)` intervals in increasing order"""
+        return zip(self.begins, self.ends)
+
+    def __len__(self):
+        """The number of disjoint intervals in the set; see `length` for the number of integers"""
+        return len(self.begins)
+
+    def __eq__(self, other):
+        return isinstance(other, IntervalSet) and self.begins == other.begins and self.ends == other.ends
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
@@ -0,0 +1,124 @@
+"""
+Process-wide verbosity for the challenges' progress bars and diagnostic messages.
+
+The verbosity is read from the AOC2022_VERBOSITY environment variable and can be overridden with `-q`/`-v`. When a
+progress bar or message is disabled, nothing is constructed, formatted, or written; `tqdm` is not even imported.
+Hot loops should guard messages with `enabled()` so that they are not formatted either:
+
+    if i % 10000 == 0 and enabled(VERBOSE):
+        log(f"Iteration: {i}")
+"""
+import argparse
+import os
+import sys
+from typing import Any, Iterable, Optional, TypeVar
+
+QUIET = 0
+NORMAL = 1
+VERBOSE = 2
+DEBUG = 3
+
+LEVEL_NAMES = {"quiet": QUIET, "normal": NORMAL, "verbose": VERBOSE, "debug": DEBUG}
+VERBOSITY_ENV_VAR = "AOC2022_VERBOSITY"
+
+T = TypeVar("T")
+
+
+def _initial_verbosity() -> int:
+    value = os.environ.get(VERBOSITY_ENV_VAR, "").strip().lower()
+    if value in LEVEL_NAMES:
+        return LEVEL_NAMES[value]
+    try:
+        return max(QUIET, int(value))
+    except ValueError:
+        return NORMAL
+
+
+_VERBOSITY: int = _initial_verbosity()
+
+
+def verbosity() -> int:
+    return _VERBOSITY
+
+
+def set_verbosity(level: int):
+    """Sets the verbosity of this process and of any child processes it starts afterward"""
+    global _VERBOSITY
+    _VERBOSITY = max(QUIET, level)
+    os.environ[VERBOSITY_ENV_VAR] = str(_VERBOSITY)
+
+
+def enabled(level: int = VERBOSE) -> bool:
+    return _VERBOSITY >= level
+
+
+def log(message: str, level: int = VERBOSE):
+    """Writes `message` to STDERR without disrupting any active progress bars"""
+    if _VERBOSITY < level:
+        return
+    if "tqdm" in sys.modules:
+        from tqdm import tqdm
+        tqdm.write(message, file=sys.stderr)
+    else:
+        sys.stderr.write(f"{message}\n")
+
+
+def progress(iterable: Iterable[T], level: int = NORMAL, **kwargs) -> Iterable[T]:
+    """Wraps `iterable` in a `tqdm` progress bar if the verbosity is at least `level`"""
+    if _VERBOSITY < level:
+        return iterable
+    from tqdm import tqdm
+    return tqdm(iterable, **kwargs)
+
+
+def progress_range(*args: int, level: int = NORMAL, **kwargs) -> Iterable[int]:
+    """Equivalent to `range(*args)` with a `tqdm.trange` progress bar if the verbosity is at least `level`"""
+    if _VERBOSITY < level:
+        return range(*args)
+    from tqdm import trange
+    return trange(*args, **kwargs)
+
+
+class NullProgressBar:
+    """Stands in for a disabled manually-updated `tqdm` progress bar"""
+
+    total: Optional[int] = None
+
+    def update(self, n: int = 1):
+        pass
+
+    def set_postfix(self, *args, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "NullProgressBar":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+def progress_bar(level: int = NORMAL, **kwargs) -> Any:
+    """Returns a manually-updated `tqdm` progress bar, or a `NullProgressBar` if the verbosity is below `level`"""
+    if _VERBOSITY < level:
+        return NullProgressBar()
+    from tqdm import tqdm
+    return tqdm(**kwargs)
+
+
+def add_verbosity_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--quiet", "-q", action="store_true",
+                       help="suppress all progress bars and diagnostic messages")
+    group.add_argument("--verbose", "-v", action="count", default=0,
+                       help="print diagnostic messages to STDERR; repeat for more detail (the default verbosity can "
+                            f"also be set with the {VERBOSITY_ENV_VAR} environment variable)")
+
+
+def configure_verbosity(args: argparse.Namespace):
+    if args.quiet:
+        set_verbosity(QUIET)
+    elif args.verbose:
+        set_verbosity(NORMAL + args.verbose)
@@ -0,0 +1,107 @@
+import ast
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from . import DAY_MODULES, PACKAGE_DIR, REFERENCE
+
+
+def module_names() -> Iterator[str]:
+    for path in sorted(PACKAGE_DIR.glob("*.py")):
+        if not path.stem.startswith("_"):
+            yield path.stem
+
+
+def challenge_decorators(module_name: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yields the name and `@challenge` arguments of each challenge function in a module without executing it"""
+    tree = ast.parse((PACKAGE_DIR / f"{module_name}.py").read_text(), filename=f"{module_name}.py")
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Name) \
+                    or decorator.func.id != "challenge":
+                continue
+            kwargs = dict(zip(("day", "part"), map(ast.literal_eval, decorator.args)))
+            kwargs.update({kw.arg: ast.literal_eval(kw.value) for kw in decorator.keywords if kw.arg is not None})
+            yield node.name, kwargs
+
+
+def scan_module(module_name: str) -> Dict[int, Dict[int, str]]:
+    """Finds the reference `@challenge` functions in a module by parsing its source rather than executing it"""
+    days: Dict[int, Dict[int, str]] = {}
+    for name, kwargs in challenge_decorators(module_name):
+        if kwargs.get("impl", REFERENCE) != REFERENCE:
+            # alternative implementations of a part do not add a part of their own
+            continue
+        parts = days.setdefault(kwargs["day"], {})
+        part = kwargs.get("part")
+        if part is None:
+            part = len(parts)
+        parts[part] = name
+    return days
+
+
+def scan_implementations(module_name: str) -> Dict[int, Dict[int, List[str]]]:
+    """Returns {day: {part: [implementation name]}} for the alternative implementations in a module"""
+    days: Dict[int, Dict[int, List[str]]] = {}
+    for _, kwargs in challenge_decorators(module_name):
+        impl = kwargs.get("impl", REFERENCE)
+        if impl != REFERENCE:
+            days.setdefault(kwargs["day"], {}).setdefault(kwargs["part"], []).append(impl)
+    return days
+
+
+def package_imports(module_name: str) -> Set[str]:
+    """
+    Returns the package modules that a module imports, directly or indirectly, including itself.
+
+    `__init__` is included for the `from . import ...` of its names. Imports inside functions are found, too.
+    """
+    found: Set[str] = set()
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        if name in found or not (PACKAGE_DIR / f"{name}.py").exists():
+            continue
+        found.add(name)
+        tree = ast.parse((PACKAGE_DIR / f"{name}.py").read_text(), filename=f"{name}.py")
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom):
+                if node.level > 0:
+                    module = node.module
+                elif node.module is not None and node.module.split(".")[0] == __package__:
+                    module = node.module[len(__package__) + 1:] or None
+                else:
+                    continue
+                if module is None:
+                    # `from . import name` imports either a submodule or a name defined in `__init__`
+                    pending.append("__init__")
+                    pending.extend(alias.name for alias in node.names)
+                else:
+                    pending.append(module.split(".")[0])
+            elif isinstance(node, ast.Import):
+                pending.extend(
+                    alias.name.split(".")[1] for alias in node.names
+                    if alias.name.startswith(f"{__package__}.")
+                )
+    return found
+
+
+def discover() -> Dict[int, str]:
+    """Generates the day -> module manifest from the package's source files"""
+    manifest: Dict[int, str] = {}
+    for module_name in module_names():
+        for day in scan_module(module_name):
+            if day in manifest:
+                raise ValueError(f"Day {day} is defined in both {manifest[day]} and {module_name}")
+            manifest[day] = module_name
+    return dict(sorted(manifest.items()))
+
+
+if __name__ == "__main__":
+    discovered = discover()
+    print("DAY_MODULES: Dict[int, str] = {")
+    for day, name in discovered.items():
+        print(f"    {day}: {name!r},".replace("'", '"'))
+    print("}")
+    if discovered != DAY_MODULES:
+        print("# the manifest in aoc2022/__init__.py is out of date!")
@@ -0,0 +1,163 @@
+"""
+Bounded memoization of methods, with one cache per instance.
+
+`functools.lru_cache` on a method keeps a single cache for the whole class that holds a strong reference to every
+instance it has seen, so the instances (and their caches) outlive the challenge that created them. A
+`memoized_method` instead stores its cache on the instance itself, where it is dropped along with the instance and is
+not copied or pickled with it. The cache refers back to its instance only weakly, so the two do not form a reference
+cycle and are freed as soon as the instance is no longer used, without waiting for the cyclic garbage collector:
+
+    class Map:
+        @memoized_method(maxsize=16384)
+        def wraps_to(self, row: int, col: int, facing: Facing) -> Tuple[int, int, Facing]:
+            ...
+
+Each cache evicts its least recently used entries to stay within `maxsize` entries and, optionally, `max_bytes` bytes
+as measured by `sizeof`. Hits, misses, and evictions are counted on each cache (see `cache_info()`) and are added to
+the `--stats` counters as `memo.CLASS.METHOD.hits`, etc. Only positional, hashable arguments are supported.
+"""
+import sys
+from typing import Any, Callable, Dict, Generic, NamedTuple, Optional, Tuple, TypeVar
+import weakref
+
+from .counters import add, counting
+
+T = TypeVar("T")
+
+
+class MemoInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: Optional[int]
+    """the estimated size of the cached entries, or `None` if the cache has no byte budget"""
+
+
+class BoundMemo(Generic[T]):
+    """The cache of a `memoized_method` for a single instance"""
+
+    __slots__ = "method", "instance_ref", "function", "cache", "sizes", "bytes", "hits", "misses", "evictions"
+
+    def __init__(self, method: "memoized_method[T]", instance: Any):
+        self.method: memoized_method[T] = method
+        self.instance_ref: weakref.ReferenceType = weakref.ref(instance)
+        self.function: Callable[..., T] = method.function
+        self.cache: Dict[Tuple[Any, ...], T] = {}
+        self.sizes: Optional[Dict[Tuple[Any, ...], int]] = None if method.max_bytes is None else {}
+        self.bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __call__(self, *args) -> T:
+        cache = self.cache
+        try:
+            # reinsert the entry so that the dict stays in least-recently-used order
+            value = cache.pop(args)
+        except KeyError:
+            pass
+        else:
+            cache[args] = value
+            self.hits += 1
+            if counting():
+                add(self.method.hits_counter)
+            return value
+        value = self.function(self.instance, *args)
+        self.misses += 1
+        if counting():
+            add(self.method.misses_counter)
+        cache[args] = value
+        if self.sizes is not None:
+            size = self.method.sizeof(args) + self.method.sizeof(value)
+            self.sizes[args] = size
+            self.bytes += size
+        self._evict()
+        return value
+
+    def _evict(self):
+        method = self.method
+        cache = self.cache
+        evicted = 0
+        while (method.maxsize is not None and len(cache) > method.maxsize) or \
+                (method.max_bytes is not None and self.bytes > method.max_bytes and len(cache) > 1):
+            oldest = next(iter(cache))
+            del cache[oldest]
+            if self.sizes is not None:
+                self.bytes -= self.sizes.pop(oldest)
+            evicted += 1
+        if evicted:
+            self.evictions += evicted
+            add(method.evictions_counter, evicted)
+
+    @property
+    def instance(self) -> Any:
+        instance = self.instance_ref()
+        if instance is None:
+            raise ReferenceError(f"the instance of {self.method.attribute} no longer exists")
+        return instance
+
+    def cache_info(self) -> MemoInfo:
+        return MemoInfo(
+            hits=self.hits, misses=self.misses, evictions=self.evictions, entries=len(self.cache),
+            bytes=None if self.sizes is None else self.bytes
+        )
+
+    def cache_clear(self):
+        self.cache.clear()
+        if self.sizes is not None:
+            self.sizes.clear()
+        self.bytes = 0
+
+    def __reduce__(self):
+        # copies and unpickled instances start with an empty cache of their own
+        return getattr, (self.instance, self.method.attribute)
+
+
+class memoized_method(Generic[T]):
+    """
+    Decorates a method so that each instance memoizes its results in a cache of at most `maxsize` entries.
+
+    If `max_bytes` is provided, the cache also evicts entries while the total `sizeof` of their arguments and results
+    exceeds it. `sys.getsizeof` does not include the sizes of nested objects, so methods that return containers should
+    provide their own `sizeof`. The instances must have a `__dict__` and support weak references.
+    """
+
+    def __init__(
+            self,
+            maxsize: Optional[int] = 1024,
+            max_bytes: Optional[int] = None,
+            sizeof: Callable[[Any], int] = sys.getsizeof
+    ):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError(f"Invalid maxsize: {maxsize}")
+        elif max_bytes is not None and max_bytes < 1:
+            raise ValueError(f"Invalid max_bytes: {max_bytes}")
+        self.maxsize: Optional[int] = maxsize
+        self.max_bytes: Optional[int] = max_bytes
+        self.sizeof: Callable[[Any], int] = sizeof
+        self.function: Optional[Callable[..., T]] = None
+        self.attribute: str = ""
+        self.hits_counter: str = ""
+        self.misses_counter: str = ""
+        self.evictions_counter: str = ""
+
+    def __call__(self, function: Callable[..., T]) -> "memoized_method[T]":
+        self.function = function
+        self.__doc__ = function.__doc__
+        return self
+
+    def __set_name__(self, owner: type, name: str):
+        self.attribute = name
+        prefix = f"memo.{owner.__qualname__}.{name}"
+        self.hits_counter = f"{prefix}.hits"
+        self.misses_counter = f"{prefix}.misses"
+        self.evictions_counter = f"{prefix}.evictions"
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        # cache the bound memo on the instance so that later lookups skip this descriptor entirely
+        bound = BoundMemo(self, instance)
+        instance.__dict__[self.attribute] = bound
+        return bound
@@ -215,11 +215,14 @@ Figure out which monkeys to chase by counting how many items they inspect over 2
 from enum import Enum
 import heapq
 import math
+from random import Random
 from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
-from tqdm import trange
+from . import challenge, generator, Path
+from .log import DEBUG, progress_range
 
-from . import challenge, Path
+# a progress bar per round is only worth its cost when debugging
+ROUND_PROGRESS_LEVEL = DEBUG
 
 
 class Operator(Enum):
@@ -232,6 +235,11 @@ class Operator(Enum):
 
 
 class Monkey:
+    __slots__ = (
+        "number", "items", "operator", "operand", "divisible_by", "if_true", "if_false", "num_items_inspected",
+        "worry_divisor"
+    )
+
     def __init__(
             self,
             number: int,
@@ -336,7 +344,7 @@ class Monkey:
 
 def load(path: Path) -> Dict[int, Monkey]:
     monkeys: Dict[int, Monkey] = {}
-    with open(path, "r") as f:
+    with path.open("r") as f:
         while True:
             try:
                 monkey = Monkey.parse(f)
@@ -346,11 +354,39 @@ def load(path: Path) -> Dict[int, Monkey]:
     return monkeys
 
 
+@generator(day=11, default_scale=8)
+def generate_monkeys(out: TextIO, scale: int, rng: Random):
+    """Writes the notes for `scale` monkeys (at least two)"""
+    scale = max(2, scale)
+    primes: List[int] = []
+    candidate = 2
+    while len(primes) < scale:
+        if all(candidate % p for p in primes):
+            primes.append(candidate)
+        candidate += 1
+    rng.shuffle(primes)
+    for number in range(scale):
+        if number > 0:
+            out.write("\n")
+        items = ", ".join(str(rng.randint(50, 99)) for _ in range(rng.randint(1, 8)))
+        operation = rng.choice(("* old", f"* {rng.randint(2, 19)}", f"+ {rng.randint(1, 8)}"))
+        others = [m for m in range(scale) if m != number]
+        if_true, if_false = rng.choice(others), rng.choice(others)
+        out.write(f"Monkey {number}:\n"
+                  f"  Starting items: {items}\n"
+                  f"  Operation: new = old {operation}\n"
+                  f"  Test: divisible by {primes[number]}\n"
+                  f"    If true: throw to monkey {if_true}\n"
+                  f"    If false: throw to monkey {if_false}\n")
+
+
 @challenge(day=11)
 def monkey_business(path: Path) -> int:
     monkeys = load(path)
-    for _ in trange(20, desc="simulating", unit="rounds", leave=False):
-        for i in trange(len(monkeys), desc="running round", unit="monkeys", leave=False):
+    for _ in progress_range(20, desc="simulating", unit="rounds", leave=False):
+        for i in progress_range(
+                len(monkeys), desc="running round", unit="monkeys", leave=False, level=ROUND_PROGRESS_LEVEL
+        ):
             monkeys[i].take_turn(monkeys)
     top_two = heapq.nlargest(2, monkeys.values(), key=lambda m: m.num_items_inspected)
     return top_two[0].num_items_inspected * top_two[1].num_items_inspected
@@ -449,8 +485,10 @@ def over_nine_thousand_rounds(path: Path) -> int:
     for monkey in monkeys.values():
         monkey.worry_divisor = 1
     lcm = math.lcm(*(i for m in monkeys.values() for i in m.items))
-    for _ in trange(10000, desc="simulating", unit="rounds", leave=False):
-        for i in trange(len(monkeys), desc="running round", unit="monkeys", leave=False):
+    for _ in progress_range(10000, desc="simulating", unit="rounds", leave=False):
+        for i in progress_range(
+                len(monkeys), desc="running round", unit="monkeys", leave=False, level=ROUND_PROGRESS_LEVEL
+        ):
             monkeys[i].take_turn(monkeys, lcm=lcm)
     top_two = heapq.nlargest(2, monkeys.values(), key=lambda m: m.num_items_inspected)
     return top_two[0].num_items_inspected * top_two[1].num_items_inspected
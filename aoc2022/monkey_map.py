@@ -75,11 +75,13 @@ Follow the path given in the monkeys' notes. What is the final password?
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from functools import lru_cache
 from math import isqrt
-from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from random import Random
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, parser, Path
+from .log import DEBUG, enabled, log
+from .memo import memoized_method
 
 
 class Space(Enum):
@@ -159,7 +161,7 @@ class Map:
         else:
             return self.rows[row][col]
 
-    @lru_cache(maxsize=10000000)
+    @memoized_method(maxsize=16384)
     def wraps_to(self, row: int, col: int, facing: Facing) -> Tuple[int, int, Facing]:
         row += facing.row_delta
         col += facing.col_delta
@@ -193,6 +195,8 @@ class Map:
 
 
 class State:
+    __slots__ = "board", "row", "col", "facing"
+
     def __init__(
             self, board: Map, row: Optional[int] = None, col: Optional[int] = None, facing: Facing = Facing.EAST
     ):
@@ -297,9 +301,32 @@ class TurnCounterClockwise(Move):
         return "L"
 
 
+@generator(day=22, default_scale=50)
+def generate_board(out: TextIO, scale: int, rng: Random):
+    """Writes a board whose six faces are `scale` by `scale` and that folds into a cube, followed by a path"""
+    scale = max(2, scale)
+    # the same net as the puzzle inputs
+    faces = {(0, 1), (0, 2), (1, 1), (2, 0), (2, 1), (3, 0)}
+    for row in range(4 * scale):
+        line = []
+        for col in range(3 * scale):
+            if (row // scale, col // scale) not in faces:
+                line.append(Space.OUTSIDE.value)
+            elif (row, col) != (0, scale) and rng.random() < 0.1:
+                line.append(Space.WALL.value)
+            else:
+                line.append(Space.EMPTY.value)
+        out.write("".join(line).rstrip())
+        out.write("\n")
+    out.write("\n")
+    out.write("".join(f"{rng.randint(1, 50)}{rng.choice('LR')}" for _ in range(2000)))
+    out.write(f"{rng.randint(1, 50)}\n")
+
+
+@parser(day=22)
 def load(path: Path) -> Tuple[Map, List[Move]]:
     rows: List[Dict[int, Space]] = []
-    with open(path, "r") as f:
+    with path.open("r") as f:
         for line in f:
             line = line.rstrip()
             if not line:
@@ -314,9 +341,9 @@ def load(path: Path) -> Tuple[Map, List[Move]]:
     return Map(rows), moves
 
 
-@challenge(day=22)
-def final_password(path: Path) -> int:
-    m, moves = load(path)
+@challenge(day=22, parsed=True)
+def final_password(puzzle: Tuple[Map, List[Move]]) -> int:
+    m, moves = puzzle
     state = State(m)
     for move in moves:
         state = move.apply(state)
@@ -574,23 +601,28 @@ class Cube(Map):
                 return f
         raise ValueError(f"<row={row}, col={col}> is not on the cube!")
 
-    @lru_cache(maxsize=10000000)
+    @memoized_method(maxsize=16384)
     def wraps_to(self, row: int, col: int, facing: Facing) -> Tuple[int, int, Facing]:
         return self.face(row, col).wraps_to(row, col, facing)
 
 
-@challenge(day=22)
-def cube_folding(path: Path) -> int:
-    m, moves = load(path)
+@challenge(day=22, parsed=True)
+def cube_folding(puzzle: Tuple[Map, List[Move]]) -> int:
+    m, moves = puzzle
     cube = Cube(m)
     state = State(cube)
+    if not enabled(DEBUG):
+        for move in moves:
+            state = move.apply(state)
+        return state.password
+    # trace the path on the map
     rows: List[List[str]] = [list(row) for row in str(cube).split("\n")]
     rows[state.row][state.col] = state.facing.symbol
     for move in moves:
         state = move.apply(state)
         rows[state.row][state.col] = state.facing.symbol
-    print("\n".join((
+    log("\n".join((
         "".join(row)
         for row in rows
-    )))
+    )), level=DEBUG)
     return state.password
@@ -42,9 +42,11 @@ However, your actual situation involves considerably more monkeys. What number w
 """
 
 from enum import Enum
-from typing import Callable, Dict, List, Optional, Set, Union
+from random import Random
+from string import ascii_lowercase
+from typing import Callable, Dict, List, Optional, Set, TextIO, Union
 
-from . import challenge, Path
+from . import challenge, generator, parser, Path
 
 
 Operand = Union["Symbol", int, "Expression"]
@@ -115,6 +117,10 @@ class Operator(Enum):
         self.symbol: str = symbol
         self.execute: Callable[[Operand, Operand], Operand] = operator
 
+    def __reduce_ex__(self, protocol):
+        # the values contain lambdas, which cannot be pickled, so pickle the members by name
+        return getattr, (self.__class__, self.name)
+
 
 class Expression:
     def __init__(self, lhs: Operand, operator: Operator, rhs: Operand):
@@ -318,30 +324,101 @@ class KnowledgeBase:
 
     @classmethod
     def load(cls, path: Path) -> "KnowledgeBase":
-        monkeys: Dict[str, Union[int, Expression]] = {}
-        with open(path, "r") as f:
-            for line in f:
-                name, operands = line.split(": ")
-                if name in monkeys:
-                    raise ValueError(f"Duplicate monkey definition: {name!r}")
-                try:
-                    monkeys[name] = int(operands)
-                except ValueError:
-                    # treat it as a binary operator
-                    for oper in Operator:
-                        char = f" {oper.symbol} "
-                        if char in operands:
-                            lhs, rhs = operands.split(char)
-                            monkeys[name] = Expression(lhs=Symbol(lhs.strip()), rhs=Symbol(rhs.strip()), operator=oper)
-                            break
-                    else:
-                        raise ValueError(line)
-        return KnowledgeBase(monkeys)
-
-
-@challenge(day=21)
-def root_yell(path: Path) -> int:
-    kb = KnowledgeBase.load(path)
+        return KnowledgeBase(load_monkeys(path))
+
+
+@generator(day=21, default_scale=2000)
+def generate_monkey_jobs(out: TextIO, scale: int, rng: Random):
+    """
+    Writes the jobs of about `scale` monkeys.
+
+    The expression tree is built top-down from the value each monkey must yell, so every division is exact and
+    there is a value for `humn` that passes root's equality test.
+    """
+    num_leaves = max(2, (scale + 1) // 2)
+    names = set()
+    while len(names) < 2 * num_leaves - 2:
+        name = "".join(rng.choices(ascii_lowercase, k=4))
+        if name not in ("root", "humn"):
+            names.add(name)
+    unused_names = sorted(names)
+    rng.shuffle(unused_names)
+    jobs: Dict[str, str] = {}
+
+    def build(value: int, leaves: int, has_humn: bool = False, name: Optional[str] = None) -> str:
+        if name is None:
+            name = "humn" if has_humn and leaves == 1 else unused_names.pop()
+        if leaves == 1:
+            # humn yells some other number in part one
+            jobs[name] = str(rng.randint(1, 100) if has_humn else value)
+            return name
+        left_leaves = rng.randint(max(1, leaves // 3), max(1, 2 * leaves // 3))
+        right_leaves = leaves - left_leaves
+        humn_on_left = rng.random() < 0.5
+        factors = [f for f in range(2, 10) if value % f == 0]
+        choice = rng.random()
+        if factors and choice < 0.25:
+            operator, rhs_value = "*", rng.choice(factors)
+            lhs_value = value // rhs_value
+        elif value < 1000000 and choice < 0.5:
+            # humn is never the divisor, since its part one value could make the divisor zero
+            operator, rhs_value, humn_on_left = "/", rng.randint(2, 5), True
+            lhs_value = value * rhs_value
+        elif value > 1 and choice < 0.75:
+            operator, rhs_value = "+", rng.randint(1, value - 1)
+            lhs_value = value - rhs_value
+        else:
+            operator, rhs_value = "-", rng.randint(1, 100)
+            lhs_value = value + rhs_value
+        lhs = build(lhs_value, left_leaves, has_humn and humn_on_left)
+        rhs = build(rhs_value, right_leaves, has_humn and not humn_on_left)
+        jobs[name] = f"{lhs} {operator} {rhs}"
+        return name
+
+    target = rng.randint(1000, 100000)
+    humn_leaves = rng.randint(1, num_leaves - 1)
+    lhs = build(target, humn_leaves, has_humn=True)
+    rhs = build(target, num_leaves - humn_leaves)
+    # root's operation is only tested for equality in part two
+    jobs["root"] = f"{lhs} {rng.choice('+-*')} {rhs}"
+    lines = [f"{name}: {job}" for name, job in jobs.items()]
+    rng.shuffle(lines)
+    for line in lines:
+        out.write(f"{line}\n")
+
+
+@parser(day=21)
+def load_monkeys(path: Path) -> Dict[str, Union[int, Expression]]:
+    """
+    Parses the monkeys' jobs.
+
+    A `KnowledgeBase` only ever replaces its own entries and never modifies an `Expression`, so the result can be
+    shared by multiple knowledge bases.
+    """
+    monkeys: Dict[str, Union[int, Expression]] = {}
+    with path.open("r") as f:
+        for line in f:
+            name, operands = line.split(": ")
+            if name in monkeys:
+                raise ValueError(f"Duplicate monkey definition: {name!r}")
+            try:
+                monkeys[name] = int(operands)
+            except ValueError:
+                # treat it as a binary operator
+                for oper in Operator:
+                    char = f" {oper.symbol} "
+                    if char in operands:
+                        lhs, rhs = operands.split(char)
+                        monkeys[name] = Expression(lhs=Symbol(lhs.strip()), rhs=Symbol(rhs.strip()), operator=oper)
+                        break
+                else:
+                    raise ValueError(line)
+    return monkeys
+
+
+@challenge(day=21, parsed=True)
+def root_yell(monkeys: Dict[str, Union[int, Expression]]) -> int:
+    kb = KnowledgeBase(monkeys)
     return kb.simplify("root")[0]
 
 
@@ -359,9 +436,9 @@ What number do you yell to pass root's equality test?
 """
 
 
-@challenge(day=21)
-def root_equality_test(path: Path) -> int:
-    kb = KnowledgeBase.load(path)
+@challenge(day=21, parsed=True)
+def root_equality_test(monkeys: Dict[str, Union[int, Expression]]) -> int:
+    kb = KnowledgeBase(monkeys)
     root = kb["root"]
     root = Expression(lhs=root.lhs, rhs=root.rhs, operator=Operator.EQUALS)
     kb["root"] = root
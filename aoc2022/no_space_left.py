@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
+from random import Random
 import re
-from typing import Dict, List, Iterator, Optional, Sequence, Tuple
+from string import ascii_lowercase
+from typing import Dict, List, Iterator, Optional, Sequence, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, Path
 
 """
 --- Day 7: No Space Left On Device ---
@@ -83,6 +85,8 @@ Find all of the directories with a total size of at most 100000. What is the sum
 
 
 class FileSystemElement:
+    __slots__ = ()
+
     @property
     @abstractmethod
     def size(self) -> int:
@@ -90,6 +94,8 @@ class FileSystemElement:
 
 
 class File(FileSystemElement):
+    __slots__ = "_size",
+
     def __init__(self, size: int):
         self._size: int = size
 
@@ -105,6 +111,8 @@ class File(FileSystemElement):
 
 
 class Directory(FileSystemElement):
+    __slots__ = "parent", "_children"
+
     def __init__(self, parent: Optional["Directory"] = None):
         self.parent: Optional[Directory] = parent
         self._children: Dict[str, FileSystemElement] = {}
@@ -264,7 +272,7 @@ class Ls(Command):
 
 
 def parse_commands(path: Path) -> Iterator[Command]:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         cmd_line: str = ""
         output_lines: List[str] = []
         for line in f:
@@ -281,6 +289,39 @@ def parse_commands(path: Path) -> Iterator[Command]:
         if cmd_line:
             yield Command.parse(cmd_line, output_lines)
 
+@generator(day=7, default_scale=200)
+def generate_terminal_output(out: TextIO, scale: int, rng: Random):
+    """Writes the terminal output of exploring a filesystem with `scale` directories"""
+    children: List[List[int]] = [[] for _ in range(scale)]
+    for directory in range(1, scale):
+        children[rng.randrange(directory)].append(directory)
+    def random_name(unique_suffix: int) -> str:
+        return f"{''.join(rng.choices(ascii_lowercase, k=rng.randint(1, 8)))}{unique_suffix}"
+
+    names = ["/"] + [random_name(directory) for directory in range(1, scale)]
+    files: List[List[Tuple[int, str]]] = [
+        [(rng.randint(1, 200000), f"{random_name(i)}.txt") for i in range(rng.randint(0, 3))]
+        for _ in range(scale)
+    ]
+    total_size = sum(size for directory_files in files for size, _ in directory_files)
+    if total_size <= 40000000:
+        # make sure that part two has to free up some space
+        files[0].append((40000001 - total_size + rng.randint(0, 1000000), "padding"))
+
+    def explore(directory: int):
+        out.write(f"$ cd {names[directory]}\n$ ls\n")
+        listing = [f"dir {names[child]}" for child in children[directory]]
+        listing.extend(f"{size} {name}" for size, name in files[directory])
+        rng.shuffle(listing)
+        for line in listing:
+            out.write(f"{line}\n")
+        for child in children[directory]:
+            explore(child)
+            out.write("$ cd ..\n")
+
+    explore(0)
+
+
 @challenge(day=7)
 def directory_sizes(path: Path) -> int:
     root = Directory()
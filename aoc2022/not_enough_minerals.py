@@ -168,13 +168,15 @@ Determine the quality level of each blueprint using the largest number of geodes
 """
 
 from dataclasses import dataclass
-import heapq
+from random import Random
 import re
-from typing import Iterator, List, Set
+from typing import Iterator, Optional, TextIO
 
-from tqdm import tqdm
-
-from . import challenge, Path
+from . import challenge, generator, Path
+from .counters import add
+from .log import enabled, log, progress, progress_bar, VERBOSE
+from .puzzle_input import integer_rows
+from .search import branch_and_bound, SearchStats
 
 BLUEPRINT_PATTERN: re.Pattern = re.compile(
     r"Blueprint (\d+): Each ore robot costs (\d+) ore. Each clay robot costs (\d+) ore. Each obsidian robot costs "
@@ -238,61 +240,27 @@ class Resources:
         )
 
 
-@dataclass(frozen=True, slots=True, unsafe_hash=True, eq=True)
-class MiningState:
-    minute: int = 0
-    resources: Resources = Resources()
-    ore_bots: int = 1
-    clay_bots: int = 0
-    obsidian_bots: int = 0
-    geode_bots: int = 0
-
-    def resources_upper_bound(self, at_time: int) -> Resources:
-        remaining_minutes = max(0, at_time - self.minute)
-        if remaining_minutes <= 0:
-            return self.resources
-        # assume we build one geode bot every minute for the remaining time
-        # new_geodes = sum(self.geode_bots + i for i in range(remaining_minutes))
-        new_resources = Resources(
-            ore=(remaining_minutes * (2 * self.ore_bots + remaining_minutes - 1)) // 2,
-            clay=(remaining_minutes * (2 * self.clay_bots + remaining_minutes - 1)) // 2,
-            obsidian=(remaining_minutes * (2 * self.obsidian_bots + remaining_minutes - 1)) // 2,
-            geodes=(remaining_minutes * (2 * self.geode_bots + remaining_minutes - 1)) // 2
-        )
-        return self.resources + new_resources
-
-    def geodes_lower_bound(self, at_time: int) -> int:
-        return self.resources.geodes + max(0, at_time - self.minute) * self.geode_bots
+# A mining state is packed into a single integer of FIELD_BITS-bit fields: the four resources in the lowest fields, then
+# the four bot counts in the same order, then the minute. Since the bots are exactly RESOURCE_BITS above the resources
+# they collect, a minute of collection is `state + (state >> RESOURCE_BITS & RESOURCE_MASK) + ONE_MINUTE`.
+FIELD_BITS = 16
+FIELD_MASK = (1 << FIELD_BITS) - 1
+RESOURCE_BITS = 4 * FIELD_BITS
+RESOURCE_MASK = (1 << RESOURCE_BITS) - 1
+MINUTE_SHIFT = 2 * RESOURCE_BITS
+ONE_MINUTE = 1 << MINUTE_SHIFT
+ORE_BOT = 1 << RESOURCE_BITS
+CLAY_BOT = ORE_BOT << FIELD_BITS
+OBSIDIAN_BOT = CLAY_BOT << FIELD_BITS
+GEODE_BOT = OBSIDIAN_BOT << FIELD_BITS
+GEODES_SHIFT = 3 * FIELD_BITS
+GEODE_BOTS_SHIFT = RESOURCE_BITS + GEODES_SHIFT
+INITIAL_STATE = ORE_BOT
 
-    def __lt__(self, other):
-        return self.resources.is_better_than(other.resources)
 
-
-class SearchNode:
-    __slots__ = "state", "geodes_upper_bound"
-
-    def __init__(self, state: MiningState, geodes_upper_bound: int):
-        self.state: MiningState = state
-        self.geodes_upper_bound: int = geodes_upper_bound
-
-    @classmethod
-    def make(cls, state: MiningState, minutes: int) -> "SearchNode":
-        resources_upper_bound = state.resources_upper_bound(minutes)
-        assert resources_upper_bound.geodes >= state.resources.geodes
-        return SearchNode(state, resources_upper_bound.geodes)
-
-    def __hash__(self):
-        return hash(self.state)
-
-    def __eq__(self, other):
-        return isinstance(other, SearchNode) and other.state == self.state
-
-    def __lt__(self, other):
-        return isinstance(other, SearchNode) and (
-                self.geodes_upper_bound > other.geodes_upper_bound #or
-                #(self.geodes_upper_bound == other.geodes_upper_bound
-                # and self.state.resources.is_better_than(other.state.resources))
-        )
+def pack_resources(resources: Resources) -> int:
+    return resources.ore | (resources.clay << FIELD_BITS) | (resources.obsidian << 2 * FIELD_BITS) | \
+        (resources.geodes << GEODES_SHIFT)
 
 
 class Blueprint:
@@ -324,10 +292,6 @@ class Blueprint:
         )
 
     def calculate_max_geodes(self, minutes: int = 24, min_geode_count: int = 0) -> int:
-        states: List[SearchNode] = [SearchNode.make(MiningState(), minutes)]
-        history: Set[SearchNode] = set(states)
-        best_geode_count: int = 0
-        iteration = 0
         max_obsidian_bots = self.geode_cost.obsidian
         max_clay_bots = self.obsidian_cost.clay
         max_ore_bots = min(
@@ -335,92 +299,68 @@ class Blueprint:
             (minutes - 2) * self.geode_cost.ore + max_obsidian_bots * self.obsidian_cost.ore
             + max_clay_bots * self.clay_cost.ore
         )
-        tqdm.write(f"Max necessary bots: ore={max_ore_bots}, clay={max_clay_bots}, obsidian={max_obsidian_bots}")
-
-        with tqdm(desc="searching", leave=False, unit="state") as t:
-            def add_state(s: MiningState):
-                n = SearchNode.make(s, minutes)
-                if n.geodes_upper_bound > best_geode_count and n.geodes_upper_bound >= min_geode_count \
-                        and n not in history:
-                    heapq.heappush(states, n)
-                    history.add(n)
-                    t.total = len(history)
-            while states:
+        log(f"Max necessary bots: ore={max_ore_bots}, clay={max_clay_bots}, obsidian={max_obsidian_bots}")
+
+        # the net change to a state from building each kind of bot
+        ore_bot_cost = ORE_BOT - pack_resources(self.ore_cost)
+        clay_bot_cost = CLAY_BOT - pack_resources(self.clay_cost)
+        obsidian_bot_cost = OBSIDIAN_BOT - pack_resources(self.obsidian_cost)
+        geode_bot_cost = GEODE_BOT - pack_resources(self.geode_cost)
+
+        def successors(state: int) -> Iterator[int]:
+            ore = state & FIELD_MASK
+            clay = (state >> FIELD_BITS) & FIELD_MASK
+            obsidian = (state >> 2 * FIELD_BITS) & FIELD_MASK
+            # first option: do nothing
+            collected = state + ((state >> RESOURCE_BITS) & RESOURCE_MASK) + ONE_MINUTE
+            yield collected
+            if (state >> RESOURCE_BITS) & FIELD_MASK < max_ore_bots and self.ore_cost.ore <= ore:
+                # build an ore collecting robot
+                yield collected + ore_bot_cost
+            if (state >> (RESOURCE_BITS + FIELD_BITS)) & FIELD_MASK < max_clay_bots and self.clay_cost.ore <= ore:
+                # build a clay collecting robot
+                yield collected + clay_bot_cost
+            if (state >> (RESOURCE_BITS + 2 * FIELD_BITS)) & FIELD_MASK < max_obsidian_bots \
+                    and self.obsidian_cost.ore <= ore and self.obsidian_cost.clay <= clay:
+                # build an obsidian collecting robot
+                yield collected + obsidian_bot_cost
+            if self.geode_cost.ore <= ore and self.geode_cost.obsidian <= obsidian:
+                # build a geode collecting robot
+                yield collected + geode_bot_cost
+
+        def geodes_upper_bound(state: int) -> int:
+            # assume we build one geode bot every minute for the remaining time
+            remaining_minutes = max(0, minutes - (state >> MINUTE_SHIFT))
+            geode_bots = (state >> GEODE_BOTS_SHIFT) & FIELD_MASK
+            new_geodes = (remaining_minutes * (2 * geode_bots + remaining_minutes - 1)) // 2
+            return ((state >> GEODES_SHIFT) & FIELD_MASK) + new_geodes
+
+        def geodes(state: int) -> Optional[int]:
+            if state >> MINUTE_SHIFT >= minutes:
+                return (state >> GEODES_SHIFT) & FIELD_MASK
+            return None
+
+        stats = SearchStats()
+        iteration = 0
+        with progress_bar(desc="searching", leave=False, unit="state") as t:
+            def on_expand(state: int):
+                nonlocal iteration
                 iteration += 1
                 t.update(1)
-                node = heapq.heappop(states)
-                if node.geodes_upper_bound <= best_geode_count:
-                    break
-                state = node.state
-                if iteration % 100000 == 0:
-                    tqdm.write(f"iteration={iteration}\tqueue={len(states)}\tub={node.geodes_upper_bound}\t"
-                               f"best={best_geode_count}")
-                    # tqdm.write(str(node.state))
-                if node.state.minute >= minutes:
-                    if best_geode_count < 0:
-                        best_geode_count = state.resources.geodes
-                    else:
-                        best_geode_count = max(best_geode_count, state.resources.geodes)
-                    if best_geode_count <= 1:
-                        break
-                    continue
-                new_resources = node.state.resources + Resources(
-                    ore=state.ore_bots,
-                    clay=state.clay_bots,
-                    obsidian=state.obsidian_bots,
-                    geodes=state.geode_bots
-                )
-                # first option: do nothing
-                add_state(MiningState(
-                    minute=state.minute + 1,
-                    resources=new_resources,
-                    ore_bots=state.ore_bots,
-                    clay_bots=state.clay_bots,
-                    obsidian_bots=state.obsidian_bots,
-                    geode_bots=state.geode_bots
-                ))
-                if state.ore_bots < max_ore_bots and self.ore_cost <= state.resources:
-                    # build an ore collecting robot
-                    add_state(MiningState(
-                        minute=state.minute + 1,
-                        resources=new_resources - self.ore_cost,
-                        ore_bots=state.ore_bots + 1,
-                        clay_bots=state.clay_bots,
-                        obsidian_bots=state.obsidian_bots,
-                        geode_bots=state.geode_bots
-                    ))
-                if state.clay_bots < max_clay_bots and self.clay_cost <= state.resources:
-                    # build a clay collecting robot
-                    add_state(MiningState(
-                        minute=state.minute + 1,
-                        resources=new_resources - self.clay_cost,
-                        ore_bots=state.ore_bots,
-                        clay_bots=state.clay_bots + 1,
-                        obsidian_bots=state.obsidian_bots,
-                        geode_bots=state.geode_bots
-                    ))
-                if state.obsidian_bots < max_obsidian_bots and self.obsidian_cost <= state.resources:
-                    # build an obsidian collecting robot
-                    add_state(MiningState(
-                        minute=state.minute + 1,
-                        resources=new_resources - self.obsidian_cost,
-                        ore_bots=state.ore_bots,
-                        clay_bots=state.clay_bots,
-                        obsidian_bots=state.obsidian_bots + 1,
-                        geode_bots=state.geode_bots
-                    ))
-                if self.geode_cost <= state.resources:
-                    # build a geode collecting robot
-                    add_state(MiningState(
-                        minute=state.minute + 1,
-                        resources=new_resources - self.geode_cost,
-                        ore_bots=state.ore_bots,
-                        clay_bots=state.clay_bots,
-                        obsidian_bots=state.obsidian_bots,
-                        geode_bots=state.geode_bots + 1
-                    ))
-            tqdm.write(f"Best geode quantity for blueprint {self.id_number}: {best_geode_count}")
-            return best_geode_count
+                if iteration % 100000 == 0 and enabled(VERBOSE):
+                    log(f"iteration={iteration}\tminute={state >> MINUTE_SHIFT}\t"
+                        f"geodes={(state >> GEODES_SHIFT) & FIELD_MASK}\tub={geodes_upper_bound(state)}")
+
+            # a state that cannot reach `min_geode_count` is pruned just like one that cannot beat the incumbent
+            best_geode_count = branch_and_bound(
+                INITIAL_STATE, successors, geodes_upper_bound, geodes, incumbent=max(0, min_geode_count - 1),
+                stats=stats, on_expand=on_expand
+            )
+        add("day19.blueprints_searched")
+        if best_geode_count < min_geode_count:
+            best_geode_count = 0
+        log(f"Best geode quantity for blueprint {self.id_number}: {best_geode_count} ({stats!s})")
+        return best_geode_count
 
     def __str__(self):
         return f"Blueprint {self.id_number}: Each ore robot costs {self.ore_cost} ore. Each clay robot costs " \
@@ -430,16 +370,31 @@ class Blueprint:
 
 
 def load(path: Path) -> Iterator[Blueprint]:
-    with open(path, "r") as f:
-        for line in f:
-            yield Blueprint.parse(line)
+    for id_number, ore_ore, clay_ore, obsidian_ore, obsidian_clay, geode_ore, geode_obsidian in integer_rows(path, 7):
+        yield Blueprint(
+            id_number=id_number,
+            ore_cost=Resources(ore=ore_ore),
+            clay_cost=Resources(ore=clay_ore),
+            obsidian_cost=Resources(ore=obsidian_ore, clay=obsidian_clay),
+            geode_cost=Resources(ore=geode_ore, obsidian=geode_obsidian)
+        )
+
+
+@generator(day=19, default_scale=30)
+def generate_blueprints(out: TextIO, scale: int, rng: Random):
+    """Writes `scale` blueprints (at least the three that part two needs)"""
+    for number in range(1, max(3, scale) + 1):
+        out.write(f"Blueprint {number}: Each ore robot costs {rng.randint(2, 4)} ore. Each clay robot costs "
+                  f"{rng.randint(2, 4)} ore. Each obsidian robot costs {rng.randint(2, 4)} ore and "
+                  f"{rng.randint(5, 20)} clay. Each geode robot costs {rng.randint(2, 4)} ore and "
+                  f"{rng.randint(5, 20)} obsidian.\n")
 
 
 @challenge(day=19)
 def blueprint_quality(path: Path) -> int:
     return sum(
         blueprint.calculate_max_geodes() * blueprint.id_number
-        for blueprint in tqdm(list(load(path)), unit="blueprint", leave=False)
+        for blueprint in progress(list(load(path)), unit="blueprint", leave=False)
     )
 
 
@@ -657,6 +612,6 @@ Don't worry about quality levels; instead, just determine the largest number of
 def largest_number(path: Path) -> int:
     max_geodes = [
         blueprint.calculate_max_geodes(minutes=32)
-        for _, blueprint in tqdm(zip(range(3), load(path)), leave=False, total=3, unit="blueprint")
+        for _, blueprint in progress(zip(range(3), load(path)), leave=False, total=3, unit="blueprint")
     ]
     return max_geodes[0] * max_geodes[1] * max_geodes[2]
@@ -144,19 +144,23 @@ This approach lets you release the most pressure possible in 30 minutes with thi
 Work out the steps to release the most pressure in 30 minutes. What is the most pressure you can release?
 """
 
-from abc import ABC, abstractmethod
 from dataclasses import dataclass
-import heapq
+from random import Random
 import re
-from typing import Dict, FrozenSet, Iterator, List, Optional
+from string import ascii_uppercase
+from typing import Dict, FrozenSet, Iterator, List, Optional, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, Path
+from .log import DEBUG, enabled, log, VERBOSE
+from .search import branch_and_bound, SearchStats
 
 
 VALVE_PATTERN: re.Pattern = re.compile(r"Valve (\S+) has flow rate=(\d+); tunnels? leads? to valves? (.+)")
 
 
 class Valve:
+    __slots__ = "name", "flow_rate", "neighbors"
+
     def __init__(self, name: str, flow_rate: int):
         self.name: str = name
         self.flow_rate: int = flow_rate
@@ -186,7 +190,7 @@ class Valve:
 def load(path: Path) -> Dict[str, Valve]:
     valves: Dict[str, Valve] = {}
     neighbors: Dict[Valve, List[str]] = {}
-    with open(path, "r") as f:
+    with path.open("r") as f:
         for line in f:
             line = line.strip()
             m = VALVE_PATTERN.match(line)
@@ -221,176 +225,144 @@ class State:
                f"are open, releasing {self.released_pressure} pressure."
 
 
-class Move(ABC):
-    __slots__ = "valve",
-
-    def __init__(self, valve: Valve):
-        self.valve: Valve = valve
-
-    @abstractmethod
-    def apply(self, state: State) -> State:
-        raise NotImplementedError()
-
-
-class MoveTo(Move):
-    def apply(self, state: State) -> State:
-        if state.location.name not in self.valve.neighbors:
-            raise ValueError(f"{self.valve.name} is not connected to {state.location.name}; "
-                             f"its neighbors are {', '.join(self.valve.neighbors.keys())}")
-        return State(
-            location=self.valve,
-            elephant_location=state.elephant_location,
-            open_valves=state.open_valves
-        )
-
-
-class OpenValve(Move):
-    def apply(self, state: State) -> State:
-        if state.location != self.valve and (state.elephant_location is None or state.elephant_location != self.valve):
-            raise ValueError(f"Not at location {self.valve.name}!")
-        return State(
-            location=state.location,
-            elephant_location=state.elephant_location,
-            open_valves=state.open_valves | frozenset({self.valve})
-        )
-
-
-class ElephantMoveTo(Move):
-    def apply(self, state: State) -> State:
-        if state.elephant_location is None:
-            raise ValueError("No elephant!")
-        elif state.elephant_location.name not in self.valve.neighbors:
-            raise ValueError(f"{self.valve.name} is not connected to {state.location.name}; "
-                             f"its neighbors are {', '.join(self.valve.neighbors.keys())}")
-        return State(
-            location=state.location,
-            elephant_location=self.valve,
-            open_valves=state.open_valves
-        )
-
-
-class SearchNode:
-    __slots__ = "state", "parent", "total_released", "release_potential", "all_valves", "remaining_minutes"
-
-    def __init__(self, state: State, parent: Optional["SearchNode"] = None, remaining_minutes: int = 29):
-        self.state: State = state
-        if parent is None:
-            self.remaining_minutes: int = remaining_minutes
-            self.total_released: int = 0
-            self.parent: Optional[SearchNode] = None
-            self.all_valves: List[Valve] = sorted(state.location.dfs(), reverse=True, key=lambda v: v.flow_rate)
-        else:
-            self.remaining_minutes = parent.remaining_minutes - 1
-            if self.remaining_minutes < 0:
-                raise ValueError("No time left!")
-            self.total_released = parent.total_released + state.released_pressure
-            self.parent = parent
-            self.all_valves = parent.all_valves
-        remaining_minutes = self.remaining_minutes + 1
-        remaining_openings = remaining_minutes // 2
-        if remaining_minutes % 2 != 0 and self.state.location not in self.state.open_valves:
-            # we can also open the local valve
-            remaining_openings += 1
-        remaining_valves = [v for v in self.all_valves if v not in self.state.open_valves]
-        self.release_potential: int = self.total_released + sum(
-            v.flow_rate * remaining_minutes for v in self.state.open_valves
-        ) + sum(
-            v.flow_rate * (remaining_minutes - i)
-            for i, v in enumerate(remaining_valves[:remaining_openings])
-        )
-
-    @property
-    def minute(self) -> int:
-        m = 1
-        s = self
-        while s.parent is not None:
-            m += 1
-            s = s.parent
-        return m
-
-    def successors(self) -> Iterator["SearchNode"]:
-        if self.remaining_minutes <= 0:
-            return
-        your_moves = []
-        if self.state.location not in self.state.open_valves and self.state.location.flow_rate > 0:
-            your_moves.append(OpenValve(self.state.location))
-        for neighbor in self.state.location.neighbors.values():
-            your_moves.append(MoveTo(neighbor))
-        elephant_moves = []
-        if self.state.elephant_location is not None:
-            if self.state.elephant_location not in self.state.open_valves and \
-                    self.state.elephant_location.flow_rate > 0:
-                elephant_moves.append(OpenValve(self.state.elephant_location))
-            for neighbor in self.state.elephant_location.neighbors.values():
-                elephant_moves.append(ElephantMoveTo(neighbor))
-        if your_moves and elephant_moves:
-            for m1 in your_moves:
-                for m2 in elephant_moves:
-                    yield SearchNode(m2.apply(m1.apply(self.state)), self)
-        elif your_moves:
-            yield from (SearchNode(m.apply(self.state), self) for m in your_moves)
-        elif elephant_moves:
-            yield from (SearchNode(m.apply(self.state), self) for m in elephant_moves)
-        if len(self.state.open_valves) == len(self.all_valves):
-            # all of the valves are open, so do nothing:
-            yield SearchNode(self.state, self)
-
-    def __lt__(self, other):
-        return isinstance(other, SearchNode) and self.release_potential > other.release_potential
-
-    def __eq__(self, other):
-        return isinstance(other, SearchNode) and other.state == self.state and \
-               other.remaining_minutes == self.remaining_minutes and self.total_released == other.total_released
-
-    def __hash__(self):
-        return hash((self.state, self.remaining_minutes, self.total_released))
-
-    def __str__(self):
-        if self.parent is not None:
-            s = f"{self.parent!s}"
-            if self.parent.state.location != self.state.location:
-                s = f"{s}You move to valve {self.state.location.name}\n\n"
-            elif self.parent.state.open_valves != self.state.open_valves:
-                opened = self.state.open_valves - self.parent.state.open_valves
-                s = f"{s}Valves Opened: {', '.join((v.name for v in opened))}\n\n"
-            else:
-                s = f"{s}\n"
-        else:
-            s = ""
-        s = f"{s}== Minute {self.minute} ==\n"
-        if self.state.open_valves:
-            s = f"{s}Valves {', '.join((v.name for v in self.state.open_valves))} are open, " \
-                f"releasing {self.state.released_pressure} pressure.\n"
-        else:
-            s = f"{s}No valves are open.\n"
-        return s
-
-
 def solve(initial_state: State, total_minutes: int = 30) -> int:
-    queue = [SearchNode(initial_state, remaining_minutes=total_minutes - 1)]
-    history = set()
-    i = 0
-    while queue:
-        node = heapq.heappop(queue)
-        i += 1
-        if i % 10000 == 0:
-            print(node.release_potential)
-        if node.remaining_minutes == 0:
-            print(node)
-            return node.total_released
-        successors = {s for s in node.successors() if s not in history}
-        for successor in successors:
-            heapq.heappush(queue, successor)
-        history |= successors
-    else:
+    """
+    Best-first branch and bound over packed integer states.
+
+    Valves are numbered in the order they are reached from `initial_state.location`. From the least significant
+    bits, a state is your location, the elephant's location, one bit per open valve, the remaining minutes, and then
+    the total pressure released so far.
+    """
+    valves = list(initial_state.location.dfs())
+    indices = {valve: i for i, valve in enumerate(valves)}
+    flow_rates = [valve.flow_rate for valve in valves]
+    neighbors = [[indices[neighbor] for neighbor in valve.neighbors.values()] for valve in valves]
+    by_flow_rate = sorted(range(len(valves)), reverse=True, key=flow_rates.__getitem__)
+    with_flow = [i for i in by_flow_rate if flow_rates[i] > 0]
+    location_bits = len(valves).bit_length()
+    location_mask = (1 << location_bits) - 1
+    open_shift = 2 * location_bits
+    all_open = (1 << len(valves)) - 1
+    minutes_shift = open_shift + len(valves)
+    minutes_mask = (1 << total_minutes.bit_length()) - 1
+    released_shift = minutes_shift + total_minutes.bit_length()
+    has_elephant = initial_state.elephant_location is not None
+
+    def pack(location: int, elephant_location: int, open_valves: int, remaining_minutes: int, released: int) -> int:
+        return location | (elephant_location << location_bits) | (open_valves << open_shift) | \
+            (remaining_minutes << minutes_shift) | (released << released_shift)
+
+    def pressure(open_valves: int) -> int:
+        return sum(flow_rates[i] for i in with_flow if open_valves >> i & 1)
+
+    def can_open(location: int, open_valves: int) -> bool:
+        return not open_valves >> location & 1 and flow_rates[location] > 0
+
+    def moves(location: int, open_valves: int) -> List[Tuple[int, int]]:
+        """Returns `(new_location, newly_opened_valves)` pairs"""
+        result = [(neighbor, 0) for neighbor in neighbors[location]]
+        if can_open(location, open_valves):
+            result.append((location, 1 << location))
+        return result
+
+    def successors(state: int) -> Iterator[int]:
+        location = state & location_mask
+        elephant_location = (state >> location_bits) & location_mask
+        open_valves = (state >> open_shift) & all_open
+        remaining_minutes = ((state >> minutes_shift) & minutes_mask) - 1
+        released = state >> released_shift
+        elephant_moves = moves(elephant_location, open_valves) if has_elephant else [(elephant_location, 0)]
+        for new_location, opened in moves(location, open_valves):
+            for new_elephant_location, elephant_opened in elephant_moves:
+                new_open_valves = open_valves | opened | elephant_opened
+                yield pack(new_location, new_elephant_location, new_open_valves, remaining_minutes,
+                           released + pressure(new_open_valves))
+        if open_valves == all_open:
+            # all of the valves are open, so do nothing:
+            yield pack(location, elephant_location, open_valves, remaining_minutes, released + pressure(open_valves))
+
+    def release_potential(state: int) -> int:
+        """
+        An upper bound on the pressure released by the end.
+
+        Each agent needs a minute to open a valve and at least another to reach the next one, so each of its
+        openings is worth at most two fewer minutes of flow than the last. Pairing the largest such multipliers with
+        the largest closed valves bounds whatever the agents could actually open.
+        """
+        location = state & location_mask
+        elephant_location = (state >> location_bits) & location_mask
+        open_valves = (state >> open_shift) & all_open
+        remaining_minutes = (state >> minutes_shift) & minutes_mask
+        potential = (state >> released_shift) + pressure(open_valves) * remaining_minutes
+        first_openings = [remaining_minutes if can_open(location, open_valves) else remaining_minutes - 1]
+        if has_elephant:
+            first_openings.append(
+                remaining_minutes if can_open(elephant_location, open_valves) else remaining_minutes - 1
+            )
+        multipliers = sorted((m for first in first_openings for m in range(first, 0, -2)), reverse=True)
+        closed_flow_rates = (flow_rates[i] for i in with_flow if not open_valves >> i & 1)
+        return potential + sum(flow_rate * m for flow_rate, m in zip(closed_flow_rates, multipliers))
+
+    def released_at_end(state: int) -> Optional[int]:
+        if (state >> minutes_shift) & minutes_mask == 0:
+            return state >> released_shift
+        return None
+
+    iteration = 0
+
+    def on_expand(state: int):
+        nonlocal iteration
+        iteration += 1
+        if iteration % 10000 == 0 and enabled(VERBOSE):
+            log(str(release_potential(state)))
+
+    open_valves = 0
+    for valve in initial_state.open_valves:
+        open_valves |= 1 << indices[valve]
+    elephant_location = indices[initial_state.elephant_location] if has_elephant else 0
+    root = pack(indices[initial_state.location], elephant_location, open_valves, total_minutes - 1, 0)
+    stats: Optional[SearchStats] = SearchStats() if enabled(VERBOSE) else None
+    best = branch_and_bound(root, successors, release_potential, released_at_end, incumbent=-1, stats=stats,
+                            on_expand=on_expand)
+    if stats is not None:
+        log(f"Search {stats!s}")
+    if best < 0:
         raise ValueError("No solution!")
+    return best
+
+
+@generator(day=16, default_scale=60)
+def generate_valves(out: TextIO, scale: int, rng: Random):
+    """Writes a connected network of `scale` valves, including AA"""
+    names = ["AA"] + rng.sample([f"{a}{b}" for a in ascii_uppercase for b in ascii_uppercase if a + b != "AA"],
+                                min(scale, 26 * 26) - 1)
+    tunnels: Dict[str, List[str]] = {name: [] for name in names}
+    for i, name in enumerate(names[1:], start=1):
+        tunnels[name].append(names[rng.randrange(i)])
+    for _ in range(len(names) // 3):
+        tunnels[rng.choice(names)].append(rng.choice(names))
+    neighbors: Dict[str, List[str]] = {name: [] for name in names}
+    for name, destinations in tunnels.items():
+        for destination in destinations:
+            if destination != name and destination not in neighbors[name]:
+                neighbors[name].append(destination)
+                neighbors[destination].append(name)
+    rng.shuffle(names)
+    for name in names:
+        flow_rate = 0 if name == "AA" or rng.random() < 0.75 else rng.randint(1, 25)
+        if len(neighbors[name]) == 1:
+            out.write(f"Valve {name} has flow rate={flow_rate}; tunnel leads to valve {neighbors[name][0]}\n")
+        else:
+            out.write(f"Valve {name} has flow rate={flow_rate}; tunnels lead to valves "
+                      f"{', '.join(neighbors[name])}\n")
 
 
 @challenge(day=16)
 def max_pressure(path: Path) -> int:
     valves = load(path)
-    for valve_name in sorted(valves.keys()):
-        print(str(valves[valve_name]))
+    if enabled(DEBUG):
+        for valve_name in sorted(valves.keys()):
+            log(str(valves[valve_name]), level=DEBUG)
     initial_state = State(location=valves["AA"], open_valves=frozenset())
     return solve(initial_state)
 
@@ -479,7 +451,8 @@ With you and an elephant working together for 26 minutes, what is the most press
 @challenge(day=16)
 def with_elephant_helping(path: Path):
     valves = load(path)
-    for valve_name in sorted(valves.keys()):
-        print(str(valves[valve_name]))
+    if enabled(DEBUG):
+        for valve_name in sorted(valves.keys()):
+            log(str(valves[valve_name]), level=DEBUG)
     initial_state = State(location=valves["AA"], elephant_location=valves["AA"], open_valves=frozenset())
     return solve(initial_state, total_minutes=26)
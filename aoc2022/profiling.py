@@ -0,0 +1,199 @@
+from collections import Counter
+import cProfile
+import pstats
+import resource
+import signal
+import sys
+import threading
+from threading import Event, Thread
+import tracemalloc
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+
+def max_rss() -> int:
+    """The peak resident set size of this process, in bytes"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return rss
+    return rss * 1024
+
+
+def format_bytes(num_bytes: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f}{unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f}GiB"
+
+
+# frames from these modules are profiling machinery rather than challenge code
+IGNORED_MODULES = frozenset({__name__, cProfile.__name__})
+
+
+def frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """Periodically samples the call stack using a CPU-time interval timer to produce collapsed stacks"""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval: float = interval
+        self.stacks: Dict[str, Counter] = {}
+        self._root: Optional[FrameType] = None
+        self._label: str = ""
+
+    @staticmethod
+    def is_supported() -> bool:
+        return hasattr(signal, "setitimer") and hasattr(signal, "SIGPROF")
+
+    def _sample(self, _signum: int, frame: Optional[FrameType]):
+        names: List[str] = []
+        while frame is not None and frame is not self._root:
+            if frame.f_globals.get("__name__") not in IGNORED_MODULES:
+                names.append(frame_name(frame))
+            frame = frame.f_back
+        if frame is None:
+            # the sample was taken outside of the profiled function
+            return
+        names.append(self._label)
+        self.stacks.setdefault(self._label, Counter())[";".join(reversed(names))] += 1
+
+    def run(self, label: str, call: Callable[[], Any]) -> Any:
+        self._root = sys._getframe()
+        self._label = label
+        previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        try:
+            return call()
+        finally:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, previous_handler)
+            self._root = None
+
+    def write_collapsed(self, stream: TextIO):
+        """Writes the samples in the collapsed-stack format consumed by `flamegraph.pl`, speedscope, etc."""
+        for counts in self.stacks.values():
+            for stack, count in sorted(counts.items()):
+                stream.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    Profiles challenge functions with cProfile and prints their hottest functions.
+
+    Only the call passed to `run` is profiled, so argument parsing and module imports are excluded.
+    """
+
+    def __init__(self, top: int = 20, collapsed_stacks: bool = False, stream: TextIO = sys.stderr):
+        self.top: int = top
+        self.stream: TextIO = stream
+        self.sampler: Optional[StackSampler] = None
+        if collapsed_stacks:
+            if StackSampler.is_supported():
+                self.sampler = StackSampler()
+            else:
+                stream.write("Warning: collapsed stacks require SIGPROF, which is not supported on this platform\n")
+
+    def run(self, label: str, call: Callable[[], Any]) -> Any:
+        profile = cProfile.Profile()
+        try:
+            if self.sampler is not None:
+                return self.sampler.run(label, lambda: profile.runcall(call))
+            else:
+                return profile.runcall(call)
+        finally:
+            self.report(label, profile)
+
+    def report(self, label: str, profile: cProfile.Profile):
+        stats = pstats.Stats(profile, stream=self.stream)
+        stats.strip_dirs()
+        for sort_key, description in ((pstats.SortKey.CUMULATIVE, "cumulative"), (pstats.SortKey.TIME, "self")):
+            self.stream.write(f"=== {label}: top {self.top} functions by {description} time ===\n")
+            stats.sort_stats(sort_key).print_stats(self.top)
+        self.stream.flush()
+
+    def write_collapsed(self, stream: TextIO):
+        if self.sampler is not None:
+            self.sampler.write_collapsed(stream)
+
+
+class PeakWatcher(Thread):
+    """Polls the traced memory from a background thread and snapshots the heap each time it reaches a new high"""
+
+    def __init__(self, interval: float = 0.05, growth: float = 1.1):
+        super().__init__(daemon=True)
+        self.interval: float = interval
+        self.growth: float = growth
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_size: int = 0
+        self._stop_event: Event = Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self.snapshot_size * self.growth:
+                self.snapshot = tracemalloc.take_snapshot()
+                self.snapshot_size = current
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class MemoryTracer:
+    """
+    Traces the allocations of challenge functions and reports their peak memory usage.
+
+    The allocation sites are taken from the largest heap snapshot seen while the function was running, which is
+    polled for every `interval` seconds, so they approximate the state of the heap at its peak.
+    """
+
+    def __init__(self, top: int = 10, interval: float = 0.05, stream: TextIO = sys.stderr):
+        self.top: int = top
+        self.interval: float = interval
+        self.stream: TextIO = stream
+
+    def run(self, label: str, call: Callable[[], Any]) -> Any:
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        watcher = PeakWatcher(interval=self.interval)
+        watcher.start()
+        try:
+            return call()
+        finally:
+            final_snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            watcher.stop()
+            if not was_tracing:
+                tracemalloc.stop()
+            if watcher.snapshot is not None and watcher.snapshot_size > sum(
+                    stat.size for stat in final_snapshot.statistics("filename")
+            ):
+                snapshot = watcher.snapshot
+            else:
+                snapshot = final_snapshot
+            self.report(label, peak - baseline, snapshot)
+
+    def report(self, label: str, peak: int, snapshot: tracemalloc.Snapshot):
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, threading.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        self.stream.write(f"=== {label}: memory ===\n")
+        self.stream.write(f"Peak traced memory: {format_bytes(peak)}\n")
+        # unlike the traced peak, this is a high-water mark for the whole process rather than for this part alone
+        self.stream.write(f"Process peak RSS so far: {format_bytes(max_rss())}\n")
+        self.stream.write(f"Top {self.top} allocation sites near the peak:\n")
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            frame = stat.traceback[0]
+            self.stream.write(f"{format_bytes(stat.size):>12} {stat.count:>10} blocks  {frame.filename}:{frame.lineno}\n")
+        self.stream.write("\n")
+        self.stream.flush()
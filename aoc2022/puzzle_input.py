@@ -0,0 +1,139 @@
+from array import array
+from contextlib import contextmanager
+import io
+import mmap
+import os
+from pathlib import Path
+import re
+from typing import BinaryIO, IO, Iterator, List, Tuple, Union
+
+
+class MemoryInput:
+    """
+    A puzzle input held in memory that can be passed to a challenge in place of a `Path`.
+
+    It implements the subset of the `Path` API that the challenges use (chiefly `open`), and every call to `open`
+    returns a new stream over the same underlying buffer, so the data is read once and never written to disk.
+    """
+
+    def __init__(self, data: bytes, name: str = "<memory>"):
+        self.data: bytes = data
+        self._name: str = name
+
+    @classmethod
+    def from_stream(cls, stream: BinaryIO, name: str = "<stream>") -> "MemoryInput":
+        return cls(stream.read(), name=name)
+
+    @classmethod
+    def from_fd(cls, fd: int, name: str = "<fd>") -> "MemoryInput":
+        chunks = []
+        while True:
+            chunk = os.read(fd, 1024 * 1024)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return cls(b"".join(chunks), name=name)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def exists(self) -> bool:
+        return True
+
+    def open(self, mode: str = "r", buffering: int = -1, encoding: str = "utf-8", errors=None, newline=None) -> IO:
+        if any(c in mode for c in "wax+"):
+            raise ValueError(f"{self.name} is read-only; invalid mode {mode!r}")
+        # BytesIO shares the immutable buffer until it is written to, so this does not copy the data
+        stream = io.BytesIO(self.data)
+        if "b" in mode:
+            return stream
+        return io.TextIOWrapper(stream, encoding=encoding, errors=errors, newline=newline)
+
+    def read_bytes(self) -> bytes:
+        return self.data
+
+    def read_text(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return self.data.decode(encoding, errors)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __eq__(self, other):
+        # inputs with the same contents are interchangeable, so they can share a parsed input
+        return isinstance(other, MemoryInput) and self.data == other.data
+
+    def __hash__(self):
+        return hash(self.data)
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(<{len(self.data)} bytes>, name={self.name!r})"
+
+
+PuzzleInput = Union[Path, MemoryInput]
+
+
+# anything that supports the buffer protocol and `re`, e.g., bytes, bytearray, mmap, or memoryview
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+SIGNED_INTEGER_PATTERN: re.Pattern = re.compile(rb"-?\d+")
+UNSIGNED_INTEGER_PATTERN: re.Pattern = re.compile(rb"\d+")
+BLANK_LINE_PATTERN: re.Pattern = re.compile(rb"\r?\n[ \t]*\r?\n")
+
+
+@contextmanager
+def mapped(path: PuzzleInput) -> Iterator[Buffer]:
+    """
+    Yields the raw bytes of an input without copying them into Python objects.
+
+    Files are memory-mapped read-only; a `MemoryInput` yields its existing buffer. The buffer is only valid until the
+    context exits.
+    """
+    if isinstance(path, MemoryInput):
+        yield path.data
+        return
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # empty files cannot be mapped
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def integers(source: Union[PuzzleInput, Buffer], signed: bool = True) -> array:
+    """
+    Extracts every integer in `source`, in order, into a signed 64-bit array in a single pass.
+
+    With `signed=False`, a `-` is treated as a separator rather than a sign, which is needed for inputs like `2-4`.
+    """
+    pattern = SIGNED_INTEGER_PATTERN if signed else UNSIGNED_INTEGER_PATTERN
+    if isinstance(source, (Path, MemoryInput)):
+        with mapped(source) as data:
+            return array("q", map(int, pattern.findall(data)))
+    return array("q", map(int, pattern.findall(source)))
+
+
+def integer_rows(
+        source: Union[PuzzleInput, Buffer], width: int, signed: bool = True
+) -> Iterator[Tuple[int, ...]]:
+    """
+    Extracts the integers in `source` as consecutive rows of exactly `width` values each.
+
+    This suits inputs in which every line has the same shape, e.g., `x,y,z` coordinates.
+    """
+    values = integers(source, signed=signed)
+    if len(values) % width != 0:
+        raise ValueError(f"{source!s} contains {len(values)} integers, which is not a multiple of {width}")
+    return zip(*(iter(values),) * width)
+
+
+def records(source: Union[PuzzleInput, Buffer]) -> List[bytes]:
+    """Splits `source` into its non-empty records that are separated by blank lines"""
+    if isinstance(source, (Path, MemoryInput)):
+        with mapped(source) as data:
+            return records(data)
+    return [record for record in BLANK_LINE_PATTERN.split(source) if record.strip()]
@@ -334,10 +334,13 @@ How many units tall will the tower of rocks be after 2022 rocks have stopped fal
 """
 
 from enum import Enum
+from random import Random
 import sys
-from typing import Dict, List, Optional, Sequence, Set, TextIO, Tuple
+from typing import Dict, Optional, Sequence, Set, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, Path
+from .cycles import find_cycle
+from .log import DEBUG, enabled, log
 
 
 Point = Tuple[int, int]
@@ -416,7 +419,8 @@ class Push(Enum):
         self.col_delta: int = col_delta
 
 
-CaveState = Tuple[int, Tuple[Tuple[bool, ...], ...]]
+# the jet state, and the rows at the top of the tower packed into an integer (see `Cave.state`)
+CaveState = Tuple[int, int]
 
 
 class Cave:
@@ -426,23 +430,30 @@ class Cave:
         self.width: int = width
         self.tower: Tower = Tower()
 
+    def row_mask(self, row: int) -> int:
+        return sum(1 << col for col in self.tower.tower.get(row, ()))
+
     @property
     def state(self) -> CaveState:
+        """
+        The jet state and the top of the tower, down to the first row by which every column has a stone.
+
+        The rows are packed `width` bits apiece, with the top row in the least significant bits.
+        """
+        full = (1 << self.width) - 1
         height = self.tower.height
         if height == 0:
-            return self.jet_state, ((True,) * self.width,)
-        row = 0
-        cave_rows: List[Tuple[bool, ...]] = []
-        has_stone: Tuple[bool, ...] = (False,) * self.width
-        while row < height:
-            new_row = tuple(self.tower[(height - row - 1, c)] for c in range(self.width))
-            cave_rows.append(new_row)
-            has_stone = tuple(a or b for a, b in zip(has_stone, new_row))
-            if all(has_stone):
+            return self.jet_state, full
+        rows = 0
+        has_stone = 0
+        for depth, row in enumerate(range(height - 1, -1, -1)):
+            mask = self.row_mask(row)
+            rows |= mask << (depth * self.width)
+            has_stone |= mask
+            if has_stone == full:
                 # every column has at least one stone
                 break
-            row += 1
-        return self.jet_state, tuple(cave_rows)
+        return self.jet_state, rows
 
     def drop(self, shape: Shape, print_steps: bool = False):
         row = self.tower.height + 3
@@ -496,9 +507,16 @@ class Cave:
         stream.write("+\n\n")
 
 
+@generator(day=17, default_scale=10091)
+def generate_jet_pattern(out: TextIO, scale: int, rng: Random):
+    """Writes a jet pattern of length `scale`"""
+    out.write("".join(rng.choices("<>", k=scale)))
+    out.write("\n")
+
+
 @challenge(day=17)
 def tower_height(path: Path) -> int:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         jet_pattern = [
             [Push.LEFT, Push.RIGHT][c == ">"]
             for c in f.read()
@@ -506,9 +524,9 @@ def tower_height(path: Path) -> int:
         ]
     cave = Cave(jet_pattern)
     shapes = [Shape.H_BAR, Shape.PLUS, Shape.BACK_L, Shape.V_BAR, Shape.BOX]
-    for shape in shapes:
-        print(str(shape))
-        print()
+    if enabled(DEBUG):
+        for shape in shapes:
+            log(f"{shape!s}\n", level=DEBUG)
     for rock in range(2022):
         cave.drop(shapes[rock % len(shapes)])  # , print_steps=True)
     return cave.tower.height
@@ -526,7 +544,7 @@ How tall will the tower be after 1000000000000 rocks have stopped?
 
 @challenge(day=17)
 def lots_of_rocks(path: Path) -> int:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         jet_pattern = [
             [Push.LEFT, Push.RIGHT][c == ">"]
             for c in f.read()
@@ -535,43 +553,14 @@ def lots_of_rocks(path: Path) -> int:
     cave = Cave(jet_pattern)
     shapes = [Shape.H_BAR, Shape.PLUS, Shape.BACK_L, Shape.V_BAR, Shape.BOX]
     rock = 0
-    states: List[Tuple[int, CaveState]] = []
-    state_height_delta: List[int] = []
-    state_index: Dict[Tuple[int, CaveState], int] = {}
-    next_state: Tuple[int, CaveState] = (rock, cave.state)
-    while next_state not in state_index:
+
+    def drop() -> int:
+        nonlocal rock
         height_before = cave.tower.height
         cave.drop(shapes[rock])
-        state_index[next_state] = len(states)
-        states.append(next_state)
-        state_height_delta.append(cave.tower.height - height_before)
         rock = (rock + 1) % len(shapes)
-        next_state = (rock, cave.state)
-    start_index = state_index[next_state]
-    cycle_length = len(states) - start_index
-    print(f"Cycle length: {cycle_length}")
-    pre_cycle_drops = len(states) - cycle_length
-    remaining_drops = 1000000000000 - pre_cycle_drops
-    print(f"Remaining drops: {remaining_drops}")
-    cycles = remaining_drops // cycle_length
-    print(f"Number of full cycles: {cycles}")
-    remaining_drops_after_cycles = remaining_drops % cycle_length
-    print(f"Remaining drops after cycles: {remaining_drops_after_cycles}")
-    # print(repr(next_state))
-    print(f"Start index: {start_index}, End index: {len(states) - 1}")
-    if start_index == 0:
-        cycle_start_height = 0
-    else:
-        cycle_start_height = sum(state_height_delta[:start_index])
-    print(f"Cycle start height: {cycle_start_height}")
-    cycle_height_delta = sum(state_height_delta[start_index:])
-    print(f"Cycle height delta: {cycle_height_delta}")
-    final_height = cycle_start_height + cycles * cycle_height_delta
-    if remaining_drops_after_cycles > 0:
-        remaining_height = sum(
-            state_height_delta[start_index:start_index + remaining_drops_after_cycles]
-        )
-        print(f"Remaining height: {remaining_height}")
-        assert remaining_height <= cycle_height_delta
-        final_height += remaining_height
-    return final_height
+        return cave.tower.height - height_before
+
+    cycle = find_cycle(drop, lambda: (rock, cave.state))
+    log(f"Cycle start: {cycle.start}, Cycle length: {cycle.length}, Cycle height delta: {cycle.cycle_delta}")
+    return cycle.value_after(1000000000000)
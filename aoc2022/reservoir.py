@@ -115,9 +115,12 @@ Using your scan, simulate the falling sand. How many units of sand come to rest
 """
 
 from enum import Enum
-from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from random import Random
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, parser, Path
+from .grid import Grid
+from .log import DEBUG, enabled, log
 
 
 class Space(Enum):
@@ -126,144 +129,109 @@ class Space(Enum):
     SAND = "o"
 
 
-class CaveRow:
-    def __init__(self, cave: "Cave", row: int):
-        self.cave: Cave = cave
-        self.row: int = row
-
-    def __getitem__(self, col_index: int) -> Space:
-        if self.cave.floor_row is not None and self.row >= self.cave.floor_row:
-            return Space.ROCK
-        elif self.row not in self.cave.cave:
-            return Space.AIR
-        row_dict = self.cave.cave[self.row]
-        if col_index not in row_dict:
-            return Space.AIR
-        else:
-            return row_dict[col_index]
-
-    def __setitem__(self, col_index: int, value: Space):
-        if self.cave.floor_row is not None and self.row >= self.cave.floor_row:
-            raise ValueError(f"Cannot change the value at or below the floor of {self.cave.floor_row}!")
-        elif self.row not in self.cave.cave:
-            row_dict = {}
-            self.cave.cave[self.row] = row_dict
-        else:
-            row_dict = self.cave.cave[self.row]
-        row_dict[col_index] = value
+AIR = ord(Space.AIR.value)
+ROCK = ord(Space.ROCK.value)
+SAND = ord(Space.SAND.value)
 
 
 class Cave:
-    def __init__(self, cave: Dict[int, Dict[int, Space]]):
-        self.cave: Dict[int, Dict[int, Space]] = {
-            row_index: {
-                col_index: col
-                for col_index, col in row.items()
-            }
-            for row_index, row in cave.items()
-        }
+    def __init__(self, rocks: Iterable[Tuple[int, int]], sand_col: int = 500):
+        rocks = list(rocks)
         self.min_row: int = 0
         self.sand_row: int = 0
-        self.sand_col: int = 500
-        self.floor_row: Optional[int] = None
+        self.sand_col: int = sand_col
+        self.max_row: int = max(row for row, _ in rocks)
+        self.min_col: int = min(col for _, col in rocks)
+        self.max_col: int = max(col for _, col in rocks)
+        self._floor_row: Optional[int] = None
+        # sand spreads at most one column per row, so it can never get past the floor's width on either side
+        floor_row = self.max_row + 2
+        self.col_offset: int = min(self.min_col, sand_col - floor_row) - 1
+        width = max(self.max_col, sand_col + floor_row) + 2 - self.col_offset
+        self.grid: Grid = Grid(width, floor_row + 1, fill=AIR)
+        for row, col in rocks:
+            self.grid.set(row, col - self.col_offset, ROCK)
 
     @property
-    def max_row(self) -> int:
-        return max(self.cave.keys())
-
-    @property
-    def min_col(self) -> int:
-        return min(c for r in self.cave.values() for c in r)
-
-    @property
-    def max_col(self) -> int:
-        return max(c for r in self.cave.values() for c in r)
-
-    def __getitem__(self, row_index: int) -> CaveRow:
-        return CaveRow(cave=self, row=row_index)
+    def floor_row(self) -> Optional[int]:
+        return self._floor_row
+
+    @floor_row.setter
+    def floor_row(self, row: Optional[int]):
+        if row is not None and row != self.max_row + 2:
+            raise ValueError(f"The floor must be two rows below the lowest rock, at {self.max_row + 2}")
+        self._floor_row = row
+        for i in self.grid.row_indices(self.max_row + 2):
+            self.grid[i] = AIR if row is None else ROCK
+
+    def __getitem__(self, row_col: Tuple[int, int]) -> Space:
+        row, col = row_col
+        col -= self.col_offset
+        if not self.grid.in_bounds(row, col):
+            return Space.ROCK if self.floor_row is not None and row >= self.floor_row else Space.AIR
+        return Space(chr(self.grid.get(row, col)))
 
     @classmethod
     def load(cls, paths: Iterable[Iterable[Tuple[int, int]]]) -> "Cave":
-        cave: Dict[int, Dict[int, Space]] = {}
+        rocks: List[Tuple[int, int]] = []
         for path in paths:
             last_row: Optional[int] = None
             last_col: Optional[int] = None
             for col, row in path:
                 if last_row is not None and last_col is not None:
                     if last_row == row:
-                        if last_col < col:
-                            from_col = last_col
-                            to_col = col
-                        else:
-                            from_col = col
-                            to_col = last_col
-                        for c in range(from_col, to_col + 1):
-                            if row not in cave:
-                                cave[row] = {c: Space.ROCK}
-                            else:
-                                cave[row][c] = Space.ROCK
+                        rocks.extend((row, c) for c in range(min(col, last_col), max(col, last_col) + 1))
                     elif last_col == col:
-                        if last_row < row:
-                            from_row = last_row
-                            to_row = row
-                        else:
-                            from_row = row
-                            to_row = last_row
-                        for r in range(from_row, to_row + 1):
-                            if r not in cave:
-                                cave[r] = {col: Space.ROCK}
-                            else:
-                                cave[r][col] = Space.ROCK
+                        rocks.extend((r, col) for r in range(min(row, last_row), max(row, last_row) + 1))
                 last_row, last_col = row, col
-        return cls(cave)
+        return cls(rocks)
 
     def drop_sand(self) -> Tuple[int, int]:
+        cells = self.grid.cells
+        stride = self.grid.stride
         sand_row = self.sand_row
-        sand_col = self.sand_col
+        index = self.grid.index(sand_row, self.sand_col - self.col_offset)
         max_row = self.max_row
-        while sand_row <= max_row:
-            next_row = self[sand_row + 1]
-            if next_row[sand_col] != Space.AIR:
-                if next_row[sand_col - 1] != Space.AIR:
-                    if next_row[sand_col + 1] != Space.AIR:
-                        return sand_row, sand_col
-                    else:
-                        sand_row += 1
-                        sand_col += 1
-                else:
-                    sand_row += 1
-                    sand_col -= 1
+        while sand_row <= max_row or self.floor_row is not None:
+            below = index + stride
+            if cells[below] == AIR:
+                index = below
+            elif cells[below - 1] == AIR:
+                index = below - 1
+            elif cells[below + 1] == AIR:
+                index = below + 1
             else:
-                sand_row += 1
-        return sand_row, sand_col
+                break
+            sand_row += 1
+        row, col = self.grid.position(index)
+        return row, col + self.col_offset
 
     def simulate(self) -> Iterator[Tuple[int, int]]:
         while True:
             sand_row, sand_col = self.drop_sand()
             if self.floor_row is None and sand_row > self.max_row:
                 break
-            self[sand_row][sand_col] = Space.SAND
+            self.grid.set(sand_row, sand_col - self.col_offset, SAND)
             yield sand_row, sand_col
             if sand_row == self.sand_row and sand_col == self.sand_col:
                 break
 
     def __str__(self):
-        min_col = self.min_col
-        max_col = self.max_col
         rows: List[str] = []
         for row in range(self.min_row, self.max_row + 1):
             s_row: List[str] = []
-            for col in range(min_col, max_col + 1):
+            for col in range(self.min_col, self.max_col + 1):
                 if row == self.sand_row and col == self.sand_col:
                     s_row.append("+")
                 else:
-                    s_row.append(self[row][col].value)  # type: ignore
+                    s_row.append(self[row, col].value)
             rows.append("".join(s_row))
         return "\n".join(rows)
 
 
+@parser(day=14)
 def load(path: Path) -> Cave:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         cave: Iterable[Iterable[Tuple[int, int]]] = [
             [
                 tuple(map(int, p.split(",")))
@@ -274,11 +242,29 @@ def load(path: Path) -> Cave:
         return Cave.load(cave)
 
 
-@challenge(day=14)
-def units_of_resting_sand(path: Path) -> int:
-    cave = load(path)
+@generator(day=14, default_scale=140)
+def generate_rock_paths(out: TextIO, scale: int, rng: Random):
+    """Writes `scale` paths of rock in a region that grows with the number of paths"""
+    min_col, max_col = 500 - scale, 500 + scale
+    min_row, max_row = 5, 5 + scale
+    for _ in range(scale):
+        col, row = rng.randint(min_col, max_col), rng.randint(min_row, max_row)
+        points = [f"{col},{row}"]
+        for i in range(rng.randint(1, 5)):
+            if i % 2 == 0:
+                col = min(max_col, max(min_col, col + rng.choice((-1, 1)) * rng.randint(1, 8)))
+            else:
+                row = min(max_row, max(min_row, row + rng.choice((-1, 1)) * rng.randint(1, 8)))
+            points.append(f"{col},{row}")
+        out.write(" -> ".join(points))
+        out.write("\n")
+
+
+@challenge(day=14, parsed=True, mutates=True)
+def units_of_resting_sand(cave: Cave) -> int:
     sand_dropped = sum(1 for _ in cave.simulate())
-    print(str(cave))
+    if enabled(DEBUG):
+        log(str(cave), level=DEBUG)
     return sand_dropped
 
 
@@ -320,10 +306,10 @@ Using your scan, simulate the falling sand until the source of the sand becomes
 """
 
 
-@challenge(day=14)
-def units_of_resting_sand(path: Path) -> int:
-    cave = load(path)
+@challenge(day=14, parsed=True, mutates=True)
+def units_of_resting_sand(cave: Cave) -> int:
     cave.floor_row = cave.max_row + 2
     sand_dropped = sum(1 for _ in cave.simulate())
-    print(str(cave))
+    if enabled(DEBUG):
+        log(str(cave), level=DEBUG)
     return sand_dropped
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
 from enum import IntEnum
-from typing import Iterator, Tuple
+from random import Random
+from typing import Iterator, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, Path
 
 """
 --- Day 2: Rock Paper Scissors ---
@@ -111,12 +112,19 @@ class Round:
 
 
 def load_rounds(path: Path) -> Iterator[Round]:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         for line in f:
             their_move, our_move = map(Move.load, line.split())
             yield Round(their_move, our_move)
 
 
+@generator(day=2, default_scale=2500)
+def generate_strategy_guide(out: TextIO, scale: int, rng: Random):
+    """Writes a strategy guide with `scale` rounds"""
+    for _ in range(scale):
+        out.write(f"{rng.choice('ABC')} {rng.choice('XYZ')}\n")
+
+
 @challenge(day=2)
 def total_score(path: Path) -> int:
     return sum(r.score for r in load_rounds(path))
@@ -138,7 +146,7 @@ Following the Elf's instructions for the second column, what would your total sc
 
 
 def load_rounds_part_2(path: Path) -> Iterator[Tuple[Move, Outcome]]:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         for line in f:
             their_move, desired_outcome_code = line.split()
             if desired_outcome_code == "X":
@@ -243,9 +243,10 @@ Simulate your complete hypothetical series of motions. How many positions does t
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Iterator, List, Optional
+from random import Random
+from typing import Iterator, List, Optional, TextIO
 
-from . import challenge, Path
+from . import challenge, generator, Path
 
 
 class Direction(Enum):
@@ -371,7 +372,7 @@ class RopeState:
 
 
 def load(path: Path) -> Iterator[Move]:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         for line in f:
             raw_direction, raw_distance = line.split()
             for direction in Direction:
@@ -383,6 +384,13 @@ def load(path: Path) -> Iterator[Move]:
             yield Move(direction=direction, distance=distance)
 
 
+@generator(day=9, default_scale=2000)
+def generate_motions(out: TextIO, scale: int, rng: Random):
+    """Writes `scale` head motions"""
+    for _ in range(scale):
+        out.write(f"{rng.choice(list(Direction)).value} {rng.randint(1, 20)}\n")
+
+
 @challenge(day=9)
 def rope_positions(path: Path) -> int:
     state = RopeState()
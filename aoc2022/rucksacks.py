@@ -1,6 +1,8 @@
-from typing import FrozenSet, Iterable, Iterator, Tuple
+from random import Random
+from string import ascii_letters
+from typing import FrozenSet, Iterable, Iterator, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, Path
 
 """
 --- Day 3: Rucksack Reorganization ---
@@ -37,6 +39,8 @@ Find the item type that appears in both compartments of each rucksack. What is t
 
 
 class Item:
+    __slots__ = "item_type",
+
     def __init__(self, item_type: str):
         if len(item_type) != 1:
             raise ValueError(item_type)
@@ -60,6 +64,8 @@ class Item:
 
 
 class Rucksack:
+    __slots__ = "compartment1", "compartment2"
+
     def __init__(self, compartment1: Iterable[Item], compartment2: Iterable[Item]):
         self.compartment1: FrozenSet[Item] = frozenset(compartment1)
         self.compartment2: FrozenSet[Item] = frozenset(compartment2)
@@ -74,11 +80,30 @@ class Rucksack:
 
 
 def load_rucksacks(path: Path) -> Iterator[Rucksack]:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         for line in f:
             yield Rucksack.load(line.strip())
 
 
+@generator(day=3, default_scale=100)
+def generate_rucksacks(out: TextIO, scale: int, rng: Random):
+    """Writes `scale` groups of three rucksacks"""
+    for _ in range(scale):
+        item_types = list(ascii_letters)
+        rng.shuffle(item_types)
+        badge = item_types.pop()
+        for elf in range(3):
+            # each elf draws from a disjoint set of item types so that the badge is the only type common to all three
+            pool = item_types[elf * 17:(elf + 1) * 17]
+            misplaced = pool[0]
+            size = rng.randint(8, 24)
+            compartment1 = [misplaced, badge] + rng.choices(pool[1:9], k=size - 2)
+            compartment2 = [misplaced] + rng.choices(pool[9:], k=size - 1)
+            rng.shuffle(compartment1)
+            rng.shuffle(compartment2)
+            out.write(f"{''.join(compartment1)}{''.join(compartment2)}\n")
+
+
 @challenge(day=3)
 def rucksack_reorganiztion(path: Path) -> int:
     return sum(next(iter(r.compartment1 & r.compartment2)).priority for r in load_rucksacks(path))
@@ -113,7 +138,7 @@ Find the item type that corresponds to the badges of each three-Elf group. What
 
 
 def load_groups(path: Path) -> Iterator[Tuple[Rucksack, Rucksack, Rucksack]]:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         line_group = []
         for line in f:
             line_group.append(line.strip())
@@ -0,0 +1,195 @@
+from contextlib import redirect_stdout
+from dataclasses import dataclass, replace
+import os
+from pathlib import Path
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from . import CHALLENGES, REFERENCE
+from .puzzle_input import PuzzleInput
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from multiprocessing.connection import Connection
+
+DEFAULT_INPUTS_DIR = Path("inputs")
+
+
+def default_input(day: int, inputs_dir: Path = DEFAULT_INPUTS_DIR) -> Path:
+    return inputs_dir / f"day{day}.txt"
+
+
+def select_parts(day: Optional[int] = None, part: int = -1) -> Iterator[Tuple[int, int, Callable[[Path], Any]]]:
+    if day is None:
+        days: Sequence[int] = list(CHALLENGES)
+    else:
+        days = [day]
+    for d in days:
+        parts = CHALLENGES[d]
+        if part < 0:
+            yield from ((d, p, func) for p, func in sorted(parts.items()))
+        elif part in parts:
+            yield d, part, parts[part]
+        else:
+            raise KeyError(f"Day {d} does not have part {part}")
+
+
+@dataclass(frozen=True)
+class PartResult:
+    day: int
+    part: int
+    name: str
+    answer: Optional[str]
+    duration: float
+    error: Optional[str] = None
+    cached: bool = False
+    # the budget that the part overran ("time" or "memory"), if any
+    exceeded: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def __str__(self):
+        if self.succeeded:
+            return f"Day {self.day} Part {self.part}: {self.answer}"
+        elif self.exceeded is not None:
+            return f"Day {self.day} Part {self.part}: BUDGET EXCEEDED ({self.exceeded}) {self.error}"
+        else:
+            return f"Day {self.day} Part {self.part}: ERROR {self.error}"
+
+
+def run_part(day: int, part: int, path: Path, impl: str = REFERENCE) -> PartResult:
+    """Runs a single part with its output suppressed; this is the unit of work sent to the process pool"""
+    func = CHALLENGES.implementation(day, part, impl)
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            answer = func(path)
+    except Exception as e:
+        return PartResult(day=day, part=part, name=func.__name__, answer=None, duration=time.perf_counter() - start,
+                          error=f"{e.__class__.__name__}: {e!s}")
+    return PartResult(day=day, part=part, name=func.__name__, answer=str(answer),
+                      duration=time.perf_counter() - start)
+
+
+SIZE_SUFFIXES: Dict[str, int] = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(size: str) -> int:
+    """Parses a number of bytes with an optional binary suffix, like `512M` or `2G`"""
+    text = size.strip().upper()
+    if text.endswith("IB"):
+        text = text[:-2]
+    elif text.endswith("B"):
+        text = text[:-1]
+    suffix = text[-1:] if text[-1:] in SIZE_SUFFIXES else ""
+    try:
+        num_bytes = int(float(text[:len(text) - len(suffix)]) * SIZE_SUFFIXES[suffix])
+    except ValueError:
+        raise ValueError(f"invalid size: {size!r}")
+    if num_bytes <= 0:
+        raise ValueError(f"invalid size: {size!r}")
+    return num_bytes
+
+
+def _run_limited_part(
+        connection: "Connection", day: int, part: int, path: PuzzleInput, max_memory: Optional[int], impl: str
+):
+    if max_memory is not None:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+    connection.send(run_part(day, part, path, impl))
+    connection.close()
+
+
+def run_limited_part(
+        day: int,
+        part: int,
+        path: PuzzleInput,
+        timeout: Optional[float] = None,
+        max_memory: Optional[int] = None,
+        impl: str = REFERENCE
+) -> PartResult:
+    """
+    Runs a single part in a child process that is killed if it runs longer than `timeout` seconds.
+
+    `max_memory` limits the child's address space in bytes, so it includes the interpreter itself. A part that
+    overruns either budget returns a result whose `exceeded` field names the budget rather than raising.
+    """
+    # multiprocessing is only imported when a part is budgeted to keep startup fast
+    import multiprocessing
+
+    name = CHALLENGES.part_names(day).get(part, "?")
+    connection, child_connection = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_run_limited_part,
+                                      args=(child_connection, day, part, path, max_memory, impl), daemon=True)
+    start = time.perf_counter()
+    process.start()
+    child_connection.close()
+    try:
+        if not connection.poll(timeout):
+            process.kill()
+            return PartResult(day=day, part=part, name=name, answer=None, duration=time.perf_counter() - start,
+                              error=f"did not finish within {timeout} seconds", exceeded="time")
+        try:
+            result: PartResult = connection.recv()
+        except EOFError:
+            process.join()
+            duration = time.perf_counter() - start
+            if max_memory is not None:
+                # allocation failures outside of Python code (e.g., while growing the stack) kill the process
+                return PartResult(day=day, part=part, name=name, answer=None, duration=duration,
+                                  error=f"the process exited with code {process.exitcode} while limited to "
+                                        f"{max_memory} bytes", exceeded="memory")
+            return PartResult(day=day, part=part, name=name, answer=None, duration=duration,
+                              error=f"the process exited with code {process.exitcode}")
+        if max_memory is not None and result.error is not None and result.error.startswith("MemoryError"):
+            result = replace(result, error=f"{result.error} (limited to {max_memory} bytes)", exceeded="memory")
+        return result
+    finally:
+        process.join()
+        connection.close()
+
+
+def run_parallel(
+        tasks: Sequence[Tuple[int, int, Path]],
+        jobs: Optional[int] = None,
+        on_result: Optional[Callable[[PartResult], Any]] = None,
+        timeout: Optional[float] = None,
+        max_memory: Optional[int] = None,
+        impl: str = REFERENCE
+) -> List[PartResult]:
+    """
+    Runs every (day, part, input) task across a process pool.
+
+    `on_result` is called as each task finishes; the returned results are sorted by (day, part) regardless of the
+    order in which they finished. If a `timeout` or `max_memory` budget is given, each task is run in its own child
+    process to enforce it.
+    """
+    from concurrent.futures import as_completed, ProcessPoolExecutor
+
+    results: Dict[Tuple[int, int], PartResult] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if timeout is None and max_memory is None:
+            futures: Dict["Future", Tuple[int, int]] = {
+                executor.submit(run_part, day, part, path, impl): (day, part)
+                for day, part, path in tasks
+            }
+        else:
+            futures = {
+                executor.submit(run_limited_part, day, part, path, timeout, max_memory, impl): (day, part)
+                for day, part, path in tasks
+            }
+        for future in as_completed(futures):
+            day, part = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # the worker itself died (e.g., it ran out of memory)
+                result = PartResult(day=day, part=part, name=CHALLENGES.part_names(day).get(part, "?"), answer=None,
+                                    duration=0.0, error=f"{e.__class__.__name__}: {e!s}")
+            results[(day, part)] = result
+            if on_result is not None:
+                on_result(result)
+    return [results[key] for key in sorted(results)]
@@ -0,0 +1,173 @@
+import argparse
+import json
+from math import log2
+from pathlib import Path
+import sys
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import CHALLENGES
+from .bench import environment, format_duration, measure
+from .gen import generate, get_generator
+from .log import add_verbosity_arguments, configure_verbosity, log
+from .profiling import format_bytes
+from .runner import select_parts
+
+
+def scale_ladder(largest: int, steps: int = 5, factor: float = 2.0) -> List[int]:
+    """Returns up to `steps` distinct scales that grow geometrically by `factor` up to `largest`"""
+    scales = {max(1, round(largest / factor ** i)) for i in range(steps)}
+    return sorted(scales)
+
+
+def fit_exponent(sizes: Sequence[float], values: Sequence[float]) -> Optional[float]:
+    """
+    The least-squares slope of log(value) against log(size), i.e., k such that value ≈ c·size^k.
+
+    Returns `None` if there are fewer than two usable points.
+    """
+    points = [(log2(s), log2(v)) for s, v in zip(sizes, values) if s > 0 and v > 0]
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return covariance / variance
+
+
+def format_exponent(exponent: Optional[float]) -> str:
+    if exponent is None:
+        return "n/a"
+    return f"n^{exponent:.2f}"
+
+
+def scaling(
+        day: int,
+        scales: Sequence[int],
+        part: int = -1,
+        seed: int = 0,
+        warmup: int = 0,
+        repeat: int = 3,
+        time_limit: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Measures every selected part of `day` on a generated input at each of `scales`.
+
+    Larger scales of a part are skipped once its median time at some scale exceeds `time_limit` seconds.
+    """
+    parts = list(select_parts(day, part))
+    results: List[Dict[str, Any]] = [
+        {"day": day, "part": p, "name": func.__name__, "samples": []} for _, p, func in parts
+    ]
+    with TemporaryDirectory(prefix="aoc2022-scale-") as tmpdir:
+        for scale in scales:
+            path = Path(tmpdir) / f"day{day}-{scale}.txt"
+            with open(path, "w") as f:
+                generate(day, f, scale=scale, seed=seed)
+            for (_, p, func), result in zip(parts, results):
+                samples = result["samples"]
+                if time_limit is not None and samples and samples[-1]["wall"]["median"] > time_limit:
+                    continue
+                log(f"Day {day} part {p}: scale {scale}")
+                sample: Dict[str, Any] = {"scale": scale, "input_bytes": path.stat().st_size}
+                sample.update(measure(func, path, warmup=warmup, repeat=repeat))
+                samples.append(sample)
+    for result in results:
+        samples = result["samples"]
+        sizes = [sample["scale"] for sample in samples]
+        result["time_exponent"] = fit_exponent(sizes, [sample["wall"]["median"] for sample in samples])
+        result["memory_exponent"] = fit_exponent(sizes, [sample["peak_memory"] for sample in samples])
+    return results
+
+
+HEADER = f"{'Scale':>10}{'Input':>12}{'Median':>10}{'Peak Mem':>12}{'Time Exp':>10}{'Mem Exp':>10}"
+
+
+def format_table(result: Dict[str, Any]) -> str:
+    """Formats the samples of one part along with the exponent between each consecutive pair of scales"""
+    lines = [f"Day {result['day']} part {result['part']} ({result['name']})", HEADER]
+    previous: Optional[Dict[str, Any]] = None
+    for sample in result["samples"]:
+        time_step = memory_step = ""
+        if previous is not None:
+            sizes = (previous["scale"], sample["scale"])
+            time_step = format_exponent(fit_exponent(sizes, (previous["wall"]["median"], sample["wall"]["median"])))
+            memory_step = format_exponent(fit_exponent(sizes, (previous["peak_memory"], sample["peak_memory"])))
+        lines.append(f"{sample['scale']:>10}{format_bytes(sample['input_bytes']):>12}"
+                     f"{format_duration(sample['wall']['median']):>10}{format_bytes(sample['peak_memory']):>12}"
+                     f"{time_step:>10}{memory_step:>10}")
+        previous = sample
+    lines.append(f"time ≈ {format_exponent(result['time_exponent'])}, "
+                 f"peak memory ≈ {format_exponent(result['memory_exponent'])} (n = scale)")
+    return "\n".join(lines)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="aoc2022 scale",
+                                     description="Measure how a day's solutions scale by timing them on generated "
+                                                 "inputs of increasing size and fitting time ≈ c·n^k")
+
+    parser.add_argument("--day", "-d", type=int, required=True, choices=sorted(CHALLENGES.keys()),
+                        help="the day number")
+    parser.add_argument("--part", "-p", type=int, default=-1, help="only measure this part; if the part is "
+                                                                   "negative, then all parts will be run (default=-1)")
+    parser.add_argument("--scales", type=int, nargs="+", default=None,
+                        help="the generator scales to measure (default is a ladder ending at --largest)")
+    parser.add_argument("--largest", type=int, default=None,
+                        help="the largest scale of the ladder (default is the generator's default scale, which is "
+                             "about the size of a real input)")
+    parser.add_argument("--steps", type=int, default=5, help="the number of scales in the ladder (default=5)")
+    parser.add_argument("--factor", type=float, default=2.0,
+                        help="the ratio between consecutive scales in the ladder (default=2)")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed for the generated inputs (default=0)")
+    parser.add_argument("--warmup", "-w", type=int, default=0, help="number of untimed runs before timing "
+                                                                    "(default=0)")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="number of timed runs per scale (default=3)")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="stop measuring a part at larger scales once its median time exceeds this many seconds")
+    parser.add_argument("--json", "-j", type=str, help="also write the results as JSON to this path, or '-' for "
+                                                       "STDOUT (which suppresses the tables)")
+
+    add_verbosity_arguments(parser)
+
+    args = parser.parse_args(argv[1:])
+    configure_verbosity(args)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    elif args.steps < 2:
+        parser.error("--steps must be at least 2")
+    elif args.factor <= 1:
+        parser.error("--factor must be greater than 1")
+    elif args.scales is not None and (len(set(args.scales)) < 2 or min(args.scales) < 1):
+        parser.error("--scales needs at least two distinct positive scales")
+
+    try:
+        gen = get_generator(args.day)
+    except KeyError as e:
+        sys.stderr.write(f"{e.args[0]}\n")
+        return 1
+    if args.scales is not None:
+        scales = sorted(set(args.scales))
+    else:
+        scales = scale_ladder(args.largest or gen.default_scale, steps=args.steps, factor=args.factor)
+
+    try:
+        results = scaling(args.day, scales, part=args.part, seed=args.seed, warmup=args.warmup, repeat=args.repeat,
+                          time_limit=args.time_limit)
+    except KeyError as e:
+        sys.stderr.write(f"{e.args[0]}\n")
+        return 1
+
+    if args.json != "-":
+        print("\n\n".join(format_table(result) for result in results))
+    if args.json is not None:
+        report = {"environment": environment(), "seed": args.seed, "results": results}
+        if args.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        else:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+    return 0
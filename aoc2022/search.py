@@ -0,0 +1,295 @@
+"""
+Graph searches over states encoded as non-negative integers.
+
+A day packs each of its states into a single `int` (e.g., a grid index, or several bit fields) and supplies a
+`successors` function; the search itself never constructs per-node objects. Nodes have no parent pointers, and the
+set of visited states is a `ClosedSet`, which is one byte per state when the number of states is known up front.
+
+Each search can fill in a `SearchStats` with its expansion counters, and they are also added to the `--stats` counters.
+While counting, a search publishes its counters every `FLUSH_INTERVAL` expansions so that a long search can be watched
+with `--stats-file`.
+"""
+from dataclasses import dataclass
+import heapq
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+from .counters import add, counting, FLUSH_INTERVAL, high_water
+
+
+@dataclass
+class SearchStats:
+    expanded: int = 0
+    """the number of states whose successors were generated"""
+    generated: int = 0
+    """the number of successors generated, including those that were already closed"""
+    max_frontier: int = 0
+    """the largest number of states waiting to be expanded at any one time"""
+    closed: int = 0
+    """the number of distinct states reached"""
+    pruned: int = 0
+    """the number of states discarded by a bound rather than expanded"""
+
+    def __str__(self):
+        return f"expanded {self.expanded} states, generated {self.generated} successors, " \
+               f"{self.closed} distinct, {self.pruned} pruned, frontier peaked at {self.max_frontier}"
+
+
+def _publish(published: List[int], expanded: int, generated: int, max_frontier: int, closed: int, pruned: int):
+    """
+    Adds one search's counters to the `--stats` counters.
+
+    `published` holds the expanded, generated, closed, and pruned counts that were already added by earlier calls for
+    the same search, and it is updated so that each call only adds what has changed since.
+    """
+    if not counting():
+        return
+    add("search.expanded", expanded - published[0])
+    add("search.generated", generated - published[1])
+    add("search.closed", closed - published[2])
+    add("search.pruned", pruned - published[3])
+    high_water("search.max_frontier", max_frontier)
+    published[:] = expanded, generated, closed, pruned
+
+
+def _record(
+        stats: Optional[SearchStats], published: List[int], expanded: int, generated: int, max_frontier: int,
+        closed: int, pruned: int = 0
+):
+    """Adds the counters from one search to `stats`, if provided, and to the `--stats` counters"""
+    if stats is not None:
+        stats.expanded += expanded
+        stats.generated += generated
+        stats.max_frontier = max(stats.max_frontier, max_frontier)
+        stats.closed += closed
+        stats.pruned += pruned
+    _publish(published, expanded, generated, max_frontier, closed, pruned)
+
+
+class ClosedSet:
+    """
+    The set of states that a search has already reached.
+
+    If `num_states` is provided, every state must be in `range(num_states)`, and membership is stored in a
+    `bytearray`; otherwise, it is stored in a `set`.
+    """
+
+    __slots__ = "_flags", "_states", "_size"
+
+    def __init__(self, num_states: Optional[int] = None):
+        self._flags: Optional[bytearray] = None if num_states is None else bytearray(num_states)
+        self._states: Optional[Set[int]] = set() if num_states is None else None
+        self._size: int = 0
+
+    def add(self, state: int) -> bool:
+        """Adds `state`, returning whether it was new"""
+        if self._flags is not None:
+            if self._flags[state]:
+                return False
+            self._flags[state] = 1
+        elif state in self._states:
+            return False
+        else:
+            self._states.add(state)
+        self._size += 1
+        return True
+
+    def __contains__(self, state: int) -> bool:
+        if self._flags is not None:
+            return bool(self._flags[state])
+        return state in self._states
+
+    def __len__(self):
+        return self._size
+
+
+class BucketQueue:
+    """
+    A monotone priority queue for small non-negative integer priorities.
+
+    Pushing and popping are constant time, but a pushed priority must never be less than that of the last popped
+    state, which holds for Dijkstra's algorithm and for A* with a consistent heuristic.
+    """
+
+    __slots__ = "_buckets", "_current", "_size"
+
+    def __init__(self):
+        self._buckets: List[List[int]] = []
+        self._current: int = 0
+        self._size: int = 0
+
+    def push(self, priority: int, state: int):
+        if priority < self._current:
+            raise ValueError(f"Priority {priority} is less than the last popped priority {self._current}")
+        while len(self._buckets) <= priority:
+            self._buckets.append([])
+        self._buckets[priority].append(state)
+        self._size += 1
+
+    def pop(self) -> Tuple[int, int]:
+        """Removes and returns a `(priority, state)` pair with the least priority"""
+        if not self._size:
+            raise IndexError("pop from an empty BucketQueue")
+        while not self._buckets[self._current]:
+            self._current += 1
+        self._size -= 1
+        return self._current, self._buckets[self._current].pop()
+
+    def __len__(self):
+        return self._size
+
+
+def bfs(
+        starts: Iterable[int],
+        successors: Callable[[int], Iterable[int]],
+        is_goal: Callable[[int], bool],
+        num_states: Optional[int] = None,
+        stats: Optional[SearchStats] = None
+) -> Optional[Tuple[int, int]]:
+    """
+    Breadth-first search from all of `starts` at once, one layer at a time.
+
+    Returns the first goal state reached along with its distance from the nearest start, or `None` if no goal is
+    reachable.
+    """
+    closed = ClosedSet(num_states)
+    frontier = [state for state in starts if closed.add(state)]
+    expanded = generated = max_frontier = 0
+    published = [0, 0, 0, 0]
+    distance = 0
+    try:
+        while frontier:
+            max_frontier = max(max_frontier, len(frontier))
+            next_frontier: List[int] = []
+            for state in frontier:
+                if is_goal(state):
+                    return state, distance
+                expanded += 1
+                if expanded % FLUSH_INTERVAL == 0:
+                    _publish(published, expanded, generated, max_frontier, len(closed), 0)
+                for successor in successors(state):
+                    generated += 1
+                    if closed.add(successor):
+                        next_frontier.append(successor)
+            frontier = next_frontier
+            distance += 1
+        return None
+    finally:
+        _record(stats, published, expanded, generated, max_frontier, len(closed))
+
+
+def shortest_path(
+        starts: Iterable[int],
+        successors: Callable[[int], Iterable[Tuple[int, int]]],
+        is_goal: Callable[[int], bool],
+        heuristic: Optional[Callable[[int], int]] = None,
+        num_states: Optional[int] = None,
+        buckets: bool = False,
+        stats: Optional[SearchStats] = None
+) -> Optional[Tuple[int, int]]:
+    """
+    Dijkstra's algorithm, or A* if a `heuristic` is provided, from all of `starts` at once.
+
+    `successors` yields `(successor, step_cost)` pairs with non-negative costs, and the heuristic must be consistent.
+    If `buckets` is `True`, costs must be integers, and the frontier is a `BucketQueue` rather than a binary heap.
+
+    Returns the first goal state reached along with its cost, or `None` if no goal is reachable.
+    """
+    closed = ClosedSet(num_states)
+    costs = {}
+    frontier = BucketQueue() if buckets else None
+    heap: List[Tuple[int, int, int]] = []
+
+    def push(state: int, cost: int):
+        if state in costs and costs[state] <= cost:
+            return
+        costs[state] = cost
+        priority = cost if heuristic is None else cost + heuristic(state)
+        if frontier is not None:
+            frontier.push(priority, state)
+        else:
+            heapq.heappush(heap, (priority, cost, state))
+
+    for start in starts:
+        push(start, 0)
+    expanded = generated = max_frontier = 0
+    published = [0, 0, 0, 0]
+    try:
+        while True:
+            size = len(heap) if frontier is None else len(frontier)
+            if not size:
+                return None
+            max_frontier = max(max_frontier, size)
+            if frontier is None:
+                _, cost, state = heapq.heappop(heap)
+            else:
+                _, state = frontier.pop()
+                cost = costs[state]
+            if not closed.add(state):
+                continue
+            if is_goal(state):
+                return state, cost
+            expanded += 1
+            if expanded % FLUSH_INTERVAL == 0:
+                _publish(published, expanded, generated, max_frontier, len(closed), 0)
+            for successor, step_cost in successors(state):
+                generated += 1
+                if successor not in closed:
+                    push(successor, cost + step_cost)
+    finally:
+        _record(stats, published, expanded, generated, max_frontier, len(closed))
+
+
+def branch_and_bound(
+        root: int,
+        successors: Callable[[int], Iterable[int]],
+        upper_bound: Callable[[int], int],
+        value: Callable[[int], Optional[int]],
+        incumbent: int = 0,
+        stats: Optional[SearchStats] = None,
+        on_expand: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Best-first branch and bound that maximizes `value` over the terminal states reachable from `root`.
+
+    `value` returns `None` for non-terminal states, and `upper_bound` must never underestimate the value of any
+    terminal state reachable from a state. States are expanded in order of decreasing upper bound, and any state whose
+    bound does not exceed the best value found so far (initially `incumbent`) is pruned, so the search ends as soon
+    as the best remaining bound cannot improve on it. `on_expand`, if provided, is called with each expanded state.
+
+    Returns the best value found, or `incumbent` if no terminal state exceeds it.
+    """
+    best = incumbent
+    seen: Set[int] = {root}
+    heap: List[Tuple[int, int]] = [(-upper_bound(root), root)]
+    expanded = generated = max_frontier = pruned = 0
+    published = [0, 0, 0, 0]
+    try:
+        while heap:
+            max_frontier = max(max_frontier, len(heap))
+            negative_bound, state = heapq.heappop(heap)
+            if -negative_bound <= best:
+                # neither this state nor any remaining in the heap can improve on the best
+                pruned += len(heap) + 1
+                break
+            state_value = value(state)
+            if state_value is not None:
+                best = max(best, state_value)
+                continue
+            expanded += 1
+            if expanded % FLUSH_INTERVAL == 0:
+                _publish(published, expanded, generated, max_frontier, len(seen), pruned)
+            if on_expand is not None:
+                on_expand(state)
+            for successor in successors(state):
+                generated += 1
+                if successor in seen:
+                    continue
+                bound = upper_bound(successor)
+                if bound > best:
+                    seen.add(successor)
+                    heapq.heappush(heap, (-bound, successor))
+                else:
+                    pruned += 1
+        return best
+    finally:
+        _record(stats, published, expanded, generated, max_frontier, len(seen), pruned)
@@ -0,0 +1,284 @@
+"""
+A long-lived solver server that listens on a Unix domain socket.
+
+The protocol is line-delimited JSON. Each request is a single line containing an object like
+
+    {"id": 1, "day": 8, "part": 0, "input": "30373\\n25512\\n..."}
+
+where `input` is the puzzle input itself, or `path` is the path to an input file readable by the server. `part` is
+optional and defaults to running every part; `timeout` optionally overrides the server's per-request timeout in
+seconds; `id` is optional and is echoed in the response. Each response is a single line:
+
+    {"id": 1, "results": [{"day": 8, "part": 0, "name": "visible_trees", "answer": "21", ...}]}
+
+or `{"id": 1, "error": "..."}` if the request could not be run. A request of `{"command": "ping"}` is answered with
+`{"ok": true}`.
+"""
+import argparse
+from dataclasses import asdict
+import json
+import multiprocessing
+from multiprocessing.connection import Connection
+import os
+from pathlib import Path
+from queue import Queue
+import signal
+import socketserver
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import CHALLENGES, shared_parsing
+from .log import add_verbosity_arguments, configure_verbosity
+from .puzzle_input import MemoryInput
+from .runner import PartResult, run_part
+
+# the number of distinct inputs whose parsed form each worker keeps between requests
+PARSED_INPUTS_PER_WORKER = 32
+
+
+class RequestError(Exception):
+    pass
+
+
+def worker_loop(connection: Connection):
+    """Solves (day, parts, input data, input name) requests received on `connection` until it is closed"""
+    CHALLENGES.load_all()
+    parsed_inputs: Dict[Tuple[int, Any], Any] = {}
+    while True:
+        try:
+            day, parts, data, name = connection.recv()
+        except EOFError:
+            break
+        if len(parsed_inputs) >= PARSED_INPUTS_PER_WORKER:
+            parsed_inputs.clear()
+        # MemoryInputs with equal contents compare equal, so a repeated input reuses its parsed form
+        infile = MemoryInput(data, name=name)
+        with shared_parsing(parsed_inputs):
+            results = [run_part(day, part, infile) for part in parts]
+        connection.send(results)
+
+
+def worker_context():
+    """A multiprocessing context whose worker processes start with every challenge module already imported"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        # forking directly from the threaded server is unsafe, so fork from a single-threaded server process instead
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([CHALLENGES.module_name(day) for day in CHALLENGES.modules])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class Worker:
+    def __init__(self, context):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=worker_loop, args=(child_connection,), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def solve(self, day: int, parts: List[int], infile: MemoryInput, timeout: Optional[float]) -> List[PartResult]:
+        self.connection.send((day, parts, infile.data, infile.name))
+        if not self.connection.poll(timeout):
+            raise TimeoutError(f"the request did not finish within {timeout} seconds")
+        return self.connection.recv()
+
+    def close(self):
+        self.connection.close()
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class WorkerPool:
+    """A fixed number of worker processes; a worker that times out or dies is killed and replaced"""
+
+    def __init__(self, size: int):
+        self.context = worker_context()
+        self.workers: List[Worker] = [Worker(self.context) for _ in range(size)]
+        self.idle: "Queue[Worker]" = Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+
+    def solve(self, day: int, parts: List[int], infile: MemoryInput, timeout: Optional[float]) -> List[PartResult]:
+        worker = self.idle.get()
+        try:
+            results = worker.solve(day, parts, infile, timeout)
+        except (TimeoutError, EOFError, OSError):
+            worker.kill()
+            self.workers.remove(worker)
+            worker = Worker(self.context)
+            self.workers.append(worker)
+            raise
+        finally:
+            self.idle.put(worker)
+        return results
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+
+
+class SolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, pool: WorkerPool, timeout: Optional[float] = None, cache=None):
+        self.pool: WorkerPool = pool
+        self.request_timeout: Optional[float] = timeout
+        self.cache = cache
+        super().__init__(socket_path, RequestHandler)
+
+    def solve(self, request: Dict[str, Any]) -> List[PartResult]:
+        try:
+            day = int(request["day"])
+            part = int(request.get("part", -1))
+        except (KeyError, TypeError, ValueError):
+            raise RequestError("requests must include an integer `day` and an optional integer `part`")
+        if day not in CHALLENGES:
+            raise RequestError(f"unknown day: {day}")
+        part_names = CHALLENGES.part_names(day)
+        if part < 0:
+            parts = sorted(part_names)
+        elif part in part_names:
+            parts = [part]
+        else:
+            raise RequestError(f"day {day} does not have part {part}")
+
+        if "input" in request:
+            infile = MemoryInput(str(request["input"]).encode("utf-8"), name="<request>")
+        elif "path" in request:
+            try:
+                infile = MemoryInput(Path(request["path"]).read_bytes(), name=str(request["path"]))
+            except OSError as e:
+                raise RequestError(f"could not read {request['path']}: {e!s}")
+        else:
+            raise RequestError("requests must include either `input` or `path`")
+        timeout = request.get("timeout", self.request_timeout)
+        if timeout is not None:
+            try:
+                timeout = float(timeout)
+            except (TypeError, ValueError):
+                raise RequestError("`timeout` must be a number of seconds")
+
+        results: Dict[int, PartResult] = {}
+        cache_keys: Dict[int, str] = {}
+        if self.cache is not None:
+            for p in parts:
+                cache_keys[p] = self.cache.key(day, p, infile)
+                cached = self.cache.get(cache_keys[p])
+                if cached is not None:
+                    results[p] = PartResult(day=day, part=p, name=cached.name, answer=cached.answer,
+                                            duration=cached.duration, cached=True)
+        remaining = [p for p in parts if p not in results]
+        if remaining:
+            try:
+                computed = self.pool.solve(day, remaining, infile, timeout)
+            except TimeoutError as e:
+                computed = [PartResult(day=day, part=p, name=part_names[p], answer=None, duration=timeout,
+                                       error=f"TimeoutError: {e!s}") for p in remaining]
+            except (EOFError, OSError) as e:
+                computed = [PartResult(day=day, part=p, name=part_names[p], answer=None, duration=0.0,
+                                       error=f"the worker process died: {e!s}") for p in remaining]
+            for result in computed:
+                results[result.part] = result
+                if self.cache is not None and result.succeeded:
+                    self.cache.put(cache_keys[result.part], day=day, part=result.part, name=result.name,
+                                   answer=result.answer, duration=result.duration)
+        return [results[p] for p in parts]
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    server: SolverServer
+
+    def respond(self, response: Dict[str, Any]):
+        self.wfile.write(f"{json.dumps(response)}\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise RequestError("each request must be a JSON object")
+            except (ValueError, RequestError) as e:
+                self.respond({"error": f"invalid request: {e!s}"})
+                continue
+            response: Dict[str, Any] = {}
+            if "id" in request:
+                response["id"] = request["id"]
+            if request.get("command") == "ping":
+                response["ok"] = True
+            else:
+                try:
+                    response["results"] = [asdict(result) for result in self.server.solve(request)]
+                except RequestError as e:
+                    response["error"] = str(e)
+            self.respond(response)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="aoc2022 serve",
+                                     description="Serve solve requests as line-delimited JSON over a Unix socket",
+                                     epilog=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument("SOCKET", type=str, help="the path of the Unix domain socket to listen on")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="the number of worker processes (default is the number of CPUs)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="the default number of seconds a request may run before its worker is killed "
+                             "(default is no timeout)")
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=None,
+                        help="reuse answers cached from previous runs with the same input and solver source; this "
+                             "is off by default unless the AOC2022_CACHE environment variable is set")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="the cache directory (default is $AOC2022_CACHE_DIR or ~/.cache/aoc2022)")
+
+    add_verbosity_arguments(parser)
+
+    args = parser.parse_args(argv[1:])
+    configure_verbosity(args)
+    args.refresh = False
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    elif args.timeout is not None and args.timeout <= 0:
+        parser.error("--timeout must be positive")
+
+    from .cli import open_cache
+    cache = open_cache(args)
+
+    if os.path.exists(args.SOCKET):
+        # only remove a stale socket; never clobber a regular file
+        if not Path(args.SOCKET).is_socket():
+            sys.stderr.write(f"{args.SOCKET} already exists and is not a socket\n")
+            return 1
+        os.unlink(args.SOCKET)
+
+    def terminate(_signum, _frame):
+        raise SystemExit(0)
+
+    # exit through the `finally` below on SIGTERM so that the workers and the socket are cleaned up
+    signal.signal(signal.SIGTERM, terminate)
+
+    CHALLENGES.load_all()
+    pool = WorkerPool(args.jobs)
+    try:
+        with SolverServer(args.SOCKET, pool, timeout=args.timeout, cache=cache) as server:
+            sys.stderr.write(f"Listening on {args.SOCKET} with {args.jobs} workers\n")
+            sys.stderr.flush()
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    finally:
+        pool.close()
+        try:
+            os.unlink(args.SOCKET)
+        except OSError:
+            pass
+    return 0
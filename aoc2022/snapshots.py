@@ -0,0 +1,70 @@
+"""
+An opt-in on-disk cache of parsed inputs.
+
+Unlike the `cache` of answers, a snapshot is keyed by the parser's version rather than the hash of its module's source,
+so editing a day's parts keeps its snapshots valid: a modified solver can be rerun against a pre-built structure
+without paying to parse the input again. Snapshots are pickled with the highest protocol and are memory-mapped when
+they are loaded.
+"""
+from hashlib import sha256
+import mmap
+from pathlib import Path
+import pickle
+from typing import Any, Optional
+
+from . import PARSER_VERSIONS, PARSERS
+from .cache import default_cache_dir, DirectoryStore, file_hash
+from .log import log
+from .puzzle_input import PuzzleInput
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+
+class SnapshotCache:
+    """
+    Pickled parsed inputs keyed by (day, input hash, parser name, parser version).
+
+    When the snapshots exceed `max_size` bytes, the least recently used are evicted. If `refresh` is `True`, existing
+    snapshots are ignored and overwritten.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_size: int = DEFAULT_MAX_SIZE, refresh: bool = False):
+        if directory is None:
+            directory = default_cache_dir()
+        self.store: DirectoryStore = DirectoryStore(directory / "snapshots", suffix=".pickle", max_size=max_size)
+        self.refresh: bool = refresh
+
+    def key(self, day: int, input_path: PuzzleInput) -> str:
+        func = PARSERS[day]
+        return sha256(
+            f"{day}:{file_hash(input_path)}:{func.__module__}.{func.__qualname__}:{PARSER_VERSIONS[day]}:"
+            f"{pickle.HIGHEST_PROTOCOL}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, day: int, input_path: PuzzleInput) -> Optional[Any]:
+        if self.refresh:
+            return None
+        path = self.store.path(self.key(day, input_path))
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                parsed = pickle.loads(data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # a snapshot of a class that has since changed can fail in any number of ways; treat it as a miss
+            log(f"Ignoring the unreadable day {day} snapshot {path}: {e!s}")
+            return None
+        self.store.touch(path)
+        log(f"Loaded the parsed day {day} input from {path}")
+        return parsed
+
+    def put(self, day: int, input_path: PuzzleInput, parsed: Any):
+        try:
+            data = pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError, TypeError, AttributeError) as e:
+            log(f"The parsed day {day} input cannot be snapshotted: {e!s}")
+            return
+        self.store.write(self.key(day, input_path), data)
+
+    def clear(self):
+        self.store.clear()
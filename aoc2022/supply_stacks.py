@@ -1,8 +1,11 @@
 from dataclasses import dataclass
+from random import Random
 import re
-from typing import List, Tuple, Type
+from string import ascii_uppercase
+from typing import List, TextIO, Tuple, Type
 
-from . import challenge, Path
+from . import challenge, generator, Path
+from .puzzle_input import integer_rows, records
 
 """
 --- Day 5: Supply Stacks ---
@@ -101,30 +104,47 @@ class Move:
 
 def load(path: Path) -> Tuple[List[Stack], List[Move]]:
     stacks: List[Stack] = []
-    moves: List[Move] = []
-
-    done_stacks = False
-
-    with open(path, "r") as f:
-        for line in f:
-            if not done_stacks:
-                if not line.strip():
-                    done_stacks = True
-                    continue
-                stack_index = 0
-                while line and not line.startswith("\n"):
-                    if len(stacks) <= stack_index:
-                        stacks.extend([Stack() for _ in range(stack_index - len(stacks) + 1)])
-                    if line.startswith("["):
-                        stacks[stack_index] = Stack([line[1]]) + stacks[stack_index]
-                    line = line[4:]
-                    stack_index += 1
-            else:
-                moves.append(Move.load(line))
+
+    drawing, procedure = records(path)
+    for line in drawing.decode("utf-8").splitlines():
+        stack_index = 0
+        while line:
+            if len(stacks) <= stack_index:
+                stacks.extend([Stack() for _ in range(stack_index - len(stacks) + 1)])
+            if line.startswith("["):
+                stacks[stack_index] = Stack([line[1]]) + stacks[stack_index]
+            line = line[4:]
+            stack_index += 1
+
+    moves = [
+        Move(from_crate=from_crate - 1, to_crate=to_crate - 1, quantity=quantity)
+        for quantity, from_crate, to_crate in integer_rows(procedure, 3)
+    ]
 
     return stacks, moves
 
 
+@generator(day=5, default_scale=500)
+def generate_procedure(out: TextIO, scale: int, rng: Random):
+    """Writes nine stacks of crates followed by `scale` moves"""
+    num_stacks = 9
+    stacks = [[rng.choice(ascii_uppercase) for _ in range(rng.randint(2, 8))] for _ in range(num_stacks)]
+    for level in range(max(map(len, stacks)) - 1, -1, -1):
+        out.write(" ".join(f"[{stack[level]}]" if level < len(stack) else "   " for stack in stacks))
+        out.write("\n")
+    out.write(" ".join(f" {i + 1} " for i in range(num_stacks)))
+    out.write("\n\n")
+    sizes = [len(stack) for stack in stacks]
+    for _ in range(scale):
+        # never empty a stack, since the answers are read from the top of every stack
+        from_stack = rng.choice([i for i, size in enumerate(sizes) if size > 1])
+        to_stack = rng.choice([i for i in range(num_stacks) if i != from_stack])
+        quantity = rng.randint(1, sizes[from_stack] - 1)
+        sizes[from_stack] -= quantity
+        sizes[to_stack] += quantity
+        out.write(f"{Move(from_crate=from_stack, to_crate=to_stack, quantity=quantity)!s}\n")
+
+
 @challenge(day=5)
 def top_stack(path: Path) -> str:
     stacks, moves = load(path)
@@ -1,7 +1,8 @@
-from enum import Enum
-from typing import Dict, Iterator, List, Optional, Tuple, Union
+from random import Random
+from typing import TextIO
 
-from . import challenge, Path
+from . import challenge, generator, parser, Path
+from .grid import Grid
 
 """
 --- Day 8: Treetop Tree House ---
@@ -35,263 +36,75 @@ Consider your map; how many trees are visible from outside the grid?
 """
 
 
-class Direction(Enum):
-    NORTH = 0
-    SOUTH = 1
-    EAST = 2
-    WEST = 3
-
-    @property
-    def opposite(self) -> "Direction":
-        if self == Direction.NORTH:
-            return Direction.SOUTH
-        elif self == Direction.SOUTH:
-            return Direction.NORTH
-        elif self == Direction.EAST:
-            return Direction.WEST
-        else:
-            return Direction.EAST
-
-
-UnknownTree = object()
-
-
-class Tree:
-    def __init__(self, row: int, col: int, height: int):
-        self.row: int = row
-        self.col: int = col
-        self.height: int = height
-        self._neighbors: Dict[Direction, Optional[Tree]] = {
-            Direction.NORTH: None,
-            Direction.SOUTH: None,
-            Direction.EAST: None,
-            Direction.WEST: None
-        }
-        self.highest_tree: Dict[Direction, Optional[Union[Tree, UnknownTree]]] = {
-            Direction.NORTH: UnknownTree,
-            Direction.SOUTH: UnknownTree,
-            Direction.EAST: UnknownTree,
-            Direction.WEST: UnknownTree
-        }
-
-    @property
-    def visible(self) -> Optional[bool]:
-        if any(t is None or t.height < self.height for t in self.highest_tree.values()):
-            return True
-        elif all(v is not None and v is not UnknownTree for v in self.highest_tree.values()):
-            return False
-        else:
-            return None
-
-    def is_visible_from(self, direction: Direction) -> Optional[bool]:
-        highest = self.highest_tree[direction]
-        if highest is UnknownTree:
-            return None
-        elif highest is None or highest.height < self.height:
-            return True
-        else:
-            return False
-
-    def highest_in_direction(self, direction: Direction) -> "Tree":
-        highest = self.highest_tree[direction]
-        if highest is not UnknownTree and highest.height > self.height:
-            return highest
-        else:
-            return self
-
-    def set_highest_tree(self, highest_tree: Optional["Tree"], in_direction: Direction):
-        existing_highest_tree = self.highest_tree[in_direction]
-        if existing_highest_tree == highest_tree:
-            return
-        # assert existing_highest_tree is UnknownTree
-        if highest_tree is None:
-            next_highest_tree = self
-        else:
-            if self.height >= highest_tree.height:
-                next_highest_tree = self
-            else:
-                next_highest_tree = highest_tree
-        self.highest_tree[in_direction] = highest_tree
-        # print(f"{self!s}.next_highest_tree in {in_direction} = {highest_tree!s};\t"
-        #       f"visible = {self.is_visible_from(in_direction)}")
-        # propagate the visibility
-        neighbor = self._neighbors[in_direction.opposite]
-        if neighbor is not None:
-            neighbor.set_highest_tree(next_highest_tree, in_direction)
-
-    def add_neighbor(self, tree: "Tree", direction: Direction):
-        if self._neighbors[direction] is not None:
-            if self._neighbors[direction] is tree:
-                return
-            raise ValueError()
-        self._neighbors[direction] = tree
-
-    def __eq__(self, other):
-        return isinstance(other, Tree) and other.row == self.row and other.col == self.col
-
-    def __hash__(self):
-        return hash((self.row, self.col))
-
-    def __str__(self):
-        return f"🌲({self.row}, {self.col})↑{self.height}"
-
-
-HeightMatrix = List[List[int]]
-
-
-def load(path: Path) -> HeightMatrix:
-    rows: HeightMatrix = []
-    with open(path, "r") as f:
-        for line in f:
-            rows.append([int(height) for height in line.strip()])
-    assert all(len(r) == len(rows[0]) for r in rows[1:])
-    return rows
-
-
-def neighborhood(row: int, col: int, width: int, height: int) -> Iterator[Tuple[int, int, Direction]]:
-    for rdelta, cdelta, direction in (
-            (-1, 0, Direction.NORTH), (0, -1, Direction.WEST), (0, 1, Direction.EAST), (1, 0, Direction.SOUTH)
-    ):
-        r, c = row + rdelta, col + cdelta
-        if 0 <= r < height and 0 <= c < width:
-            yield r, c, direction
-
-
-class Forest:
-    def __init__(self, trees: List[List[Tree]]):
-        self.trees: List[List[Tree]] = trees
-
-    def __iter__(self) -> Iterator[Tree]:
-        for row in self.trees:
-            yield from row
-
-    def __getitem__(self, row: int) -> List[Tree]:
-        return self.trees[row]
-
-    @property
-    def height(self) -> int:
-        return len(self.trees)
-
-    @property
-    def width(self) -> int:
-        return len(self.trees[0])
-
-    def view_distance(self, tree: Tree, in_direction: Direction) -> int:
-        highest = tree.highest_tree[in_direction]
-        # print(f"Highest for {tree!s} in {in_direction}: {highest!s}")
-        if highest is UnknownTree:
-            raise ValueError()
-        elif highest is None or tree.height > highest.height:
-            if in_direction == Direction.EAST:
-                return self.width - tree.col - 1
-            elif in_direction == Direction.WEST:
-                return tree.col
-            elif in_direction == Direction.SOUTH:
-                return self.height - tree.row - 1
-            else:
-                return tree.row
-        else:
-            # do a manual search
-            row, col = tree.row, tree.col
-            trees = 0
-            while True:
-                if in_direction == Direction.EAST:
-                    col += 1
-                elif in_direction == Direction.WEST:
-                    col -= 1
-                elif in_direction == Direction.SOUTH:
-                    row += 1
-                else:
-                    row -= 1
-                if not (0 <= row < self.height and 0 <= col < self.width):
-                    break
-                h = self.trees[row][col].height
-                trees += 1
-                if h >= tree.height:
-                    break
-            return trees
-
-    def scenic_score(self, tree: Tree):
-        return self.view_distance(tree, Direction.NORTH) * self.view_distance(tree, Direction.EAST) * \
-               self.view_distance(tree, Direction.SOUTH) * self.view_distance(tree, Direction.WEST)
+INVALID_HEIGHT = 255
+DIGIT_HEIGHTS: bytes = bytes(
+    c - ord("0") if ord("0") <= c <= ord("9") else INVALID_HEIGHT
+    for c in range(256)
+)
+
+
+class Forest(Grid):
+    """The height of each tree, from 0 to 9"""
 
     @classmethod
-    def load(cls, heights: HeightMatrix) -> "Forest":
-        height = len(heights)
-        width = len(heights[0])
-        trees_by_pos: Dict[Tuple[int, int], Tree] = {}
-        for i, row in enumerate(heights):
-            for j, col in enumerate(row):
-                assert (i, j) not in trees_by_pos
-                tree = Tree(row=i, col=j, height=col)
-                trees_by_pos[(i, j)] = tree
-        for i in range(height):
-            for j in range(width):
-                tree = trees_by_pos[(i, j)]
-                for nrow, ncol, direction in neighborhood(i, j, width, height):
-                    tree.add_neighbor(trees_by_pos[(nrow, ncol)], direction)
-        for i in range(height):
-            for j in range(width):
-                tree = trees_by_pos[(i, j)]
-                if i == 0:
-                    tree.set_highest_tree(None, Direction.NORTH)
-                if i == height - 1:
-                    tree.set_highest_tree(None, Direction.SOUTH)
-                if j == 0:
-                    tree.set_highest_tree(None, Direction.WEST)
-                if j == width - 1:
-                    tree.set_highest_tree(None, Direction.EAST)
-
-        return cls([[trees_by_pos[(row, col)] for col in range(width)] for row in range(height)])
-
-    def __str__(self):
-        s = ""
-        for row in self.trees:
-            for tree in row:
-                vis = tree.is_visible_from(Direction.NORTH)
-                if vis is None:
-                    v = " ? "
-                elif vis:
-                    v = f" ^ "
-                else:
-                    v = f"   "
-                s = f"{s}{v}"
-            s = f"{s}\n"
-            for tree in row:
-                vis = tree.is_visible_from(Direction.WEST)
-                if vis is None:
-                    w = f"?{tree.height}"
-                elif vis:
-                    w = f"<{tree.height}"
-                else:
-                    w = f" {tree.height}"
-                vis = tree.is_visible_from(Direction.EAST)
-                if vis is None:
-                    e = f"?"
-                elif vis:
-                    e = f">"
-                else:
-                    e = f" "
-                s = f"{s}{w}{e}"
-            s = f"{s}\n"
-            for tree in row:
-                vis = tree.is_visible_from(Direction.SOUTH)
-                if vis is None:
-                    v = " ? "
-                elif vis:
-                    v = f" V "
-                else:
-                    v = f"   "
-                s = f"{s}{v}"
-            s = f"{s}\n"
-        return s
-
-
-@challenge(day=8)
-def visible_trees(path: Path) -> int:
-    trees = Forest.load(load(path))
-    # print(str(trees))
-    return sum(1 for t in trees if t.visible)
+    def load_heights(cls, path: Path) -> "Forest":
+        forest: Forest = cls.load(path, translate=DIGIT_HEIGHTS)  # type: ignore
+        if INVALID_HEIGHT in forest.cells:
+            row, col = forest.position(forest.cells.index(INVALID_HEIGHT))
+            raise ValueError(f"Invalid tree height at row {row + 1}, column {col + 1}")
+        return forest
+
+    def visible(self) -> bytearray:
+        """Returns a flag for each cell that is set if the tree is visible from outside the forest"""
+        cells = self.cells
+        visible = bytearray(len(cells))
+        lines = [self.row_indices(row) for row in range(self.height)]
+        lines.extend(self.column_indices(col) for col in range(self.width))
+        for line in lines:
+            for indices in (line, reversed(line)):
+                tallest = -1
+                for i in indices:
+                    if cells[i] > tallest:
+                        visible[i] = 1
+                        tallest = cells[i]
+                        if tallest == 9:
+                            # nothing behind the tallest possible tree is visible
+                            break
+        return visible
+
+    def view_distance(self, index: int, offset: int, limit: int) -> int:
+        """The number of trees visible from `index` when stepping by `offset`, with `limit` trees before the edge"""
+        cells = self.cells
+        height = cells[index]
+        for distance in range(1, limit + 1):
+            index += offset
+            if cells[index] >= height:
+                return distance
+        return limit
+
+    def scenic_score(self, index: int) -> int:
+        row, col = self.position(index)
+        north, east, south, west = self.offsets
+        return self.view_distance(index, north, row) * self.view_distance(index, east, self.width - col - 1) * \
+            self.view_distance(index, south, self.height - row - 1) * self.view_distance(index, west, col)
+
+
+@generator(day=8, default_scale=99)
+def generate_forest(out: TextIO, scale: int, rng: Random):
+    """Writes a `scale` by `scale` grid of tree heights"""
+    for _ in range(scale):
+        out.write("".join(rng.choices("0123456789", k=scale)))
+        out.write("\n")
+
+
+@parser(day=8)
+def load_forest(path: Path) -> Forest:
+    return Forest.load_heights(path)
+
+
+@challenge(day=8, parsed=True)
+def visible_trees(trees: Forest) -> int:
+    return sum(trees.visible())
 
 
 """
@@ -332,8 +145,6 @@ Consider each tree on your map. What is the highest scenic score possible for an
 """
 
 
-@challenge(day=8)
-def scenic_score(path: Path) -> int:
-    trees = Forest.load(load(path))
-    # print(str(trees))
-    return max(trees.scenic_score(tree) for tree in trees)
+@challenge(day=8, parsed=True)
+def scenic_score(trees: Forest) -> int:
+    return max(trees.scenic_score(index) for index in trees.indices())
@@ -1,6 +1,8 @@
+from random import Random
+from string import ascii_lowercase
 from typing import TextIO
 
-from . import challenge, Path
+from . import challenge, generator, Path
 
 """
 --- Day 6: Tuning Trouble ---
@@ -48,13 +50,47 @@ def seek_to_start(stream: TextIO, marker_len: int = 4):
             return
 
 
+def find_marker(data: bytes, marker_len: int = 4) -> int:
+    """
+    Returns the number of characters through the end of the first marker in a single pass over `data`.
+
+    The window of distinct characters only ever grows at its end or jumps past the previous occurrence of the newest
+    character, so no window is ever rescanned.
+    """
+    last_seen = [-1] * 256
+    window_start = 0
+    for i, c in enumerate(data):
+        if last_seen[c] >= window_start:
+            window_start = last_seen[c] + 1
+        last_seen[c] = i
+        if i - window_start + 1 == marker_len:
+            return i + 1
+    raise EOFError("Did not find the start-of-packet marker in the stream!")
+
+
+@generator(day=6, default_scale=4096)
+def generate_datastream(out: TextIO, scale: int, rng: Random):
+    """Writes a datastream of `scale` characters before the start-of-message marker"""
+    # no window of three letters can contain a marker, so both markers are found at the very end of the stream
+    alphabet = rng.sample(ascii_lowercase, 3)
+    out.write("".join(rng.choices(alphabet, k=scale)))
+    out.write("".join(rng.sample(ascii_lowercase, 14)))
+    out.write("\n")
+
+
 @challenge(day=6)
 def find_start(path: Path) -> int:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         seek_to_start(f)
         return f.tell()
 
 
+@challenge(day=6, part=0, impl="fast")
+def find_start_fast(path: Path) -> int:
+    with path.open("rb") as f:
+        return find_marker(f.read())
+
+
 """
 --- Part Two ---
 Your device's communication system is correctly detecting packets, but still isn't working. It looks like it also needs to look for messages.
@@ -74,6 +110,12 @@ How many characters need to be processed before the first start-of-message marke
 
 @challenge(day=6)
 def find_message_start(path: Path) -> int:
-    with open(path, "r") as f:
+    with path.open("r") as f:
         seek_to_start(f, marker_len=14)
         return f.tell()
+
+
+@challenge(day=6, part=1, impl="fast")
+def find_message_start_fast(path: Path) -> int:
+    with path.open("rb") as f:
+        return find_marker(f.read(), marker_len=14)
@@ -198,9 +198,11 @@ Simulate the Elves' process and find the smallest rectangle that contains the El
 from collections import defaultdict
 from enum import Enum
 from itertools import chain
-from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from random import Random
+from typing import Dict, Iterable, Iterator, List, Set, TextIO, Tuple
 
-from . import challenge, Path
+from . import challenge, generator, Path
+from .log import DEBUG, enabled, log
 
 
 Position = Tuple[int, int]
@@ -230,7 +232,7 @@ class Grove:
 
     @classmethod
     def load(cls, path: Path) -> "Grove":
-        with open(path, "r") as f:
+        with path.open("r") as f:
             return cls((
                 (row, col)
                 for row, line in enumerate(f)
@@ -349,13 +351,22 @@ class Round:
         return Round(Grove(chain(to_move.values(), unmoved)), next_directions)
 
 
+@generator(day=23, default_scale=74)
+def generate_grove(out: TextIO, scale: int, rng: Random):
+    """Writes a `scale` by `scale` scan of a grove that is about half elves"""
+    for _ in range(scale):
+        out.write("".join(rng.choices(".#", k=scale)))
+        out.write("\n")
+
+
 @challenge(day=23)
 def empty_ground_tiles(path: Path) -> int:
     grove = Grove.load(path)
     r = Round(grove)
     for _ in range(10):
         r = r.next()
-    print(str(r.grove))
+    if enabled(DEBUG):
+        log(str(r.grove), level=DEBUG)
     return r.grove.empty_tiles()
 
 
@@ -370,5 +381,6 @@ def first_round_with_no_movement(path: Path) -> int:
             r = r.next()
         except StopIteration:
             break
-    print(str(r.grove))
+    if enabled(DEBUG):
+        log(str(r.grove), level=DEBUG)
     return i